@@ -0,0 +1,192 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Таблицы, которые сценарий читает целиком по смыслу (например, список
+# всех пользователей); для остальных полный просмотр - ошибка
+ALLOWED_SCANS = {
+    'GET /api/users': {'users'},
+    'GET /api/appointments (all)': {'appointments'},
+}
+
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?')
+
+# Записывает SELECT-запросы, выполненные внутри сценария
+class StatementRecorder:
+    def __init__(self, engine):
+        self.statements = []
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'paused', False) or executemany:
+            return
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.statements.append((statement, parameters))
+
+    def take(self):
+        statements, self.statements = self.statements, []
+        return statements
+
+    def explain(self, connection, statement, parameters):
+        self._local.paused = True
+        try:
+            if connection.dialect.name == 'sqlite':
+                rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+                return [row[-1] for row in rows]
+            rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).mappings().all()
+            return [dict(row) for row in rows]
+        finally:
+            self._local.paused = False
+
+# Полные просмотры таблиц в плане: [(table, detail)]
+def full_scans(dialect, plan, statement=''):
+    # Обход индекса в порядке ORDER BY с LIMIT останавливается после limit строк,
+    # если SQLite не сортирует всю выборку заново (TEMP B-TREE FOR ORDER BY)
+    limited = ' LIMIT ' in ' '.join(statement.upper().split()) and dialect == 'sqlite' and not any(
+        step.startswith('USE TEMP B-TREE FOR ORDER BY') for step in plan
+    )
+    scans = []
+    for step in plan:
+        if dialect == 'sqlite':
+            match = _SQLITE_SCAN.match(step)
+            if step.startswith('SCAN CONSTANT ROW'):
+                continue
+            # SCAN ... USING INDEX без условия - тоже обход всей таблицы,
+            # но по индексу; считаем это полным просмотром
+            if match and not (limited and match.group(2)):
+                scans.append((match.group(1), step))
+        elif step.get('type') == 'ALL':
+            scans.append((step.get('table'), f"type=ALL rows={step.get('rows')} key={step.get('key')}"))
+    return scans
+
+def build_scenarios(dataset):
+    from src.models.user import User
+    from src.services.pagination import encode_cursor
+    from src.services.reminders import generate_reminders
+
+    start = date.fromisoformat(dataset['start_date'])
+    month = f"start_date={start.replace(day=1)}&end_date={(start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)}"
+    months = ','.join(f'{day.year:04d}-{day.month:02d}' for day in (start, start + timedelta(days=31), start + timedelta(days=92)))
+    week = f'start_date={start + timedelta(days=7)}&end_date={start + timedelta(days=14)}'
+    remind_day = start + timedelta(days=3)
+
+    def get(path, username='admin'):
+        return ('http', username, path)
+
+    return {
+        'GET /api/calendar': get(f'/api/calendar?{month}'),
+        'GET /api/calendar (installer)': get(f'/api/calendar?{month}', 'user2'),
+        'GET /api/calendar (months)': get(f'/api/calendar?months={months}'),
+        'GET /api/appointments (range)': get(f'/api/appointments?{week}'),
+        'GET /api/appointments (range, door_type)': get(f'/api/appointments?{week}&door_type=interior'),
+        'GET /api/appointments (page)': get(f'/api/appointments?limit=50&cursor={encode_cursor([str(start + timedelta(days=5)), 10])}'),
+        'GET /api/appointments (all)': get('/api/appointments'),
+        'GET /api/appointments (first page)': get('/api/appointments?limit=50'),
+        'GET /api/appointments/changes': get(f'/api/appointments/changes?since={encode_cursor([1, 0, 0, 0])}'),
+        'GET /api/notifications': get('/api/notifications?limit=20', 'user1'),
+        'GET /api/notifications (page)': get(f"/api/notifications?limit=20&cursor={encode_cursor([f'{start}T00:00:00', 10**9])}", 'user1'),
+        'GET /api/notifications/unread_count': get('/api/notifications/unread_count', 'user1'),
+        'GET /api/availability': get(f'/api/availability?{week}'),
+        'GET /api/availability/next': get(f'/api/availability/next?from={start}&door_type=entrance'),
+        'GET /api/users': get('/api/users'),
+        'job generate-reminders': ('call', None, lambda: generate_reminders(remind_day)),
+        'admin count (delete_user)': ('call', None, lambda: User.query.filter_by(role='admin').count()),
+    }
+
+# Запускает каждый маршрут на заполненной базе, получает EXPLAIN всех его
+# SELECT-запросов и завершается с кодом 1, если какой-то запрос просматривает
+# таблицу целиком.
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN the SQL of each route and fail on full table scans')
+    parser.add_argument('--appointments', type=int, default=3000)
+    parser.add_argument('--notifications', type=int, default=5000)
+    parser.add_argument('--verbose', action='store_true', help='Print every plan')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault('APP_CONFIG', 'sqlite')
+        os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tmp, 'explain.db'))
+        os.environ['REMINDER_SCHEDULER'] = '0'
+        sys.path.insert(0, ROOT)
+
+        from main import create_app
+        from src.migrations import create_baseline_schema, upgrade_schema
+        from src.models.user import db
+        from benchmarks.seed import BENCH_PASSWORD, seed_database
+
+        app = create_app()
+        with app.app_context():
+            # Схема первой версии и все миграции, как на рабочей базе: проверяются
+            # индексы, созданные миграциями, а не create_all
+            db.drop_all()
+            with db.engine.begin() as connection:
+                create_baseline_schema(connection)
+            upgrade_schema(log=lambda message: None)
+            dataset = seed_database(20, args.appointments, args.notifications, create_schema=False)
+            recorder = StatementRecorder(db.engine)
+            dialect = db.engine.dialect.name
+            if dialect == 'sqlite':
+                with db.engine.begin() as connection:
+                    connection.exec_driver_sql('ANALYZE')
+
+        clients = {}
+
+        def client_for(username):
+            if username not in clients:
+                client = app.test_client()
+                response = client.post('/api/login', json={'username': username, 'password': BENCH_PASSWORD})
+                assert response.status_code == 200, response.get_json()
+                clients[username] = client
+            return clients[username]
+
+        failures = 0
+        for name, (kind, username, target) in build_scenarios(dataset).items():
+            if kind == 'http':
+                client = client_for(username)
+                recorder.take()
+                status = client.get(target).status_code
+            else:
+                recorder.take()
+                with app.app_context():
+                    target()
+                status = 'ok'
+            statements = recorder.take()
+
+            allowed = ALLOWED_SCANS.get(name, set())
+            problems = []
+            with app.app_context(), db.engine.connect() as connection:
+                for statement, parameters in statements:
+                    plan = recorder.explain(connection, statement, parameters)
+                    scans = [(table, detail) for table, detail in full_scans(dialect, plan, statement)
+                             if table not in allowed]
+                    if scans:
+                        problems.append((statement, scans))
+                    if args.verbose:
+                        print(f'  {" ".join(statement.split())[:160]}')
+                        for step in plan:
+                            print(f'      {step}')
+
+            result = 'FULL SCAN' if problems else 'ok'
+            print(f'{name:<45} {status!s:<5} {len(statements):>2} queries  {result}')
+            for statement, scans in problems:
+                failures += 1
+                print(f'    {" ".join(statement.split())[:200]}')
+                for table, detail in scans:
+                    print(f'      {table}: {detail}')
+
+    if failures:
+        print(f'{failures} queries scan whole tables')
+        sys.exit(1)
+    print('No unexpected full table scans')
+
+if __name__ == '__main__':
+    main()
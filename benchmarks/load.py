@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+ENDPOINTS = ['calendar', 'appointments', 'notifications', 'login', 'booking']
+MODES = ['test_client', 'wsgi']
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Нагрузочный прогон на синтетических данных: p50/p95/p99, пропускная способность
+# и число SQL-запросов на запрос для основных эндпоинтов. Результаты сохраняются
+# в benchmarks/results, чтобы сравнивать ревизии между собой.
+def main():
+    parser = argparse.ArgumentParser(description='Load benchmark for the main API endpoints')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--appointments', type=int, default=2000)
+    parser.add_argument('--notifications', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='Repeat to select endpoints (default: all)')
+    parser.add_argument('--mode', action='append', choices=MODES, help='Repeat to select drivers (default: both)')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/<timestamp>-<rev>.json)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Конфиг читается при импорте, поэтому окружение задается до импорта main
+        os.environ.setdefault('APP_CONFIG', 'sqlite')
+        os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tmp, 'bench.db'))
+        os.environ['REMINDER_SCHEDULER'] = '0'
+        sys.path.insert(0, ROOT)
+
+        from main import create_app
+        from benchmarks.seed import seed_database
+        from benchmarks.runner import run_suite
+
+        app = create_app()
+        with app.app_context():
+            dataset = seed_database(args.users, args.appointments, args.notifications)
+        results = run_suite(
+            app, dataset, args.mode or MODES, args.endpoint or ENDPOINTS,
+            args.requests, args.concurrency
+        )
+
+    revision = git_revision()
+    report = {
+        'revision': revision,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': os.environ['DATABASE_URL'].split(':', 1)[0],
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'dataset': dataset,
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f'{stamp}-{revision or "local"}.json')
+    with open(output, 'w') as f:
+        f.write(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+
+    for mode, mode_results in results.items():
+        print(f'[{mode}]')
+        for row in mode_results['endpoints']:
+            print(f"  {row['endpoint']:<14} p50={row['p50_ms']:>8}ms p95={row['p95_ms']:>8}ms "
+                  f"p99={row['p99_ms']:>8}ms rps={row['throughput_rps']:>8} q/req={row['queries_per_request']} "
+                  f"statuses={row['statuses']}")
+        race = mode_results['booking_race']
+        print(f"  booking_race   created={race['created']} rejected={race['rejected']} ok={race['ok']}")
+    print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import http.client
+import json
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.cookies import SimpleCookie
+
+from sqlalchemy import event
+from werkzeug.serving import make_server
+
+from src.models.user import db
+from benchmarks.seed import BENCH_PASSWORD
+
+# Счетчик SQL-запросов движка (все потоки процесса)
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+def percentile(values, pct):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+def summarize(name, latencies, elapsed, queries, statuses):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        'endpoint': name,
+        'requests': len(latencies_ms),
+        'throughput_rps': round(len(latencies_ms) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'queries_per_request': round(queries / len(latencies_ms), 2),
+        'statuses': {str(status): statuses.count(status) for status in sorted(set(statuses))},
+    }
+
+# Запросы сценариев. booking выбирает разные слоты далеко после данных seed,
+# чтобы каждая запись создавалась, а не упиралась в занятый слот.
+def build_scenarios(dataset, booking_offset=0):
+    start = date.fromisoformat(dataset['start_date'])
+    month = start.replace(day=1)
+    month_end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    booking_start = date.fromisoformat(dataset['end_date']) + timedelta(days=30 + booking_offset)
+
+    def booking(i):
+        slot = ('morning', 'afternoon')[i % 2]
+        door_type = ('entrance', 'interior')[(i // 2) % 2]
+        day = booking_start + timedelta(days=i // 4)
+        return ('POST', '/api/appointments', {
+            'date': day.isoformat(), 'time_slot': slot, 'door_type': door_type, 'invoice_number': str(i)
+        })
+
+    return {
+        'calendar': lambda i: ('GET', f'/api/calendar?start_date={month.isoformat()}&end_date={month_end.isoformat()}&door_type=entrance', None),
+        'appointments': lambda i: ('GET', f'/api/appointments?start_date={month.isoformat()}&end_date={month_end.isoformat()}', None),
+        'notifications': lambda i: ('GET', '/api/notifications', None),
+        'login': lambda i: ('POST', '/api/login', {'username': 'admin', 'password': BENCH_PASSWORD}),
+        'booking': booking,
+    }
+
+# Режим test client: без сети. Вход выполняется один раз, дальше у каждого
+# потока свой клиент с той же сессионной cookie (логин не попадает в замеры)
+class TestClientDriver:
+    name = 'test_client'
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+        client = app.test_client()
+        client.post('/api/login', json={'username': 'admin', 'password': BENCH_PASSWORD})
+        self.cookie = client.get_cookie(app.config.get('SESSION_COOKIE_NAME', 'session'))
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.app.test_client()
+            client.set_cookie(self.cookie.key, self.cookie.value)
+            self._local.client = client
+        return client
+
+    def request(self, method, path, body):
+        response = self._client().open(path, method=method, json=body)
+        return response.status_code
+
+    def close(self):
+        pass
+
+# Режим настоящего многопоточного WSGI-сервера (werkzeug) и HTTP-клиентов
+class WSGIServerDriver:
+    name = 'wsgi'
+
+    def __init__(self, app):
+        # Лог доступа werkzeug на каждый запрос искажает замеры
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        response = self._raw('POST', '/api/login', {'username': 'admin', 'password': BENCH_PASSWORD})
+        jar = SimpleCookie(response.getheader('Set-Cookie'))
+        self.cookie = '; '.join(f'{key}={morsel.value}' for key, morsel in jar.items())
+
+    def _raw(self, method, path, body, cookie=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        headers = {'Content-Type': 'application/json'}
+        if cookie:
+            headers['Cookie'] = cookie
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        return response
+
+    def request(self, method, path, body):
+        return self._raw(method, path, body, self.cookie).status
+
+    def close(self):
+        self.server.shutdown()
+
+def run_endpoint(driver, counter, name, make_request, requests, concurrency):
+    # Прогрев: первые запросы (кэши, соединения пула) не попадают в замер
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(lambda i: driver.request(*make_request(requests + i)), range(concurrency)))
+    counter.reset()
+
+    latencies = [0.0] * requests
+    statuses = [0] * requests
+
+    def one(i):
+        method, path, body = make_request(i)
+        started = time.perf_counter()
+        statuses[i] = driver.request(method, path, body)
+        latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    return summarize(name, latencies, elapsed, counter.reset(), statuses)
+
+# Гонка за один слот: ровно одна запись должна быть создана
+def run_booking_race(driver, attempts, concurrency, day):
+    body = {'date': day.isoformat(), 'time_slot': 'morning', 'door_type': 'entrance', 'invoice_number': 'race'}
+    with ThreadPoolExecutor(concurrency) as pool:
+        statuses = list(pool.map(lambda i: driver.request('POST', '/api/appointments', body), range(attempts)))
+    return {
+        'attempts': attempts,
+        'created': statuses.count(201),
+        'rejected': statuses.count(400),
+        'ok': statuses.count(201) == 1,
+    }
+
+def run_suite(app, dataset, modes, endpoints, requests, concurrency):
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    race_day = date.fromisoformat(dataset['end_date']) + timedelta(days=10)
+    # Каждому режиму свой диапазон дат для booking, иначе второй прогон упрется в занятые слоты
+    booking_days = (requests + concurrency) // 4 + 1
+
+    results = {}
+    for index, mode in enumerate(modes):
+        scenarios = build_scenarios(dataset, index * booking_days)
+        driver = TestClientDriver(app) if mode == 'test_client' else WSGIServerDriver(app)
+        try:
+            results[mode] = {
+                'endpoints': [
+                    run_endpoint(driver, counter, name, scenarios[name], requests, concurrency)
+                    for name in endpoints
+                ],
+                'booking_race': run_booking_race(driver, max(concurrency * 4, 8), concurrency,
+                                                 race_day + timedelta(days=index)),
+            }
+        finally:
+            driver.close()
+    return results
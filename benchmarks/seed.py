@@ -0,0 +1,83 @@
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from src.models.user import db, User
+from src.models.appointment import Appointment, Notification
+
+ROLES = ['manager', 'installer_entrance', 'installer_interior']
+SLOTS = [(time_slot, door_type) for door_type in ('entrance', 'interior') for time_slot in ('morning', 'afternoon')]
+BENCH_PASSWORD = 'bench'
+CHUNK = 1000
+
+def _chunks(rows, size=CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+# Заполняет пустую базу синтетическими данными. Записи занимают слоты подряд,
+# начиная с start_date (4 слота в день), как в загруженном календаре.
+# create_schema=False - схема уже создана вызывающим кодом (например, миграциями).
+def seed_database(users=20, appointments=2000, notifications=5000, start_date=None, seed=42, create_schema=True):
+    rng = random.Random(seed)
+    start_date = start_date or date(datetime.utcnow().year, 1, 1)
+    now = datetime.utcnow()
+
+    if create_schema:
+        db.drop_all()
+        db.create_all()
+
+    # Один хеш на всех: scrypt на каждого пользователя сделал бы заполнение долгим
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    user_rows = [{
+        'username': 'admin', 'password_hash': password_hash, 'role': 'admin',
+        'created_at': now, 'user_color': '#3498db'
+    }]
+    for i in range(1, users):
+        user_rows.append({
+            'username': f'user{i}', 'password_hash': password_hash, 'role': ROLES[i % len(ROLES)],
+            'created_at': now, 'user_color': '#%06x' % rng.randrange(0xffffff)
+        })
+    db.session.execute(insert(User), user_rows)
+
+    appointment_rows = []
+    for i in range(appointments):
+        time_slot, door_type = SLOTS[i % len(SLOTS)]
+        appointment_rows.append({
+            'user_id': rng.randint(1, users),
+            'date': start_date + timedelta(days=i // len(SLOTS)),
+            'time_slot': time_slot,
+            'door_type': door_type,
+            'comment': 'Синтетическая запись',
+            'invoice_number': str(100000 + i),
+            'address': f'ул. Тестовая, д. {i % 200 + 1}',
+            'created_at': now,
+            'updated_at': now,
+            'is_weekend': False,
+        })
+    for chunk in _chunks(appointment_rows):
+        db.session.execute(insert(Appointment), chunk)
+
+    notification_rows = []
+    if appointments:
+        for i in range(notifications):
+            appointment_id = rng.randint(1, appointments)
+            notification_rows.append({
+                'user_id': appointment_rows[appointment_id - 1]['user_id'],
+                'appointment_id': appointment_id,
+                'message': 'Напоминание о предстоящей установке',
+                'is_read': rng.random() < 0.7,
+                'created_at': now - timedelta(minutes=i),
+            })
+    for chunk in _chunks(notification_rows):
+        db.session.execute(insert(Notification), chunk)
+
+    db.session.commit()
+    return {
+        'users': users,
+        'appointments': appointments,
+        'notifications': len(notification_rows),
+        'start_date': start_date.isoformat(),
+        'end_date': (start_date + timedelta(days=max(appointments - 1, 0) // len(SLOTS))).isoformat(),
+    }
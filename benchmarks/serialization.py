@@ -0,0 +1,155 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def timed(f, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        f()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+# Строки, на которых проверяется экранирование: Latin-1 (U+0080-U+00FF),
+# кириллица, символы вне BMP, управляющие символы
+ESCAPE_SAMPLES = [
+    'ул. «Ленина» café',
+    'д.\u00a05 ¼ µ ÿ \u0080',
+    'Кавычки " и \\ обратный слеш',
+    'эмодзи 🚪',
+    'таб\tперевод\nстроки \u2028',
+]
+
+# Календарь месяца в прежнем виде: ORM-объекты и to_dict() (эталон для сравнения)
+def legacy_month(db, Appointment, User, start_date, end_date):
+    from sqlalchemy import select
+    query = (
+        select(Appointment, User.id, User.username, User.role, User.user_color)
+        .outerjoin(User, User.id == Appointment.user_id)
+        .where(Appointment.date >= start_date, Appointment.date <= end_date)
+        .order_by(Appointment.date, Appointment.time_slot)
+    )
+    calendar_data = {}
+    for appointment, user_id, username, role, user_color in db.session.execute(query):
+        date_str = appointment.date.isoformat()
+        if date_str not in calendar_data:
+            calendar_data[date_str] = {'date': date_str, 'morning': None, 'afternoon': None}
+        appointment_data = appointment.to_dict()
+        if user_id is not None:
+            appointment_data['user'] = {'id': user_id, 'username': username, 'role': role, 'user_color': user_color}
+        calendar_data[date_str][appointment.time_slot] = appointment_data
+    return list(calendar_data.values())
+
+# Проверка, что сериализация по колонкам (src/services/serializers.py) дает
+# те же байты ответа, что и to_dict(), для stdlib и orjson, и замер выигрыша.
+def main():
+    parser = argparse.ArgumentParser(description='Verify and time column-projected serializers')
+    parser.add_argument('--appointments', type=int, default=2000)
+    parser.add_argument('--notifications', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault('APP_CONFIG', 'sqlite')
+        os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tmp, 'serialization.db'))
+        sys.path.insert(0, ROOT)
+
+        from flask.json.provider import DefaultJSONProvider
+        from main import create_app
+        from src.models.user import db, User
+        from src.models.appointment import Appointment, AppointmentTombstone, Notification
+        from src.services import calendar
+        from src.services.json_provider import OrjsonProvider, orjson
+        from src.services.serializers import (
+            APPOINTMENT_COLUMNS, NOTIFICATION_COLUMNS, TOMBSTONE_COLUMNS, USER_COLUMNS,
+            appointment_row, notification_row, tombstone_row, user_row
+        )
+        from benchmarks.seed import seed_database
+
+        app = create_app()
+        with app.app_context():
+            dataset = seed_database(20, args.appointments, args.notifications)
+            # Пустые и не-ASCII значения, удаления для /appointments/changes
+            db.session.add(Appointment(user_id=1, date=date(1999, 1, 1), time_slot='morning', door_type='entrance',
+                                       comment='Кавычки " и \\ обратный слеш, эмодзи 🚪', invoice_number=None,
+                                       address=None, created_at=None, updated_at=None))
+            db.session.add(AppointmentTombstone(appointment_id=99999, date=date(1999, 1, 2), door_type='interior'))
+            db.session.commit()
+
+            start = date.fromisoformat(dataset['start_date'])
+            end = calendar.month_end(start)
+            cases = {
+                'appointments': (
+                    lambda: {'appointments': [a.to_dict() for a in Appointment.query.order_by(Appointment.date, Appointment.id)]},
+                    lambda: {'appointments': [appointment_row(r) for r in Appointment.query.with_entities(*APPOINTMENT_COLUMNS).order_by(Appointment.date, Appointment.id)]},
+                ),
+                'changes.deleted': (
+                    lambda: {'deleted': [t.to_dict() for t in AppointmentTombstone.query.order_by(AppointmentTombstone.id)]},
+                    lambda: {'deleted': [tombstone_row(r) for r in AppointmentTombstone.query.with_entities(*TOMBSTONE_COLUMNS).order_by(AppointmentTombstone.id)]},
+                ),
+                'notifications': (
+                    lambda: {'notifications': [n.to_dict() for n in Notification.query.order_by(Notification.id)]},
+                    lambda: {'notifications': [notification_row(r) for r in Notification.query.with_entities(*NOTIFICATION_COLUMNS).order_by(Notification.id)]},
+                ),
+                'users': (
+                    lambda: {'users': [u.to_dict() for u in User.query.order_by(User.id)]},
+                    lambda: {'users': [user_row(r) for r in db.session.execute(db.select(*USER_COLUMNS).order_by(User.id))]},
+                ),
+                'calendar': (
+                    lambda: {'calendar': legacy_month(db, Appointment, User, start, end)},
+                    lambda: {'calendar': calendar._build_month(start.year, start.month, None)},
+                ),
+            }
+
+            stdlib = DefaultJSONProvider(app)
+            providers = [('stdlib', stdlib)]
+            if orjson is not None:
+                providers.append(('orjson', OrjsonProvider(app)))
+            else:
+                print('orjson is not installed: checking the stdlib provider only')
+
+            failures = 0
+            for name, (legacy, projected) in cases.items():
+                legacy_data, projected_data = legacy(), projected()
+                for provider_name, provider in providers:
+                    for ensure_ascii in (True, False):
+                        stdlib.ensure_ascii = provider.ensure_ascii = ensure_ascii
+                        expected = stdlib.response(legacy_data).get_data()
+                        actual = provider.response(projected_data).get_data()
+                        if actual != expected:
+                            failures += 1
+                            print(f'MISMATCH {name} [{provider_name}, ensure_ascii={ensure_ascii}]')
+                db.session.expunge_all()
+            # Отдельные строки: в общем ответе строка с эмодзи переводит весь ответ на stdlib
+            for sample in ESCAPE_SAMPLES:
+                for provider_name, provider in providers:
+                    for ensure_ascii in (True, False):
+                        stdlib.ensure_ascii = provider.ensure_ascii = ensure_ascii
+                        if provider.response({'value': sample}).get_data() != stdlib.response({'value': sample}).get_data():
+                            failures += 1
+                            print(f'MISMATCH {sample!r} [{provider_name}, ensure_ascii={ensure_ascii}]')
+            for _, provider in providers:
+                provider.ensure_ascii = True
+
+            # Замеры на обычных данных (строка с эмодзи кодируется через stdlib)
+            db.session.execute(db.delete(Appointment).where(Appointment.date == date(1999, 1, 1)))
+            db.session.commit()
+            provider_name, provider = providers[-1]
+            for name, (legacy, projected) in cases.items():
+                before = timed(lambda: (stdlib.response(legacy()), db.session.expunge_all()), args.repeat)
+                after = timed(lambda: provider.response(projected()), args.repeat)
+                print(f'{name:<16} to_dict+stdlib {before:8.2f}ms   columns+{provider_name} {after:8.2f}ms   x{before / after:.1f}')
+
+    if failures:
+        print(f'{failures} mismatches')
+        sys.exit(1)
+    print('Serialized output is byte-identical')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Выполняется в отдельном интерпретаторе: импорт main и первый ответ
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+client = main.application.test_client()
+response = client.get({path!r})
+finished = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (finished - imported) * 1000,
+    'total_ms': (finished - started) * 1000,
+    'status': response.status_code,
+}}))
+'''
+
+def run_probe(path, env):
+    code = PROBE.format(root=ROOT, path=path)
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(samples, key):
+    values = sorted(sample[key] for sample in samples)
+    return {
+        'median': round(statistics.median(values), 2),
+        'min': round(values[0], 2),
+        'max': round(values[-1], 2),
+    }
+
+# Время от импорта main до первого ответа (холодный старт воркера).
+# Запуск на двух ревизиях дает сравнение "до/после".
+def main():
+    parser = argparse.ArgumentParser(description='Measure import-to-first-response time of main.py')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/api/current')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault('APP_CONFIG', 'sqlite')
+        env.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tmp, 'startup.db'))
+        samples = [run_probe(args.path, env) for _ in range(args.runs)]
+
+    result = {
+        'runs': args.runs,
+        'path': args.path,
+        'status': samples[-1]['status'],
+        'import_ms': summarize(samples, 'import_ms'),
+        'first_response_ms': summarize(samples, 'first_response_ms'),
+        'total_ms': summarize(samples, 'total_ms'),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,23 @@
 import sys
 
 import os
+import site
 
-INTERP = os.path.expanduser("/var/www/u1258856/data/door_installer/bin/python")
+VENV = os.path.expanduser("/var/www/u1258856/data/door_installer")
+INTERP = os.path.join(VENV, "bin", "python")
+
+# Если версия Python совпадает с виртуальным окружением, подключаем его
+# site-packages в текущем процессе вместо повторного запуска через execl
+SITE_PACKAGES = os.path.join(
+    VENV, "lib", f"python{sys.version_info.major}.{sys.version_info.minor}", "site-packages"
+)
 if sys.executable != INTERP:
-   os.execl(INTERP, INTERP, *sys.argv)
+    if os.path.isdir(SITE_PACKAGES):
+        previous_path = list(sys.path)
+        site.addsitedir(SITE_PACKAGES)
+        sys.path[:] = [path for path in sys.path if path not in previous_path] + previous_path
+    else:
+        os.execl(INTERP, INTERP, *sys.argv)
 
 sys.path.append(os.getcwd())
 
@@ -0,0 +1,66 @@
+import click
+from flask.cli import with_appcontext
+
+from src.models.user import db, User
+from src.migrations import MigrationError, pending_migrations, upgrade_schema
+from src.services.push import deliver_pushes_command
+from src.services.reminders import generate_reminders_command
+from src.services.replicas import sync_replicas_command
+from src.services.retention import purge_notifications_command
+
+# Команды развертывания выполняются один раз, а не при старте каждого воркера:
+#   flask --app main init-db
+#   flask --app main upgrade-schema
+#   flask --app main create-admin --username admin
+
+@click.command('upgrade-schema')
+@click.option('--dry-run', is_flag=True, help='Only list pending migrations')
+@with_appcontext
+def upgrade_schema_command(dry_run):
+    if dry_run:
+        pending = pending_migrations()
+        for version, description, _ in pending:
+            click.echo(f'Pending migration {version}: {description}')
+        if not pending:
+            click.echo('Schema is up to date')
+        return
+    try:
+        applied = upgrade_schema(log=click.echo)
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if not applied:
+        click.echo('Schema is up to date')
+
+@click.command('create-admin')
+@click.option('--username', default='admin', show_default=True)
+@click.password_option()
+@with_appcontext
+def create_admin_command(username, password):
+    if User.query.filter_by(username=username).first():
+        raise click.ClickException(f'User {username} already exists')
+    db.session.add(User(username=username, password=password, role='admin'))
+    db.session.commit()
+    click.echo(f'Created admin {username}')
+
+# Схема + администратор по умолчанию, если администраторов еще нет
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    try:
+        upgrade_schema(log=click.echo)
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if not User.query.filter_by(role='admin').first():
+        db.session.add(User(username='admin', password='admin123', role='admin'))
+        db.session.commit()
+        click.echo('Created default admin (admin / admin123). Change the password!')
+    click.echo('Database initialized')
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(upgrade_schema_command)
+    app.cli.add_command(create_admin_command)
+    app.cli.add_command(generate_reminders_command)
+    app.cli.add_command(deliver_pushes_command)
+    app.cli.add_command(purge_notifications_command)
+    app.cli.add_command(sync_replicas_command)
@@ -0,0 +1,160 @@
+import os
+
+from sqlalchemy.engine import make_url
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+# Базовые настройки; значения переопределяются переменными окружения.
+# Секреты в коде не хранятся: DATABASE_URL и SECRET_KEY обязательны в production.
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Реплики только для чтения через запятую; GET-запросы читают с них.
+    # После записи пользователь STICKY_SECONDS секунд читает с основной БД.
+    SQLALCHEMY_REPLICA_URIS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_STICKY_SECONDS = env_int('REPLICA_STICKY_SECONDS', 10)
+    
+    # Пул соединений (на один воркер Passenger)
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 5)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 10)
+    # Меньше wait_timeout MySQL, чтобы не получать соединения, закрытые сервером
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 280)
+    DB_POOL_PRE_PING = env_bool('DB_POOL_PRE_PING', True)
+    
+    REMINDER_SCHEDULER_ENABLED = env_bool('REMINDER_SCHEDULER', False)
+    REMINDER_SCHEDULER_INTERVAL = env_int('REMINDER_SCHEDULER_INTERVAL', 900)
+    # Сколько секунд процесс доверяет прочитанной версии учетных данных
+    AUTH_VERSION_TTL = env_int('AUTH_VERSION_TTL', 30)
+    
+    # Инструментирование запросов: заголовок Server-Timing и порог медленного запроса (0 - выкл.)
+    SERVER_TIMING_ENABLED = env_bool('SERVER_TIMING', False)
+    SLOW_REQUEST_MS = env_int('SLOW_REQUEST_MS', 1000)
+    
+    # Общий кэш (календарь, список пользователей): 'memory' - в процессе,
+    # 'sqlite' - файл на сервере, общий для воркеров (CACHE_URL - путь),
+    # 'redis' - CACHE_URL вида redis://localhost:6379/0
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_URL = os.environ.get('CACHE_URL', '')
+    CACHE_MAX_ENTRIES = env_int('CACHE_MAX_ENTRIES', 1024)
+    CACHE_DEFAULT_TTL = env_int('CACHE_DEFAULT_TTL', 300)
+    
+    # Объединение одинаковых вычислений между процессами через lock в общем кэше
+    COALESCE_CROSS_PROCESS = env_bool('COALESCE_CROSS_PROCESS', False)
+    COALESCE_LOCK_TTL = env_int('COALESCE_LOCK_TTL', 10)
+    COALESCE_WAIT = env_int('COALESCE_WAIT', 5)
+    
+    # Хранение уведомлений (flask --app main purge-notifications): прочитанные
+    # старше READ_DAYS, непрочитанные старше UNREAD_DAYS (0 - не удалять);
+    # перед удалением копия в таблицу notification_archive или NDJSON-файл
+    NOTIFICATION_RETENTION_READ_DAYS = env_int('NOTIFICATION_RETENTION_READ_DAYS', 90)
+    NOTIFICATION_RETENTION_UNREAD_DAYS = env_int('NOTIFICATION_RETENTION_UNREAD_DAYS', 365)
+    NOTIFICATION_RETENTION_CHUNK = env_int('NOTIFICATION_RETENTION_CHUNK', 1000)
+    NOTIFICATION_ARCHIVE = os.environ.get('NOTIFICATION_ARCHIVE', 'table')
+    NOTIFICATION_ARCHIVE_DIR = os.environ.get('NOTIFICATION_ARCHIVE_DIR', 'archive')
+    
+    # JSON: orjson, если установлен ('stdlib' - всегда стандартный json);
+    # кириллица отдается в UTF-8, JSON_ENSURE_ASCII=1 - как \uXXXX через stdlib
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson')
+    JSON_ENSURE_ASCII = env_bool('JSON_ENSURE_ASCII', False)
+    
+    # Web Push: отправитель ('webpush' через pywebpush, 'http' для локального stub-сервиса, 'stub')
+    PUSH_SENDER = os.environ.get('PUSH_SENDER', 'webpush')
+    PUSH_VAPID_PUBLIC_KEY = os.environ.get('PUSH_VAPID_PUBLIC_KEY', '')
+    PUSH_VAPID_PRIVATE_KEY = os.environ.get('PUSH_VAPID_PRIVATE_KEY', '')
+    PUSH_VAPID_SUBJECT = os.environ.get('PUSH_VAPID_SUBJECT', 'mailto:admin@localhost')
+    PUSH_TTL = env_int('PUSH_TTL', 86400)
+    PUSH_BATCH_SIZE = env_int('PUSH_BATCH_SIZE', 100)
+    PUSH_CONCURRENCY = env_int('PUSH_CONCURRENCY', 8)
+    PUSH_MAX_ATTEMPTS = env_int('PUSH_MAX_ATTEMPTS', 5)
+    PUSH_WORKER_ENABLED = env_bool('PUSH_WORKER', False)
+    PUSH_WORKER_INTERVAL = env_int('PUSH_WORKER_INTERVAL', 30)
+    # Домены push-сервисов браузеров (Chrome, Firefox, Safari, Edge), на которые разрешена отправка
+    PUSH_ALLOWED_HOSTS = [host.strip().lower() for host in os.environ.get(
+        'PUSH_ALLOWED_HOSTS',
+        'fcm.googleapis.com,updates.push.services.mozilla.com,push.apple.com,notify.windows.com'
+    ).split(',') if host.strip()]
+    # Отправленные и окончательно не доставленные сообщения удаляются задачей purge-notifications
+    PUSH_RETENTION_DAYS = env_int('PUSH_RETENTION_DAYS', 7)
+    
+    # /api/events: журнал change_events (последние BUFFER_SIZE событий),
+    # который один поток процесса опрашивает раз в POLL_INTERVAL секунд.
+    # Поток держит поток воркера открытым, поэтому включается явно
+    # (EVENT_STREAM=1) там, где у воркеров есть потоки; иначе ответ 204.
+    EVENT_STREAM_ENABLED = env_bool('EVENT_STREAM', False)
+    EVENT_BUFFER_SIZE = env_int('EVENT_BUFFER_SIZE', 1000)
+    EVENT_POLL_INTERVAL = env_int('EVENT_POLL_INTERVAL', 2)
+
+class ProductionConfig(Config):
+    pass
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev')
+    SERVER_TIMING_ENABLED = env_bool('SERVER_TIMING', True)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///door_installing.db')
+
+# SQLite-профиль для тестов и бенчмарков
+class SQLiteConfig(Config):
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///door_installing_test.db')
+    DB_POOL_PRE_PING = False
+
+PROFILES = {
+    'production': ProductionConfig,
+    'development': DevelopmentConfig,
+    'sqlite': SQLiteConfig,
+}
+
+def load_config(profile=None):
+    profile = profile or os.environ.get('APP_CONFIG', 'production')
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown config profile: {profile}. Use one of: {", ".join(PROFILES)}')
+    return PROFILES[profile]
+
+# Параметры create_engine для выбранной БД (uri - реплика, по умолчанию основная)
+def engine_options(config, uri=None):
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    
+    # SQLite в памяти использует SingletonThreadPool без настроек размера
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    
+    from src.services.pool_metrics import InstrumentedQueuePool
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    })
+    return options
+
+# Настройки без значения по умолчанию: приложение не стартует без них
+REQUIRED_SETTINGS = {
+    'SECRET_KEY': 'SECRET_KEY',
+    'SQLALCHEMY_DATABASE_URI': 'DATABASE_URL',
+}
+
+def configure_app(app, profile=None):
+    app.config.from_object(load_config(profile))
+    missing = [env for key, env in REQUIRED_SETTINGS.items() if not app.config.get(key)]
+    if missing:
+        raise RuntimeError(f'Required environment variables are not set: {", ".join(missing)}')
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    
+    from src.services.replicas import replica_binds
+    binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+    for key, options in replica_binds(app.config, engine_options).items():
+        binds.setdefault(key, options)
@@ -0,0 +1,165 @@
+from datetime import datetime
+
+from sqlalchemy import Index, MetaData, UniqueConstraint, func, inspect, select, text
+
+from src.models.user import db, User
+from src.models.appointment import Appointment, AppointmentTombstone, Notification, NotificationArchive
+from src.models.event import ChangeEvent
+from src.models.push import PushMessage, PushSubscription
+from src.models.version import ChangeVersion
+
+# Версионированные миграции схемы. Каждая миграция идемпотентна: на новой
+# базе, созданной create_all, она ничего не меняет.
+MIGRATIONS = []
+
+# Миграцию нельзя применить без ручного вмешательства (данные противоречат схеме)
+class MigrationError(Exception):
+    pass
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+    
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(255), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Таблицы первой версии, до миграций: те же колонки, но без индексов и
+# uq_appointments_slot. Нужна для проверки пути обновления рабочей базы.
+BASELINE_TABLES = ('users', 'appointments', 'notifications')
+
+def create_baseline_schema(connection):
+    metadata = MetaData()
+    for name in BASELINE_TABLES:
+        table = db.metadata.tables[name].to_metadata(metadata)
+        table.indexes.clear()
+        for constraint in list(table.constraints):
+            if isinstance(constraint, UniqueConstraint) and constraint.name == 'uq_appointments_slot':
+                table.constraints.remove(constraint)
+    metadata.create_all(connection)
+
+def migration(version, description):
+    def decorator(f):
+        MIGRATIONS.append((version, description, f))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return f
+    return decorator
+
+def _has_unique(inspector, table, columns):
+    columns = list(columns)
+    for constraint in inspector.get_unique_constraints(table):
+        if constraint['column_names'] == columns:
+            return True
+    for index in inspector.get_indexes(table):
+        if index.get('unique') and index['column_names'] == columns:
+            return True
+    return False
+
+# Index строится на копии таблицы: Index на колонках модели добавился бы в
+# Model.__table__.indexes, и следующий create_all в этом процессе создал бы
+# индекс второй раз
+def _create_index(connection, name, table, *columns, unique=False):
+    detached = table.to_metadata(MetaData())
+    Index(name, *(detached.c[column] for column in columns), unique=unique).create(connection, checkfirst=True)
+
+@migration(1, 'Create missing tables')
+def create_tables(connection):
+    db.metadata.create_all(connection)
+
+# Слоты, занятые несколькими записями (до уникального индекса такие записи
+# создавала гонка бронирования): [(date, time_slot, door_type, [id, ...])]
+def find_duplicate_slots(connection):
+    appointments = Appointment.__table__.c
+    slot = (appointments.date, appointments.time_slot, appointments.door_type)
+    duplicates = connection.execute(
+        select(*slot).group_by(*slot).having(func.count() > 1).order_by(*slot)
+    ).all()
+    result = []
+    for day, time_slot, door_type in duplicates:
+        ids = connection.execute(
+            select(appointments.id)
+            .where(appointments.date == day, appointments.time_slot == time_slot,
+                   appointments.door_type == door_type)
+            .order_by(appointments.id)
+        ).scalars().all()
+        result.append((day, time_slot, door_type, ids))
+    return result
+
+@migration(2, 'Unique slot index on appointments (date, time_slot, door_type)')
+def add_slot_unique_index(connection):
+    if not _has_unique(inspect(connection), 'appointments', ['date', 'time_slot', 'door_type']):
+        # Записи не удаляются автоматически: какую из двойных броней оставить,
+        # решает администратор (удалить или перенести лишние и повторить)
+        duplicates = find_duplicate_slots(connection)
+        if duplicates:
+            lines = [f'  {day} {time_slot} {door_type}: appointments {", ".join(map(str, ids))}'
+                     for day, time_slot, door_type, ids in duplicates]
+            raise MigrationError(
+                f'{len(duplicates)} slots are booked more than once; resolve them before '
+                'creating uq_appointments_slot:\n' + '\n'.join(lines)
+            )
+        _create_index(connection, 'uq_appointments_slot', Appointment.__table__,
+                      'date', 'time_slot', 'door_type', unique=True)
+
+@migration(3, 'Index on appointments.updated_at for delta sync')
+def add_updated_at_index(connection):
+    _create_index(connection, 'ix_appointments_updated_at', Appointment.__table__, 'updated_at')
+
+@migration(4, 'Create change_versions table for conditional GET')
+def create_change_versions(connection):
+    ChangeVersion.__table__.create(connection, checkfirst=True)
+
+@migration(5, 'Create push_subscriptions and push_messages tables')
+def create_push_tables(connection):
+    PushSubscription.__table__.create(connection, checkfirst=True)
+    PushMessage.__table__.create(connection, checkfirst=True)
+
+@migration(6, 'Indexes for date range, notification list, reminder dedupe and role lookups')
+def add_query_indexes(connection):
+    _create_index(connection, 'ix_appointments_date_door_type', Appointment.__table__, 'date', 'door_type')
+    _create_index(connection, 'ix_notifications_user_id_created_at', Notification.__table__, 'user_id', 'created_at')
+    _create_index(connection, 'ix_notifications_appointment_id_user_id', Notification.__table__,
+                  'appointment_id', 'user_id')
+    _create_index(connection, 'ix_users_role', User.__table__, 'role')
+
+@migration(7, 'Create notification_archive table for the retention job')
+def create_notification_archive(connection):
+    NotificationArchive.__table__.create(connection, checkfirst=True)
+
+@migration(8, 'change_seq on appointments and tombstones for the changes cursor')
+def add_change_seq(connection):
+    inspector = inspect(connection)
+    for table in (Appointment.__table__, AppointmentTombstone.__table__):
+        if 'change_seq' not in {column['name'] for column in inspector.get_columns(table.name)}:
+            # Существующие строки получают 0; старые курсоры недействительны,
+            # клиенты синхронизируются заново без since
+            connection.execute(text(
+                f'ALTER TABLE {table.name} ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0'
+            ))
+    _create_index(connection, 'ix_appointments_change_seq_id', Appointment.__table__, 'change_seq', 'id')
+    _create_index(connection, 'ix_appointment_tombstones_change_seq_id', AppointmentTombstone.__table__,
+                  'change_seq', 'id')
+
+@migration(9, 'Create change_events table shared by /api/events streams')
+def create_change_events(connection):
+    ChangeEvent.__table__.create(connection, checkfirst=True)
+
+def applied_versions():
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    return set(db.session.execute(select(SchemaMigration.version)).scalars())
+
+def pending_migrations():
+    applied = applied_versions()
+    return [item for item in MIGRATIONS if item[0] not in applied]
+
+# Применяет недостающие миграции; каждая - в отдельной транзакции
+def upgrade_schema(log=print):
+    applied = []
+    for version, description, f in pending_migrations():
+        with db.engine.begin() as connection:
+            f(connection)
+            connection.execute(SchemaMigration.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        log(f'Applied migration {version}: {description}')
+        applied.append(version)
+    return applied
@@ -4,6 +4,15 @@ from src.models.user import db, User
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        # Один слот (дата, время, тип дверей) может быть занят только одной записью
+        db.UniqueConstraint('date', 'time_slot', 'door_type', name='uq_appointments_slot'),
+        # Диапазон дат с фильтром по типу дверей (календарь, список, доступность).
+        # Отдельный индекс по date не нужен: его заменяет префикс этого индекса.
+        db.Index('ix_appointments_date_door_type', 'date', 'door_type'),
+        # Курсор /appointments/changes
+        db.Index('ix_appointments_change_seq_id', 'change_seq', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -14,8 +23,10 @@ class Appointment(db.Model):
     invoice_number = db.Column(db.String(50), nullable=True)
     address = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     is_weekend = db.Column(db.Boolean, default=False) # Переименовано с is_holiday на is_weekend
+    # Номер изменения (версия области appointments в транзакции изменения)
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Добавьте эту строку:
     user = db.relationship('User', backref='appointments', lazy=True)
@@ -36,8 +47,37 @@ class Appointment(db.Model):
         }
 
 
+class AppointmentTombstone(db.Model):
+    __tablename__ = 'appointment_tombstones'
+    __table_args__ = (
+        db.Index('ix_appointment_tombstones_change_seq_id', 'change_seq', 'id'),
+    )
+    
+    # Запись об удалении (или смене типа дверей) для инкрементальной синхронизации
+    id = db.Column(db.Integer, primary_key=True)
+    appointment_id = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    door_type = db.Column(db.String(20), nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    def to_dict(self):
+        return {
+            'id': self.appointment_id,
+            'date': self.date.isoformat() if self.date else None,
+            'door_type': self.door_type,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
+
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Список уведомлений пользователя по created_at (keyset-пагинация)
+        db.Index('ix_notifications_user_id_created_at', 'user_id', 'created_at'),
+        # Проверка "напоминание уже создано" в generate_reminders
+        db.Index('ix_notifications_appointment_id_user_id', 'appointment_id', 'user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -46,8 +86,9 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship
-    appointment = db.relationship('Appointment', backref='notifications')
+    # Relationship. Уведомления записи удаляются одним DELETE перед удалением
+    # самой записи (delete_appointment_notifications), ORM их не загружает.
+    appointment = db.relationship('Appointment', backref=db.backref('notifications', passive_deletes=True))
     user = db.relationship('User', backref='notifications')
     
     def to_dict(self):
@@ -60,3 +101,41 @@ class Notification(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+
+class NotificationArchive(db.Model):
+    __tablename__ = 'notification_archive'
+    
+    # Уведомления, удаленные политикой хранения (id - исходный id уведомления).
+    # Без внешних ключей: запись или пользователь могут быть уже удалены.
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    appointment_id = db.Column(db.Integer, nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'appointment_id': self.appointment_id,
+            'message': self.message,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+
+class NotificationCounter(db.Model):
+    __tablename__ = 'notification_counters'
+    
+    # Счетчик непрочитанных уведомлений пользователя
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'unread': self.unread
+        }
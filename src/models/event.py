@@ -0,0 +1,15 @@
+from datetime import datetime
+from src.models.user import db
+
+class ChangeEvent(db.Model):
+    __tablename__ = 'change_events'
+
+    # Журнал событий для /api/events: общий для всех воркеров и cron-задач,
+    # id - курсор Last-Event-ID. Хранятся последние EVENT_BUFFER_SIZE строк.
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(32), nullable=False)
+    data = db.Column(db.Text, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    # Типы дверей через запятую; пусто - событие видно всем
+    door_types = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,16 @@
+from src.models.user import db
+
+class JobLock(db.Model):
+    __tablename__ = 'job_locks'
+
+    # Имя задачи, например 'reminders:2025-05-20'
+    name = db.Column(db.String(100), primary_key=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'locked_until': self.locked_until.isoformat() if self.locked_until else None,
+            'last_completed_at': self.last_completed_at.isoformat() if self.last_completed_at else None
+        }
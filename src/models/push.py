@@ -0,0 +1,56 @@
+from datetime import datetime
+from src.models.user import db
+
+class PushSubscription(db.Model):
+    __tablename__ = 'push_subscriptions'
+    
+    # Подписка Web Push одного браузера/устройства (endpoint уникален)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    endpoint = db.Column(db.String(500), nullable=False, unique=True)
+    p256dh = db.Column(db.String(255), nullable=False)
+    auth = db.Column(db.String(255), nullable=False)
+    user_agent = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_success_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'endpoint': self.endpoint,
+            'user_agent': self.user_agent,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None
+        }
+
+
+class PushMessage(db.Model):
+    __tablename__ = 'push_messages'
+    __table_args__ = (
+        # Выборка очереди: pending-сообщения, срок которых наступил
+        db.Index('ix_push_messages_due', 'status', 'next_attempt_at'),
+    )
+    
+    # Очередь доставки: одно сообщение на подписку
+    id = db.Column(db.Integer, primary_key=True)
+    subscription_id = db.Column(db.Integer, db.ForeignKey('push_subscriptions.id'), nullable=False, index=True)
+    payload = db.Column(db.Text, nullable=False)  # JSON для service-worker.js: title, message, url
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'subscription_id': self.subscription_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
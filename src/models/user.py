@@ -2,16 +2,36 @@ from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
-db = SQLAlchemy()
+from src.services.replicas import RoutingSession
 
-class User(db.Model):
+# db.session выбирает основную БД или реплику (см. src/services/replicas.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Проверки роли; используются и моделью User, и Identity из сессии
+class RoleMixin:
+    def is_admin(self):
+        return self.role == 'admin'
+    
+    def is_manager(self):
+        return self.role == 'manager'
+    
+    def is_installer(self):
+        return self.role in ['installer_entrance', 'installer_interior']
+    
+    def is_entrance_installer(self):
+        return self.role == 'installer_entrance'
+    
+    def is_interior_installer(self):
+        return self.role == 'installer_interior'
+
+class User(RoleMixin, db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=True)
-    role = db.Column(db.String(20), nullable=False)  # 'admin', 'manager', 'installer_entrance', 'installer_interior'
+    role = db.Column(db.String(20), nullable=False, index=True)  # 'admin', 'manager', 'installer_entrance', 'installer_interior'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
     user_color = db.Column(db.String(7), nullable=True, default='#3498db') # Default color
@@ -29,21 +49,6 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
-    def is_admin(self):
-        return self.role == 'admin'
-    
-    def is_manager(self):
-        return self.role == 'manager'
-    
-    def is_installer(self):
-        return self.role in ['installer_entrance', 'installer_interior']
-    
-    def is_entrance_installer(self):
-        return self.role == 'installer_entrance'
-    
-    def is_interior_installer(self):
-        return self.role == 'installer_interior'
-    
     def to_dict(self):
         return {
             'id': self.id,
@@ -55,3 +60,12 @@ class User(db.Model):
             'user_color': self.user_color # Добавлено
         }
 
+
+
+class UserAuthVersion(db.Model):
+    __tablename__ = 'user_auth_versions'
+    
+    # Версия учетных данных: увеличивается при смене роли, пароля и удалении.
+    # Без внешнего ключа, чтобы запись пережила удаление пользователя.
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,15 @@
+from src.models.user import db
+
+class ChangeVersion(db.Model):
+    __tablename__ = 'change_versions'
+    
+    # Версия области данных ('calendar:2025-05', 'appointments', 'notifications:7'),
+    # увеличивается в той же транзакции, что и изменение данных
+    scope = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'scope': self.scope,
+            'version': self.version
+        }
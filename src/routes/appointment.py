@@ -1,11 +1,48 @@
-from flask import Blueprint, request, jsonify, session
-from src.models.appointment import Appointment, Notification, db
-from src.models.user import User
+import csv
+import io
+
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
+from sqlalchemy import exists, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from src.models.appointment import Appointment, AppointmentTombstone, Notification, db
 from src.routes.user import login_required
+from src.services.identity import current_identity
+from src.services.calendar import (
+    APPOINTMENTS_SCOPE, calendar_versions, get_calendar_days, get_months, month_versions,
+    record_calendar_change, visible_door_type
+)
+from src.services.events import publish_appointment_event, publish_notification_events
+from src.services.notifications import (
+    delete_appointment_notifications, get_unread_count, mark_read, notifications_scope
+)
+from src.services.json_provider import COMPACT_SEPARATORS
+from src.services.pagination import decode_cursor, encode_cursor, parse_limit
+from src.services.serializers import (
+    APPOINTMENT_COLUMNS, NOTIFICATION_COLUMNS, TOMBSTONE_COLUMNS, appointment_row, notification_row, tombstone_row
+)
+from src.services.versions import get_versions, make_etag, not_modified, with_etag
 from datetime import datetime, timedelta
 
 appointment_bp = Blueprint('appointment', __name__)
 
+# Размер пачки строк, читаемых из курсора БД при потоковой выгрузке
+STREAM_BATCH_SIZE = 500
+# Максимальное количество строк в одном импорте
+MAX_IMPORT_ROWS = 5000
+# Максимальное количество id в одном запросе /notifications/read
+MAX_MARK_READ_IDS = 1000
+SLOT_CONSTRAINT = 'uq_appointments_slot'
+SLOT_COLUMNS = 'appointments.date, appointments.time_slot, appointments.door_type'
+
+# Нарушен именно уникальный индекс слота, а не FK или NOT NULL. MySQL называет
+# индекс в тексте ошибки, SQLite перечисляет колонки.
+def is_slot_conflict(error):
+    message = str(error.orig)
+    return SLOT_CONSTRAINT in message or f'UNIQUE constraint failed: {SLOT_COLUMNS}' in message
+
+# Месяцев в одном запросе /calendar?months=...
+MAX_CALENDAR_MONTHS = 12
+
 # Helper function to check if user can access appointment
 def can_access_appointment(user, appointment):
     # Admins and managers can access all appointments
@@ -27,11 +64,55 @@ def can_access_appointment(user, appointment):
     
     return False
 
+# Validate data for a new appointment.
+# Returns (fields, None) or (None, (error message, status code)).
+def validate_new_appointment(user, data):
+    # Validate required fields
+    required_fields = ['date', 'time_slot', 'door_type']
+    for field in required_fields:
+        if field not in data:
+            return None, (f'Missing required field: {field}', 400)
+    
+    # Validate date format
+    try:
+        appointment_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None, ('Invalid date format. Use YYYY-MM-DD', 400)
+    
+    # Validate time slot
+    if data['time_slot'] not in ['morning', 'afternoon']:
+        return None, ('Invalid time_slot. Must be "morning" or "afternoon"', 400)
+    
+    # Validate door type
+    if data['door_type'] not in ['entrance', 'interior']:
+        return None, ('Invalid door_type. Must be "entrance" or "interior"', 400)
+    
+    # Check if user has permission for this door type
+    if user.is_installer():
+        if user.is_entrance_installer() and data['door_type'] != 'entrance':
+            return None, ('You can only create entrance door appointments', 403)
+        if user.is_interior_installer() and data['door_type'] != 'interior':
+            return None, ('You can only create interior door appointments', 403)
+    
+    # Check if invoice number is provided for managers
+    if user.is_manager() and 'invoice_number' not in data:
+        return None, ('Invoice number is required for managers', 400)
+    
+    return {
+        'date': appointment_date,
+        'time_slot': data['time_slot'],
+        'door_type': data['door_type'],
+        'comment': data.get('comment'),
+        'invoice_number': data.get('invoice_number'),
+        'address': data.get('address'),
+        'is_weekend': data.get('is_weekend', False)  # Добавлено поле is_weekend
+    }, None
+
 # Get all appointments (filtered by role and door type)
 @appointment_bp.route('/appointments', methods=['GET'])
 @login_required
 def get_appointments():
-    user = User.query.get(session['user_id'])
+    user = current_identity()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -71,90 +152,306 @@ def get_appointments():
         elif user.is_interior_installer():
             query = query.filter(Appointment.door_type == 'interior')
     
-    # Execute query
-    appointments = query.order_by(Appointment.date).all()
+    # Streaming export: ?format=ndjson или ?stream=1 (JSON), память не зависит от объема
+    output_format = request.args.get('format')
+    if output_format == 'ndjson' or request.args.get('stream') == '1':
+        rows = query.with_entities(*APPOINTMENT_COLUMNS).order_by(
+            Appointment.date, Appointment.id
+        ).yield_per(STREAM_BATCH_SIZE)
+        generate = stream_ndjson(rows) if output_format == 'ndjson' else stream_json(rows)
+        mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'application/json'
+        return Response(stream_with_context(generate), mimetype=mimetype)
+    
+    # ETag по версии всех записей: без изменений - 304 без запроса к appointments
+    version, = get_versions([APPOINTMENTS_SCOPE])
+    etag = make_etag('appointments', sorted(request.args.items(multi=True)), user.role, version)
+    response = not_modified(etag)
+    if response:
+        return response
+    
+    # Keyset pagination on (date, id) when limit or cursor is given
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_date, cursor_id = decode_cursor(cursor)
+                cursor_date = datetime.strptime(cursor_date, '%Y-%m-%d').date()
+                cursor_id = int(cursor_id)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+            # date >= ? отдельным условием, чтобы поиск шел по диапазону индекса
+            query = query.filter(Appointment.date >= cursor_date, or_(
+                Appointment.date > cursor_date, Appointment.id > cursor_id
+            ))
+        
+        appointments = query.with_entities(*APPOINTMENT_COLUMNS).order_by(
+            Appointment.date, Appointment.id
+        ).limit(limit + 1).all()
+        next_cursor = None
+        if len(appointments) > limit:
+            appointments = appointments[:limit]
+            next_cursor = encode_cursor([appointments[-1].date.isoformat(), appointments[-1].id])
+        
+        return with_etag(jsonify({
+            'appointments': [appointment_row(appointment) for appointment in appointments],
+            'next_cursor': next_cursor
+        }), etag), 200
+    
+    # Execute query (только колонки, без ORM-объектов)
+    appointments = query.with_entities(*APPOINTMENT_COLUMNS).order_by(Appointment.date).all()
     
     # Return results
-    return jsonify({
-        'appointments': [appointment.to_dict() for appointment in appointments]
-    }), 200
+    return with_etag(jsonify({
+        'appointments': [appointment_row(appointment) for appointment in appointments]
+    }), etag), 200
 
-# Create a new appointment
-@appointment_bp.route('/appointments', methods=['POST'])
+def stream_ndjson(rows):
+    dumps = current_app.json.dumps
+    for appointment in rows:
+        yield dumps(appointment_row(appointment), separators=COMPACT_SEPARATORS) + '\n'
+
+# Тот же формат, что и у обычного ответа: {"appointments": [...]}
+def stream_json(rows):
+    dumps = current_app.json.dumps
+    yield '{"appointments":['
+    separator = ''
+    for appointment in rows:
+        yield separator + dumps(appointment_row(appointment), separators=COMPACT_SEPARATORS)
+        separator = ','
+    yield ']}'
+
+# Get appointment changes since a sync cursor (deletions are returned as tombstones).
+# Клиент применяет сначала deleted, затем appointments.
+@appointment_bp.route('/appointments/changes', methods=['GET'])
 @login_required
-def create_appointment():
-    user = User.query.get(session['user_id'])
+def get_appointment_changes():
+    user = current_identity()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    data = request.get_json()
-    
-    # Validate required fields
-    required_fields = ['date', 'time_slot', 'door_type']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
-    
-    # Validate date format
     try:
-        appointment_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+        limit = parse_limit(request.args.get('limit'), default=500, maximum=1000)
     except ValueError:
-        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        return jsonify({'error': 'Invalid limit'}), 400
     
-    # Validate time slot
-    if data['time_slot'] not in ['morning', 'afternoon']:
-        return jsonify({'error': 'Invalid time_slot. Must be "morning" or "afternoon"'}), 400
-    
-    # Validate door type
-    if data['door_type'] not in ['entrance', 'interior']:
-        return jsonify({'error': 'Invalid door_type. Must be "entrance" or "interior"'}), 400
+    # Курсор: (change_seq, id) последней записи и последнего tombstone.
+    # change_seq растет в порядке commit (см. record_calendar_change), поэтому
+    # транзакция, зафиксированная после опроса, не окажется позади курсора.
+    since = request.args.get('since')
+    if since:
+        try:
+            seq, last_id, tombstone_seq, last_tombstone_id = map(int, decode_cursor(since))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        # Первая синхронизация: все записи, старые удаления не нужны
+        seq, last_id = -1, 0
+        tombstone_seq, last_tombstone_id = db.session.execute(
+            select(func.max(AppointmentTombstone.change_seq), func.max(AppointmentTombstone.id))
+        ).one()
+        tombstone_seq, last_tombstone_id = tombstone_seq or 0, last_tombstone_id or 0
+    
+    door_type = visible_door_type(user)
+    
+    query = Appointment.query.with_entities(*APPOINTMENT_COLUMNS, Appointment.change_seq).filter(
+        Appointment.change_seq >= seq,
+        or_(Appointment.change_seq > seq, Appointment.id > last_id)
+    )
+    if door_type:
+        query = query.filter(Appointment.door_type == door_type)
+    appointments = query.order_by(Appointment.change_seq, Appointment.id).limit(limit + 1).all()
     
-    # Check if user has permission for this door type
-    if user.is_installer():
-        if user.is_entrance_installer() and data['door_type'] != 'entrance':
-            return jsonify({'error': 'You can only create entrance door appointments'}), 403
-        if user.is_interior_installer() and data['door_type'] != 'interior':
-            return jsonify({'error': 'You can only create interior door appointments'}), 403
+    tombstones_query = AppointmentTombstone.query.with_entities(
+        *TOMBSTONE_COLUMNS, AppointmentTombstone.change_seq
+    ).filter(
+        AppointmentTombstone.change_seq >= tombstone_seq,
+        or_(AppointmentTombstone.change_seq > tombstone_seq, AppointmentTombstone.id > last_tombstone_id)
+    )
+    if door_type:
+        tombstones_query = tombstones_query.filter(AppointmentTombstone.door_type == door_type)
+    # Tombstone смены типа не нужен клиенту, который видит запись сейчас
+    # (администратор, или тип вернули обратно): запись придет в appointments
+    visible = exists().where(Appointment.id == AppointmentTombstone.appointment_id)
+    if door_type:
+        visible = visible.where(Appointment.door_type == door_type)
+    tombstones = tombstones_query.filter(~visible).order_by(
+        AppointmentTombstone.change_seq, AppointmentTombstone.id
+    ).limit(limit + 1).all()
+    
+    # Страница - согласованный срез: оба потока обрезаются по общему change_seq,
+    # иначе tombstone из отставшего потока пришел бы после более нового состояния записи
+    has_more = len(appointments) > limit or len(tombstones) > limit
+    if has_more:
+        bound = min(rows[limit - 1].change_seq for rows in (appointments, tombstones) if len(rows) > limit)
+        appointments = [row for row in appointments[:limit] if row.change_seq <= bound]
+        tombstones = [row for row in tombstones[:limit] if row.change_seq <= bound]
+    
+    if appointments:
+        seq, last_id = appointments[-1].change_seq, appointments[-1].id
+    if tombstones:
+        tombstone_seq, last_tombstone_id = tombstones[-1].change_seq, tombstones[-1].id
     
-    # Check if invoice number is provided for managers
-    if user.is_manager() and 'invoice_number' not in data:
-        return jsonify({'error': 'Invoice number is required for managers'}), 400
+    return jsonify({
+        'appointments': [appointment_row(appointment) for appointment in appointments],
+        'deleted': [tombstone_row(tombstone) for tombstone in tombstones],
+        'cursor': encode_cursor([seq, last_id, tombstone_seq, last_tombstone_id]),
+        'has_more': has_more
+    }), 200
+
+# Create a new appointment
+@appointment_bp.route('/appointments', methods=['POST'])
+@login_required
+def create_appointment():
+    user = current_identity()
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
     
-    # Check if the time slot is available
-    existing_appointment = Appointment.query.filter_by(
-        date=appointment_date,
-        time_slot=data['time_slot'],
-        door_type=data['door_type']
-    ).first()
+    data = request.get_json()
     
-    if existing_appointment:
-        return jsonify({'error': 'This time slot is already booked'}), 400
+    fields, error = validate_new_appointment(user, data)
+    if error:
+        message, status = error
+        return jsonify({'error': message}), status
     
     # Create new appointment
-    appointment = Appointment(
-        user_id=user.id,
-        date=appointment_date,
-        time_slot=data['time_slot'],
-        door_type=data['door_type'],
-        comment=data.get('comment'),
-        invoice_number=data.get('invoice_number'),
-        address=data.get('address'),
-        is_weekend=data.get('is_weekend', False)  # Добавлено поле is_weekend
-    )
+    appointment = Appointment(user_id=user.id, **fields)
     
+    # Занятость слота проверяет уникальный индекс uq_appointments_slot
     db.session.add(appointment)
-    db.session.commit()
+    try:
+        db.session.flush()
+        appointment.change_seq = record_calendar_change([appointment.date])
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_slot_conflict(e):
+            raise
+        return jsonify({'error': 'This time slot is already booked'}), 400
+    publish_appointment_event('created', appointment.id, appointment.date, appointment.door_type)
     
     return jsonify({
         'message': 'Appointment created successfully',
         'appointment': appointment.to_dict()
     }), 201
 
+# Bulk import of appointments from a JSON array or CSV.
+# Все строки проверяются по правилам create_appointment, затем валидные
+# вставляются одним INSERT в одной транзакции. С ?atomic=1 при любой
+# ошибке не вставляется ничего.
+@appointment_bp.route('/appointments/import', methods=['POST'])
+@login_required
+def import_appointments():
+    user = current_identity()
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    try:
+        items = read_import_items()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not items:
+        return jsonify({'error': 'No appointments provided'}), 400
+    if len(items) > MAX_IMPORT_ROWS:
+        return jsonify({'error': f'Too many rows. Maximum is {MAX_IMPORT_ROWS}'}), 400
+    
+    results = []
+    valid_rows = []
+    for row_number, data in enumerate(items, start=1):
+        if not isinstance(data, dict):
+            results.append({'row': row_number, 'status': 'error', 'error': 'Row must be an object'})
+            continue
+        fields, error = validate_new_appointment(user, data)
+        if error:
+            results.append({'row': row_number, 'status': 'error', 'error': error[0]})
+            continue
+        fields['user_id'] = user.id
+        results.append({'row': row_number, 'status': 'created'})
+        valid_rows.append((len(results) - 1, fields))
+    
+    # Занятые слоты по всем датам пакета - одним запросом
+    dates = {fields['date'] for _, fields in valid_rows}
+    booked = set()
+    if dates:
+        booked = set(db.session.execute(
+            select(Appointment.date, Appointment.time_slot, Appointment.door_type)
+            .where(Appointment.date.in_(dates))
+        ).tuples())
+    
+    rows = []
+    for result_index, fields in valid_rows:
+        slot = (fields['date'], fields['time_slot'], fields['door_type'])
+        if slot in booked:
+            # Слот занят в БД или предыдущей строкой этого же пакета
+            results[result_index] = {'row': results[result_index]['row'], 'status': 'error',
+                                     'error': 'This time slot is already booked'}
+            continue
+        booked.add(slot)
+        rows.append(fields)
+    
+    errors = sum(1 for result in results if result['status'] == 'error')
+    atomic = request.args.get('atomic') == '1'
+    if atomic and errors:
+        for result in results:
+            if result['status'] == 'created':
+                result['status'] = 'skipped'
+        return jsonify({'created': 0, 'errors': errors, 'results': results}), 400
+    
+    if rows:
+        try:
+            change_seq = record_calendar_change(dates)
+            db.session.execute(insert(Appointment), [dict(row, change_seq=change_seq) for row in rows])
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if not is_slot_conflict(e):
+                raise
+            # Слот заняли параллельно, пока шел импорт
+            return jsonify({'error': 'Some time slots were booked concurrently. Nothing was imported'}), 409
+        
+        for date, door_type in {(row['date'], row['door_type']) for row in rows}:
+            publish_appointment_event('imported', None, date, door_type)
+    
+    return jsonify({
+        'created': len(rows),
+        'errors': errors,
+        'results': results
+    }), 201 if rows else 400
+
+def read_import_items():
+    content_type = request.mimetype
+    if content_type == 'text/csv' or 'file' in request.files:
+        raw = request.files['file'].read() if 'file' in request.files else request.get_data()
+        try:
+            text = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValueError('CSV must be UTF-8 encoded')
+        items = []
+        for row in csv.DictReader(io.StringIO(text)):
+            # Пустые ячейки считаем отсутствующими полями
+            item = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            if 'is_weekend' in item:
+                item['is_weekend'] = item['is_weekend'].lower() in ('1', 'true', 'yes', 'да')
+            items.append(item)
+        return items
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('appointments')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of appointments or CSV')
+    return data
+
 # Get a specific appointment
 @appointment_bp.route('/appointments/<int:appointment_id>', methods=['GET'])
 @login_required
 def get_appointment(appointment_id):
-    user = User.query.get(session['user_id'])
+    user = current_identity()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -174,7 +471,7 @@ def get_appointment(appointment_id):
 @appointment_bp.route('/appointments/<int:appointment_id>', methods=['PUT'])
 @login_required
 def update_appointment(appointment_id):
-    user = User.query.get(session['user_id'])
+    user = current_identity()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -187,6 +484,9 @@ def update_appointment(appointment_id):
     if not user.is_admin() and appointment.user_id != user.id:
         return jsonify({'error': 'You do not have permission to update this appointment'}), 403
     
+    previous_date = appointment.date
+    previous_door_type = appointment.door_type
+    tombstone = None
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No data provided'}), 400
@@ -215,6 +515,14 @@ def update_appointment(appointment_id):
             if user.is_interior_installer() and data['door_type'] != 'interior':
                 return jsonify({'error': 'You can only update to interior door type'}), 403
         
+        # Для клиентов, которые больше не видят запись, смена типа - это удаление
+        if data['door_type'] != appointment.door_type:
+            tombstone = AppointmentTombstone(
+                appointment_id=appointment.id,
+                date=previous_date,
+                door_type=appointment.door_type
+            )
+            db.session.add(tombstone)
         appointment.door_type = data['door_type']
     
     # Update other fields
@@ -230,18 +538,21 @@ def update_appointment(appointment_id):
     if 'is_weekend' in data:
         appointment.is_weekend = data['is_weekend']
     
-    # Check if the time slot is available (if date or time_slot changed)
-    if 'date' in data or 'time_slot' in data:
-        existing_appointment = Appointment.query.filter_by(
-            date=appointment.date,
-            time_slot=appointment.time_slot,
-            door_type=appointment.door_type
-        ).filter(Appointment.id != appointment_id).first()
-        
-        if existing_appointment:
-            return jsonify({'error': 'This time slot is already booked'}), 400
-    
-    db.session.commit()
+    # Занятость слота проверяет уникальный индекс uq_appointments_slot
+    try:
+        db.session.flush()
+        change_seq = record_calendar_change([previous_date, appointment.date])
+        for changed in (appointment, tombstone):
+            if changed is not None:
+                changed.change_seq = change_seq
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_slot_conflict(e):
+            raise
+        return jsonify({'error': 'This time slot is already booked'}), 400
+    publish_appointment_event('updated', appointment.id, appointment.date, appointment.door_type,
+                              previous_date, previous_door_type)
     
     return jsonify({
         'message': 'Appointment updated successfully',
@@ -252,7 +563,7 @@ def update_appointment(appointment_id):
 @appointment_bp.route('/appointments/<int:appointment_id>', methods=['DELETE'])
 @login_required
 def delete_appointment(appointment_id):
-    user = User.query.get(session['user_id'])
+    user = current_identity()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -264,8 +575,20 @@ def delete_appointment(appointment_id):
     if not user.is_admin() and appointment.user_id != user.id:
         return jsonify({'error': 'You do not have permission to delete this appointment'}), 403
     
+    appointment_date = appointment.date
+    appointment_door_type = appointment.door_type
+    tombstone = AppointmentTombstone(
+        appointment_id=appointment.id,
+        date=appointment_date,
+        door_type=appointment_door_type
+    )
+    db.session.add(tombstone)
+    notified_users = delete_appointment_notifications([appointment.id])
     db.session.delete(appointment)
+    tombstone.change_seq = record_calendar_change([appointment_date])
     db.session.commit()
+    publish_appointment_event('deleted', appointment_id, appointment_date, appointment_door_type)
+    publish_notification_events(notified_users)
     
     return jsonify({
         'message': 'Appointment deleted successfully'
@@ -275,7 +598,7 @@ def delete_appointment(appointment_id):
 @appointment_bp.route('/calendar', methods=['GET'])
 @login_required
 def get_calendar():
-    user = User.query.get(session['user_id'])
+    user = current_identity()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -284,6 +607,14 @@ def get_calendar():
     end_date = request.args.get('end_date')
     door_type = request.args.get('door_type')
     
+    # Validate door type
+    if door_type and door_type not in ['entrance', 'interior']:
+        return jsonify({'error': 'Invalid door_type. Must be "entrance" or "interior"'}), 400
+    
+    # Несколько месяцев одним запросом: months=2025-04,2025-05,2025-06
+    if request.args.get('months'):
+        return get_calendar_months(user, request.args.get('months'), door_type)
+    
     # Default to current month if not specified
     if not start_date:
         today = datetime.utcnow().date()
@@ -304,66 +635,102 @@ def get_calendar():
         except ValueError:
             return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
     
-    # Build query
-    query = Appointment.query.filter(
-        Appointment.date >= start_date,
-        Appointment.date <= end_date
-    )
-    
-    # Filter by door type
-    if door_type:
-        if door_type not in ['entrance', 'interior']:
-            return jsonify({'error': 'Invalid door_type. Must be "entrance" or "interior"'}), 400
-        query = query.filter(Appointment.door_type == door_type)
-    elif not user.is_admin() and not user.is_manager():
-        # Filter by user role
-        if user.is_entrance_installer():
-            query = query.filter(Appointment.door_type == 'entrance')
-        elif user.is_interior_installer():
-            query = query.filter(Appointment.door_type == 'interior')
-    
-    # Execute query
-    appointments = query.order_by(Appointment.date, Appointment.time_slot).all()
-    
-    # Group appointments by date
-    calendar_data = {}
-    for appointment in appointments:
-        date_str = appointment.date.isoformat()
-        
-        if date_str not in calendar_data:
-            calendar_data[date_str] = {
-                'date': date_str,
-                'morning': None,
-                'afternoon': None
-            }
-        
-        # Add user info to appointment data
-        appointment_data = appointment.to_dict()
-        appointment_user = User.query.get(appointment.user_id)
-        if appointment_user:
-            appointment_data['user'] = {
-                'id': appointment_user.id,
-                'username': appointment_user.username,
-                'role': appointment_user.role,
-                'user_color': appointment_user.user_color  # Добавлено поле цвета пользователя
-            }
-        
-        calendar_data[date_str][appointment.time_slot] = appointment_data
-    
-    return jsonify({
-        'calendar': list(calendar_data.values())
-    }), 200
+    # ETag из версий месяцев проверяется до построения календаря
+    door_filter = visible_door_type(user, door_type)
+    versions = calendar_versions(start_date, end_date)
+    etag = make_etag('calendar', start_date.isoformat(), end_date.isoformat(), door_filter,
+                     sorted(versions.items()))
+    response = not_modified(etag)
+    if response:
+        return response
+    
+    # Данные берутся из помесячного кэша (фильтр по роли учитывается в ключе)
+    calendar_days = get_calendar_days(start_date, end_date, door_filter, versions)
+    
+    return with_etag(jsonify({
+        'calendar': calendar_days
+    }), etag), 200
 
-# Get notifications for current user
+# Ответ {'months': {'YYYY-MM': [day, ...]}}; отсутствующие в кэше месяцы
+# читаются одним запросом и раскладываются по месяцам
+def get_calendar_months(user, months_param, door_type):
+    months = []
+    for value in months_param.split(','):
+        try:
+            month = datetime.strptime(value.strip(), '%Y-%m')
+        except ValueError:
+            return jsonify({'error': 'Invalid months format. Use YYYY-MM,YYYY-MM'}), 400
+        if (month.year, month.month) not in months:
+            months.append((month.year, month.month))
+    if len(months) > MAX_CALENDAR_MONTHS:
+        return jsonify({'error': f'Too many months (max {MAX_CALENDAR_MONTHS})'}), 400
+    
+    door_filter = visible_door_type(user, door_type)
+    versions = month_versions(months)
+    etag = make_etag('calendar-months', door_filter, [(key, versions[key]) for key in months])
+    response = not_modified(etag)
+    if response:
+        return response
+    
+    data = get_months(months, door_filter, versions)
+    return with_etag(jsonify({
+        'months': {f'{year:04d}-{month:02d}': data[(year, month)] for year, month in months}
+    }), etag), 200
+
+# Get notifications for current user (keyset pagination by created_at, id)
 @appointment_bp.route('/notifications', methods=['GET'])
 @login_required
 def get_notifications():
     user_id = session['user_id']
     
-    notifications = Notification.query.filter_by(user_id=user_id).order_by(Notification.created_at.desc()).all()
+    try:
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    # ETag по версии уведомлений пользователя
+    cursor = request.args.get('cursor')
+    version, = get_versions([notifications_scope(user_id)])
+    etag = make_etag('notifications', user_id, cursor, limit, version)
+    response = not_modified(etag)
+    if response:
+        return response
+    
+    query = Notification.query.with_entities(*NOTIFICATION_COLUMNS).filter_by(user_id=user_id)
     
+    if cursor:
+        try:
+            created_at, notification_id = decode_cursor(cursor)
+            created_at = datetime.fromisoformat(created_at)
+            notification_id = int(notification_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(Notification.created_at <= created_at, or_(
+            Notification.created_at < created_at, Notification.id < notification_id
+        ))
+    
+    # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+    notifications = query.order_by(
+        Notification.created_at.desc(), Notification.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        next_cursor = encode_cursor([last.created_at.isoformat(), last.id])
+    
+    return with_etag(jsonify({
+        'notifications': [notification_row(notification) for notification in notifications],
+        'next_cursor': next_cursor
+    }), etag), 200
+
+# Get unread notifications count for current user
+@appointment_bp.route('/notifications/unread_count', methods=['GET'])
+@login_required
+def get_unread_notifications_count():
     return jsonify({
-        'notifications': [notification.to_dict() for notification in notifications]
+        'count': get_unread_count(session['user_id'])
     }), 200
 
 # Mark notification as read
@@ -376,11 +743,61 @@ def mark_notification_read(notification_id):
     if not notification:
         return jsonify({'error': 'Notification not found'}), 404
     
-    notification.is_read = True
-    db.session.commit()
+    # Счетчик уменьшает только запрос, чей UPDATE изменил строку: при
+    # одновременных кликах второй запрос ничего не вычитает
+    if not notification.is_read:
+        mark_read(user_id, Notification.id == notification_id)
+        db.session.commit()
+        db.session.refresh(notification)
     
     return jsonify({
         'message': 'Notification marked as read',
         'notification': notification.to_dict()
     }), 200
 
+# Mark a list of notifications as read: {"ids": [...]} -> {"count": <unread>}
+@appointment_bp.route('/notifications/read', methods=['POST'])
+@login_required
+def mark_notifications_read():
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({'error': 'ids must be a list of notification ids'}), 400
+    if len(ids) > MAX_MARK_READ_IDS:
+        return jsonify({'error': f'Too many ids. Maximum is {MAX_MARK_READ_IDS}'}), 400
+    
+    if ids:
+        mark_read(user_id, Notification.id.in_(set(ids)))
+        db.session.commit()
+    
+    return jsonify({'count': get_unread_count(user_id)}), 200
+
+# Mark everything up to a point as read. Body (optional): {"cursor": "<next_cursor>"}
+# - up to and including that notification, or {"up_to": "<created_at ISO>"};
+# without a bound all notifications are marked read.
+@appointment_bp.route('/notifications/read_all', methods=['POST'])
+@login_required
+def mark_all_notifications_read():
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    
+    conditions = []
+    try:
+        if data.get('cursor'):
+            created_at, notification_id = decode_cursor(data['cursor'])
+            created_at = datetime.fromisoformat(created_at)
+            notification_id = int(notification_id)
+            conditions.append(Notification.created_at <= created_at)
+            conditions.append(or_(Notification.created_at < created_at, Notification.id <= notification_id))
+        elif data.get('up_to'):
+            conditions.append(Notification.created_at <= datetime.fromisoformat(data['up_to']))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid cursor or up_to'}), 400
+    
+    mark_read(user_id, *conditions)
+    db.session.commit()
+    
+    return jsonify({'count': get_unread_count(user_id)}), 200
+
@@ -0,0 +1,132 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import case, func, select
+from src.models.appointment import Appointment, db
+from src.routes.user import login_required
+from src.services.identity import current_identity
+from src.services.cache import versioned_key
+from src.services.calendar import APPOINTMENTS_SCOPE, visible_door_type
+from src.services.coalesce import get_or_compute
+from src.services.versions import get_versions
+from datetime import datetime, timedelta
+
+availability_bp = Blueprint('availability', __name__)
+
+# Биты занятости слотов в маске дня
+SLOT_BITS = {
+    ('morning', 'entrance'): 1,
+    ('afternoon', 'entrance'): 2,
+    ('morning', 'interior'): 4,
+    ('afternoon', 'interior'): 8,
+}
+TIME_SLOTS = ['morning', 'afternoon']
+MAX_RANGE_DAYS = 366
+MAX_FREE_SLOTS = 50
+AVAILABILITY_CACHE_TTL = 60
+
+def parse_date(value, field):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date(), None
+    except (TypeError, ValueError):
+        return None, (jsonify({'error': f'Invalid {field} format. Use YYYY-MM-DD'}), 400)
+
+# Occupancy bitmask per day, computed in SQL. The slot columns are covered
+# by the uq_appointments_slot index, so no appointment rows are hydrated.
+def occupancy_masks(start_date, end_date, door_type=None):
+    mask = func.sum(case(
+        *[((Appointment.time_slot == time_slot) & (Appointment.door_type == slot_door_type), bit)
+          for (time_slot, slot_door_type), bit in SLOT_BITS.items()],
+        else_=0
+    ))
+    query = (
+        select(Appointment.date, mask)
+        .where(Appointment.date >= start_date, Appointment.date <= end_date)
+        .group_by(Appointment.date)
+    )
+    if door_type:
+        query = query.where(Appointment.door_type == door_type)
+    return {day: int(day_mask) for day, day_mask in db.session.execute(query)}
+
+# Маски через общий кэш: ключ - период, тип дверей и версия всех записей,
+# одновременные одинаковые запросы выполняют один SQL-запрос
+def cached_occupancy_masks(start_date, end_date, door_type=None):
+    version, = get_versions([APPOINTMENTS_SCOPE])
+    key = versioned_key(f'availability:{start_date}:{end_date}:{door_type or "all"}', version)
+    return get_or_compute(key, lambda: occupancy_masks(start_date, end_date, door_type), AVAILABILITY_CACHE_TTL)
+
+# Get slot occupancy for a date range
+@availability_bp.route('/availability', methods=['GET'])
+@login_required
+def get_availability():
+    user = current_identity()
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    start_date, error = parse_date(request.args.get('start_date'), 'start_date')
+    if error:
+        return error
+    end_date, error = parse_date(request.args.get('end_date'), 'end_date')
+    if error:
+        return error
+    
+    if end_date < start_date:
+        return jsonify({'error': 'end_date must not be earlier than start_date'}), 400
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        return jsonify({'error': f'Date range must not exceed {MAX_RANGE_DAYS} days'}), 400
+    
+    door_type = request.args.get('door_type')
+    if door_type and door_type not in ['entrance', 'interior']:
+        return jsonify({'error': 'Invalid door_type. Must be "entrance" or "interior"'}), 400
+    
+    masks = cached_occupancy_masks(start_date, end_date, visible_door_type(user, door_type))
+    
+    # В ответ попадают только дни, в которых занят хотя бы один слот
+    return jsonify({
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'bits': {f'{time_slot}_{slot_door_type}': bit for (time_slot, slot_door_type), bit in SLOT_BITS.items()},
+        'days': {day.isoformat(): day_mask for day, day_mask in masks.items()}
+    }), 200
+
+# Find the next free slots for a door type
+@availability_bp.route('/availability/next', methods=['GET'])
+@login_required
+def get_next_free_slots():
+    door_type = request.args.get('door_type')
+    if door_type not in ['entrance', 'interior']:
+        return jsonify({'error': 'Invalid door_type. Must be "entrance" or "interior"'}), 400
+    
+    time_slot = request.args.get('time_slot')
+    if time_slot and time_slot not in TIME_SLOTS:
+        return jsonify({'error': 'Invalid time_slot. Must be "morning" or "afternoon"'}), 400
+    
+    if request.args.get('from'):
+        start_date, error = parse_date(request.args.get('from'), 'from')
+        if error:
+            return error
+    else:
+        start_date = datetime.utcnow().date()
+    
+    try:
+        count = min(max(int(request.args.get('count', 5)), 1), MAX_FREE_SLOTS)
+    except ValueError:
+        return jsonify({'error': 'count must be an integer'}), 400
+    
+    # Один запрос на весь горизонт поиска
+    end_date = start_date + timedelta(days=MAX_RANGE_DAYS - 1)
+    masks = cached_occupancy_masks(start_date, end_date, door_type)
+    
+    free_slots = []
+    day = start_date
+    while day <= end_date and len(free_slots) < count:
+        day_mask = masks.get(day, 0)
+        for slot in ([time_slot] if time_slot else TIME_SLOTS):
+            if not day_mask & SLOT_BITS[(slot, door_type)]:
+                free_slots.append({'date': day.isoformat(), 'time_slot': slot})
+                if len(free_slots) == count:
+                    break
+        day += timedelta(days=1)
+    
+    return jsonify({
+        'door_type': door_type,
+        'slots': free_slots
+    }), 200
@@ -0,0 +1,76 @@
+import json
+import time
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.routes.user import login_required
+from src.services.identity import current_identity
+from src.services.calendar import visible_door_type
+from src.services.events import get_event_hub
+
+events_bp = Blueprint('events', __name__)
+
+HEARTBEAT_INTERVAL = 15
+# Поток закрывается периодически, чтобы не занимать воркер Passenger бесконечно;
+# EventSource переподключается сам и передает Last-Event-ID.
+STREAM_MAX_AGE = 300
+
+def format_sse(event_type, data, event_id=None):
+    message = ''
+    if event_id:
+        message += f'id: {event_id}\n'
+    message += f'event: {event_type}\n'
+    message += f'data: {json.dumps(data, separators=(",", ":"))}\n\n'
+    return message
+
+def is_visible(event, user_id, door_type):
+    if event.user_id is not None:
+        return event.user_id == user_id
+    if event.door_types and door_type:
+        return door_type in event.door_types
+    return True
+
+# Server-Sent Events stream of calendar and notification changes
+@events_bp.route('/events', methods=['GET'])
+@login_required
+def stream_events():
+    # 204 останавливает EventSource без переподключений
+    if not current_app.config['EVENT_STREAM_ENABLED']:
+        return '', 204
+    
+    user = current_identity()
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    # Все нужное берем до начала потока: генератор не обращается к БД
+    user_id = user.id
+    door_type = visible_door_type(user)
+    hub = get_event_hub()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_INTERVAL', HEARTBEAT_INTERVAL)
+    max_age = current_app.config.get('SSE_STREAM_MAX_AGE', STREAM_MAX_AGE)
+    
+    def generate():
+        cursor = last_event_id
+        deadline = time.monotonic() + max_age
+        yield 'retry: 3000\n\n'
+        while time.monotonic() < deadline:
+            events, resync, cursor = hub.wait(cursor, timeout=heartbeat)
+            if resync:
+                yield format_sse('resync', {}, cursor)
+                continue
+            if not events:
+                yield ': heartbeat\n\n'
+                continue
+            sent_id = None
+            for event in events:
+                if is_visible(event, user_id, door_type):
+                    sent_id = event.id
+                    yield format_sse(event.type, event.data, event.id)
+            # Если последние события были не для этого клиента, сдвигаем курсор отдельно
+            if sent_id != cursor:
+                yield f'id: {cursor}\n\n'
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
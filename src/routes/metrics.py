@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from src.routes.user import admin_required
+from src.services.coalesce import coalescing_stats
+from src.services.instrumentation import request_stats
+from src.services.pool_metrics import pool_status
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Database connection pool statistics of this worker process
+@metrics_bp.route('/metrics/pool', methods=['GET'])
+@admin_required
+def get_pool_metrics():
+    return jsonify({'pools': pool_status()}), 200
+
+# Rolling per-endpoint timings (last requests of this worker process)
+@metrics_bp.route('/metrics/requests', methods=['GET'])
+@admin_required
+def get_request_metrics():
+    return jsonify({'endpoints': request_stats(), 'coalescing': coalescing_stats()}), 200
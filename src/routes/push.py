@@ -0,0 +1,56 @@
+from flask import Blueprint, current_app, request, jsonify, session
+from sqlalchemy import delete
+from src.models.user import db
+from src.models.push import PushMessage, PushSubscription
+from src.routes.user import login_required
+from src.services.push import is_allowed_endpoint
+
+push_bp = Blueprint('push', __name__)
+
+# Публичный VAPID-ключ для PushManager.subscribe в notifications.js
+@push_bp.route('/notifications/push_key', methods=['GET'])
+@login_required
+def get_push_key():
+    return jsonify({'public_key': current_app.config['PUSH_VAPID_PUBLIC_KEY'] or None}), 200
+
+# Сохранение подписки браузера (PushSubscription.toJSON()).
+# Endpoint уникален: повторная подписка обновляет ключи и владельца.
+@push_bp.route('/notifications/subscribe', methods=['POST'])
+@login_required
+def subscribe():
+    data = request.get_json(silent=True) or {}
+    endpoint = data.get('endpoint')
+    keys = data.get('keys') or {}
+    
+    if not isinstance(endpoint, str) or len(endpoint) > 500 or not is_allowed_endpoint(endpoint):
+        return jsonify({'error': 'Invalid endpoint'}), 400
+    if not isinstance(keys, dict) or not keys.get('p256dh') or not keys.get('auth'):
+        return jsonify({'error': 'Missing subscription keys'}), 400
+    
+    subscription = PushSubscription.query.filter_by(endpoint=endpoint).first()
+    created = subscription is None
+    if created:
+        subscription = PushSubscription(endpoint=endpoint)
+        db.session.add(subscription)
+    subscription.user_id = session['user_id']
+    subscription.p256dh = keys['p256dh'][:255]
+    subscription.auth = keys['auth'][:255]
+    subscription.user_agent = (request.user_agent.string or '')[:255] or None
+    db.session.commit()
+    
+    return jsonify({'success': True, 'subscription': subscription.to_dict()}), 201 if created else 200
+
+@push_bp.route('/notifications/unsubscribe', methods=['POST'])
+@login_required
+def unsubscribe():
+    data = request.get_json(silent=True) or {}
+    subscription = PushSubscription.query.filter_by(
+        endpoint=data.get('endpoint'), user_id=session['user_id']
+    ).first()
+    if not subscription:
+        return jsonify({'error': 'Subscription not found'}), 404
+    
+    db.session.execute(delete(PushMessage).where(PushMessage.subscription_id == subscription.id))
+    db.session.delete(subscription)
+    db.session.commit()
+    return jsonify({'success': True}), 200
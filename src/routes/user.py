@@ -1,5 +1,11 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.user import User, db
+from src.models.appointment import Notification, NotificationCounter
+from src.models.push import PushSubscription
+from src.services.calendar import record_calendar_change, user_appointment_dates
+from src.services.identity import READ_METHODS, bump_auth_version, current_identity, login_user
+from src.services.push import prune_subscriptions
+from src.services.users import get_user_directory, touch_users
 from datetime import datetime
 import functools
 
@@ -11,6 +17,10 @@ def login_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
+        # Запросы на изменение от удаленного пользователя отклоняются сразу
+        if request.method not in READ_METHODS and not current_identity():
+            session.clear()
+            return jsonify({'error': 'Authentication required'}), 401
         return f(*args, **kwargs)
     return decorated_function
 
@@ -21,7 +31,7 @@ def admin_required(f):
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
         
-        user = User.query.get(session['user_id'])
+        user = current_identity(fresh=True)
         if not user or not user.is_admin():
             return jsonify({'error': 'Admin privileges required'}), 403
         
@@ -35,7 +45,7 @@ def manager_required(f):
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
         
-        user = User.query.get(session['user_id'])
+        user = current_identity(fresh=True)
         if not user or (not user.is_admin() and not user.is_manager()):
             return jsonify({'error': 'Manager privileges required'}), 403
         
@@ -58,9 +68,8 @@ def login():
     user.last_login = datetime.utcnow()
     db.session.commit()
     
-    # Set session
-    session['user_id'] = user.id
-    session['role'] = user.role
+    # Set session (claims роли и версии учетных данных)
+    login_user(user)
     
     return jsonify({
         'message': 'Login successful',
@@ -75,7 +84,8 @@ def logout():
 @user_bp.route('/current', methods=['GET'])
 @login_required
 def get_current_user():
-    user = User.query.get(session['user_id'])
+    identity = current_identity()
+    user = identity.user if identity else None
     if not user:
         session.clear()
         return jsonify({'error': 'User not found'}), 404
@@ -85,8 +95,7 @@ def get_current_user():
 @user_bp.route('/users', methods=['GET'])
 @admin_required
 def get_users():
-    users = User.query.all()
-    return jsonify({'users': [user.to_dict() for user in users]}), 200
+    return jsonify({'users': get_user_directory()}), 200
 
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 @admin_required
@@ -128,6 +137,7 @@ def create_user():
     )
     
     db.session.add(user)
+    touch_users()
     db.session.commit()
     
     return jsonify({
@@ -168,9 +178,18 @@ def update_user(user_id):
     if 'password' in data:
         user.set_password(data['password'])
     
+    # Сессии пользователя перечитают его данные при следующем запросе
+    if any(field in data for field in ('username', 'role', 'password')):
+        bump_auth_version(user.id)
+    
     if 'user_color' in data:
         user.user_color = data['user_color']
     
+    # Имя, роль и цвет пользователя встроены в данные календаря
+    if any(field in data for field in ('username', 'role', 'user_color')):
+        record_calendar_change(user_appointment_dates(user.id))
+    
+    touch_users()
     db.session.commit()
     
     return jsonify({
@@ -189,7 +208,16 @@ def delete_user(user_id):
     if user.is_admin() and User.query.filter_by(role='admin').count() <= 1:
         return jsonify({'error': 'Cannot delete the last admin user'}), 400
     
+    bump_auth_version(user.id)
+    # Push-подписки пользователя вместе с очередью больше не нужны
+    subscription_ids = [subscription.id for subscription in PushSubscription.query.filter_by(user_id=user.id)]
+    if subscription_ids:
+        prune_subscriptions(subscription_ids)
+    # Уведомления и счетчик ссылаются на пользователя внешним ключом
+    Notification.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+    NotificationCounter.query.filter_by(user_id=user.id).delete(synchronize_session=False)
     db.session.delete(user)
+    touch_users()
     db.session.commit()
     
     return jsonify({'message': 'User deleted successfully'}), 200
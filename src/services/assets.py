@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import namedtuple
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli не обязателен
+    brotli = None
+
+# Типы, которые имеет смысл сжимать заранее
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Файлы, которые должны оставаться по постоянному адресу
+UNHASHED_FILES = ('index.html', 'js/service-worker.js')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+Asset = namedtuple('Asset', 'path url content_type etag encodings immutable')
+
+def _fingerprinted_path(path, digest):
+    base, ext = os.path.splitext(path)
+    return f'{base}.{digest[:10]}{ext}'
+
+def _encodings(data, content_type):
+    encodings = {'identity': data}
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return encodings
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        encodings['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(data)
+        if len(compressed) < len(data):
+            encodings['br'] = compressed
+    return encodings
+
+# Файлы статики: логический путь -> (mtime_ns, size); только stat, без чтения
+def scan_static(static_folder):
+    files = {}
+    for root, _, names in os.walk(static_folder):
+        for name in names:
+            full_path = os.path.join(root, name)
+            stat = os.stat(full_path)
+            path = os.path.relpath(full_path, static_folder).replace(os.sep, '/')
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+# Манифест статики в памяти: логический путь и хешированный путь -> Asset.
+# Строится один раз на процесс; запросы не обращаются к файловой системе.
+class AssetManifest:
+    def __init__(self, static_folder, url_prefix='/static'):
+        self.static_folder = static_folder
+        self.url_prefix = url_prefix
+        self.assets = {}
+        self.by_path = {}
+        # Состояние файлов на момент сборки (scan_static)
+        self.files = None
+
+    def _read(self, path):
+        with open(os.path.join(self.static_folder, path), 'rb') as f:
+            return f.read()
+
+    def _add(self, path, data, hashed):
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        digest = hashlib.sha256(data).hexdigest()
+        url_path = _fingerprinted_path(path, digest) if hashed else path
+        asset = Asset(url_path, f'{self.url_prefix}/{url_path}', content_type,
+                      digest[:32], _encodings(data, content_type), hashed)
+        self.assets[path] = asset
+        self.by_path[url_path] = asset
+        # Нехешированный адрес тоже работает, но с ревалидацией
+        if hashed:
+            self.by_path[path] = asset._replace(path=path, immutable=False)
+        return asset
+
+    def build(self, files=None):
+        self.files = files if files is not None else scan_static(self.static_folder)
+        paths = sorted(self.files)
+
+        for path in paths:
+            if path != 'index.html':
+                self._add(path, self._read(path), hashed=path not in UNHASHED_FILES)
+
+        # index.html ссылается на хешированные имена
+        if 'index.html' in paths:
+            html = self._read('index.html').decode('utf-8')
+            for path, asset in self.assets.items():
+                if asset.immutable:
+                    html = html.replace(f'"{self.url_prefix}/{path}"', f'"{asset.url}"')
+            self._add('index.html', html.encode('utf-8'), hashed=False)
+        return self
+
+    def get(self, path):
+        return self.by_path.get(path)
+
+    @property
+    def index(self):
+        return self.assets.get('index.html')
+
+_build_lock = threading.Lock()
+
+def get_manifest(app=None):
+    app = app or current_app
+    static_folder = app.config['STATIC_FOLDER']
+    manifest = app.extensions.get('asset_manifest')
+    # В режиме отладки манифест пересобирается, только когда изменились файлы
+    # (mtime или размер), чтобы правки были видны без сжатия на каждый запрос
+    files = scan_static(static_folder) if app.debug else None
+    if manifest is None or (files is not None and manifest.files != files):
+        with _build_lock:
+            manifest = app.extensions.get('asset_manifest')
+            if manifest is None or (files is not None and manifest.files != files):
+                manifest = AssetManifest(static_folder).build(files)
+                app.extensions['asset_manifest'] = manifest
+    return manifest
+
+def _choose_encoding(asset):
+    for encoding in ('br', 'gzip'):
+        if encoding in asset.encodings and request.accept_encodings[encoding]:
+            return encoding
+    return 'identity'
+
+def asset_response(asset):
+    encoding = _choose_encoding(asset)
+    etag = asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}'
+    headers = {
+        'Cache-Control': IMMUTABLE_CACHE if asset.immutable else REVALIDATE_CACHE,
+        'Vary': 'Accept-Encoding',
+    }
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    response = Response(asset.encodings[encoding], content_type=asset.content_type, headers=headers)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,222 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from flask import current_app
+
+# Общий кэш для данных, которые дорого собирать (месяцы календаря, список
+# пользователей). Ключи версионируются по change_versions (calendar:YYYY-MM,
+# users): изменение увеличивает версию в той же транзакции, поэтому все
+# воркеры сразу перестают видеть старые записи, какой бы backend ни был
+# выбран. Старые записи вытесняются по TTL и LRU.
+
+class CacheBackend(ABC):
+    # Интерфейс backend'а. Значения - любые picklable-объекты, ttl в секундах.
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        pass
+
+    # Записывает значение, только если ключа нет (или он истек); True при успехе
+    @abstractmethod
+    def add(self, key, value, ttl=None):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+# Кэш процесса: OrderedDict с вытеснением самых давно использованных записей
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expires(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl else None
+
+    def _alive(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._alive(key, time.monotonic())
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (value, self._expires(ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._alive(key, time.monotonic()) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+# Файл SQLite, общий для всех воркеров одного сервера (Passenger на одном хосте).
+# LRU приблизительный: время обращения обновляется не чаще раза в TOUCH_INTERVAL.
+class SQLiteCache(CacheBackend):
+    TOUCH_INTERVAL = 30
+    EVICT_EVERY = 100
+
+    def __init__(self, path, max_entries=10000, default_ttl=300):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, accessed REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)')
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _expires(self, ttl, now):
+        ttl = self.default_ttl if ttl is None else ttl
+        return now + ttl if ttl else None
+
+    def get(self, key):
+        connection = self._connect()
+        now = time.time()
+        row = connection.execute(
+            'SELECT value, expires, accessed FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        if now - row[2] > self.TOUCH_INTERVAL:
+            connection.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+        return pickle.loads(row[0])
+
+    def _evict(self, connection, now):
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.EVICT_EVERY == 0
+        if not due:
+            return
+        connection.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        connection.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def set(self, key, value, ttl=None):
+        connection = self._connect()
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires(ttl, now), now)
+        )
+        self._evict(connection, now)
+
+    def add(self, key, value, ttl=None):
+        connection = self._connect()
+        now = time.time()
+        cursor = connection.execute(
+            'INSERT INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires, '
+            'accessed = excluded.accessed WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires(ttl, now), now, now)
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+# Redis (несколько серверов). client - redis.Redis или совместимый объект;
+# LRU обеспечивает maxmemory-policy allkeys-lru.
+class RedisCache(CacheBackend):
+    def __init__(self, client=None, url=None, prefix='zapis:', default_ttl=300):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError('redis is not installed: pip install redis, or use CACHE_BACKEND=memory/sqlite')
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def _ttl(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return int(ttl) if ttl else None
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=self._ttl(ttl))
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(
+            self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=self._ttl(ttl), nx=True
+        ))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+def _sqlite_cache(app):
+    path = app.config['CACHE_URL'] or os.path.join(app.instance_path, 'cache.sqlite')
+    return SQLiteCache(path, app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_DEFAULT_TTL'])
+
+BACKENDS = {
+    'memory': lambda app: MemoryCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_DEFAULT_TTL']),
+    'sqlite': _sqlite_cache,
+    'redis': lambda app: RedisCache(url=app.config['CACHE_URL'], default_ttl=app.config['CACHE_DEFAULT_TTL']),
+}
+
+def get_cache(app=None):
+    app = app or current_app
+    cache = app.extensions.get('cache')
+    if cache is None:
+        # CACHE_FACTORY позволяет подставить свой backend (factory(app))
+        factory = app.config.get('CACHE_FACTORY') or BACKENDS[app.config['CACHE_BACKEND']]
+        cache = app.extensions.setdefault('cache', factory(app))
+    return cache
+
+# Ключ с версией данных: 'calendar:2025-05:entrance@v12'
+def versioned_key(key, version):
+    return f'{key}@v{version}'
@@ -0,0 +1,166 @@
+from datetime import date, timedelta
+
+from sqlalchemy import distinct, or_, select
+
+from src.models.user import db, User
+from src.models.appointment import Appointment
+from src.services.cache import get_cache, versioned_key
+from src.services.coalesce import coalesce, get_or_compute
+from src.services.serializers import APPOINTMENT_COLUMNS, appointment_row
+from src.services.versions import bump_versions, get_versions
+
+# Месяцы календаря хранятся в общем кэше (src/services/cache.py) под ключом
+# calendar:YYYY-MM:<door_type>@v<version>. door_type - итоговый фильтр после
+# учета роли ('all' - все типы), version - версия области calendar:YYYY-MM:
+# изменение записей в любом воркере увеличивает ее, и старый ключ больше не читается.
+CACHE_TTL = 300
+# Область версии для любого изменения записей (/api/appointments)
+APPOINTMENTS_SCOPE = 'appointments'
+
+def month_start(day):
+    return day.replace(day=1)
+
+def month_end(day):
+    next_month = day.replace(day=28) + timedelta(days=4)
+    return next_month - timedelta(days=next_month.day)
+
+def iter_months(start_date, end_date):
+    current = month_start(start_date)
+    while current <= end_date:
+        yield current.year, current.month
+        current = month_end(current) + timedelta(days=1)
+
+# Итоговый фильтр по типу дверей с учетом роли пользователя
+def visible_door_type(user, door_type=None):
+    if door_type:
+        return door_type
+    if not user.is_admin() and not user.is_manager():
+        if user.is_entrance_installer():
+            return 'entrance'
+        if user.is_interior_installer():
+            return 'interior'
+    return None
+
+# Соседние месяцы объединяются в один диапазон дат
+def month_ranges(months):
+    ranges = []
+    for year, month in sorted(set(months)):
+        start_date = date(year, month, 1)
+        if ranges and ranges[-1][1] + timedelta(days=1) == start_date:
+            ranges[-1][1] = month_end(start_date)
+        else:
+            ranges.append([start_date, month_end(start_date)])
+    return ranges
+
+# Дни нескольких месяцев одним запросом: {(year, month): [day, ...]}
+def _build_months(months, door_type):
+    # Колонки записей и только нужные поля пользователя, без ORM-объектов
+    query = (
+        select(*APPOINTMENT_COLUMNS, User.id, User.username, User.role, User.user_color)
+        .outerjoin(User, User.id == Appointment.user_id)
+        .where(or_(*(Appointment.date.between(start, end) for start, end in month_ranges(months))))
+    )
+    if door_type:
+        query = query.where(Appointment.door_type == door_type)
+    query = query.order_by(Appointment.date, Appointment.time_slot)
+
+    calendar_data = {(year, month): {} for year, month in months}
+    for row in db.session.execute(query):
+        day = row[2]
+        month_data = calendar_data[(day.year, day.month)]
+        # Дата форматируется один раз на день, а не на каждую запись
+        day_data = month_data.get(day)
+        if day_data is None:
+            day_data = month_data[day] = {
+                'date': day.isoformat(),
+                'morning': None,
+                'afternoon': None
+            }
+
+        appointment_data = appointment_row(row, day_data['date'])
+        user_id, username, role, user_color = row[11:]
+        if user_id is not None:
+            appointment_data['user'] = {
+                'id': user_id,
+                'username': username,
+                'role': role,
+                'user_color': user_color
+            }
+
+        day_data[row[3]] = appointment_data
+
+    return {key: list(month_data.values()) for key, month_data in calendar_data.items()}
+
+def _build_month(year, month, door_type):
+    return _build_months([(year, month)], door_type)[(year, month)]
+
+def month_key(year, month, door_type, version):
+    return versioned_key(f'calendar:{year:04d}-{month:02d}:{door_type or "all"}', version)
+
+def get_month(year, month, door_type=None, version=0):
+    # Одновременные запросы одного месяца ждут одно вычисление
+    return get_or_compute(month_key(year, month, door_type, version),
+                          lambda: _build_month(year, month, door_type), CACHE_TTL)
+
+# Несколько месяцев из кэша; отсутствующие строятся одним запросом
+# и кладутся в кэш по отдельности. versions: {(year, month): version}
+def get_months(months, door_type=None, versions=None):
+    versions = versions or {}
+    cache = get_cache()
+    keys = {key: month_key(key[0], key[1], door_type, versions.get(key, 0)) for key in months}
+    result, missing = {}, []
+    for key in months:
+        days = cache.get(keys[key])
+        if days is None:
+            missing.append(key)
+        else:
+            result[key] = days
+
+    if len(missing) == 1:
+        result[missing[0]] = get_month(*missing[0], door_type, versions.get(missing[0], 0))
+    elif missing:
+        def build():
+            built = _build_months(missing, door_type)
+            for key, days in built.items():
+                cache.set(keys[key], days, CACHE_TTL)
+            return built
+        # Одинаковые наборы месяцев из параллельных запросов строятся один раз
+        result.update(coalesce('|'.join(keys[key] for key in missing), build))
+    return result
+
+# Версии месяцев: {(year, month): version}, один запрос
+def month_versions(months):
+    versions = get_versions(calendar_scope(year, month) for year, month in months)
+    return dict(zip(months, versions))
+
+def calendar_versions(start_date, end_date):
+    return month_versions(list(iter_months(start_date, end_date)))
+
+# Данные календаря за период, собранные из помесячного кэша
+def get_calendar_days(start_date, end_date, door_type=None, versions=None):
+    if versions is None:
+        versions = calendar_versions(start_date, end_date)
+    months = get_months(list(iter_months(start_date, end_date)), door_type, versions)
+    days = []
+    for year, month in iter_months(start_date, end_date):
+        for day in months[(year, month)]:
+            if start_date.isoformat() <= day['date'] <= end_date.isoformat():
+                days.append(day)
+    return days
+
+# Даты записей пользователя: его имя, роль и цвет встроены в эти месяцы
+def user_appointment_dates(user_id):
+    return db.session.execute(
+        select(distinct(Appointment.date)).where(Appointment.user_id == user_id)
+    ).scalars().all()
+
+def calendar_scope(year, month):
+    return f'calendar:{year:04d}-{month:02d}'
+
+# Версии для ETag: вызывается до commit изменения записей. Возвращает номер
+# изменения для change_seq: строка appointments в change_versions заблокирована
+# до commit, поэтому номера растут в порядке фиксации транзакций.
+def record_calendar_change(dates):
+    scopes = {calendar_scope(day.year, day.month) for day in dates if day}
+    bump_versions(scopes | {APPOINTMENTS_SCOPE})
+    return get_versions([APPOINTMENTS_SCOPE])[0]
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+from flask import current_app
+
+from src.services.cache import get_cache
+
+# Объединение одинаковых одновременных вычислений (thundering herd в 9:00:
+# все открывают календарь текущего месяца). Первый поток с ключом вычисляет,
+# остальные ждут его результат. Между процессами то же делает блокировка
+# lock:<key> в общем кэше (COALESCE_CROSS_PROCESS=1, backend sqlite/redis).
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {'leaders': self.leaders, 'followers': self.followers, 'in_flight': len(self._calls)}
+
+_flight = SingleFlight()
+POLL_INTERVAL = 0.05
+
+def coalescing_stats():
+    return _flight.stats()
+
+# Только объединение внутри процесса, без общего кэша (результат кладет fn)
+def coalesce(key, fn):
+    return _flight.do(key, fn)
+
+# Лидер процесса: при включенной межпроцессной блокировке вычисляет только
+# процесс, записавший lock:<key>; остальные ждут значение в кэше не дольше
+# COALESCE_WAIT секунд и после этого вычисляют сами.
+def _compute_shared(cache, key, compute, ttl):
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    config = current_app.config
+    locked = False
+    if config['COALESCE_CROSS_PROCESS']:
+        lock_key = f'lock:{key}'
+        locked = cache.add(lock_key, os.getpid(), ttl=config['COALESCE_LOCK_TTL'])
+        if not locked:
+            deadline = time.monotonic() + config['COALESCE_WAIT']
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                value = cache.get(key)
+                if value is not None:
+                    return value
+
+    try:
+        value = compute()
+        cache.set(key, value, ttl)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+# Значение из общего кэша; при промахе одинаковые запросы вычисляются один раз.
+# key должен включать версию данных и область видимости (тип дверей).
+def get_or_compute(key, compute, ttl=None, cache=None):
+    cache = cache or get_cache()
+    value = cache.get(key)
+    if value is not None:
+        return value
+    return _flight.do(key, lambda: _compute_shared(cache, key, compute, ttl))
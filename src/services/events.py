@@ -0,0 +1,213 @@
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+
+from src.models.user import db
+from src.models.event import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд ждать событие с пропущенным id (незавершенная транзакция)
+GAP_WAIT = 5
+
+# Событие хаба; id - строка для Last-Event-ID, seq - его числовое значение
+Event = namedtuple('Event', 'id seq type data user_id door_types')
+
+class EventHub(ABC):
+    # Реализация для другого брокера (Redis pub/sub и т.п.) подключается
+    # через EVENT_HUB_FACTORY(app) и предоставляет те же два метода.
+    @abstractmethod
+    def publish(self, event_type, data, user_id=None, door_types=None):
+        pass
+
+    # Возвращает (events, resync, cursor): события после last_event_id,
+    # признак потери истории и курсор для следующего вызова
+    @abstractmethod
+    def wait(self, last_event_id=None, timeout=None):
+        pass
+
+    # Останавливает фоновые потоки хаба (тесты, завершение процесса)
+    def close(self):
+        pass
+
+# Хаб на таблице change_events: события из любого воркера и из cron-задач
+# (generate-reminders) видны всем потокам /api/events. Таблицу опрашивает
+# один поток на процесс раз в EVENT_POLL_INTERVAL секунд; потоки /api/events
+# ждут на Condition и читают события из буфера в памяти, не обращаясь к БД.
+class DatabaseEventHub(EventHub):
+    def __init__(self, app):
+        with app.app_context():
+            self.engine = db.engine
+        self.buffer_size = app.config['EVENT_BUFFER_SIZE']
+        self.poll_interval = app.config['EVENT_POLL_INTERVAL']
+        self._condition = threading.Condition()
+        self._buffer = deque(maxlen=self.buffer_size)
+        self._seq = None
+        # Курсоры меньше floor ссылаются на потерянные события
+        self._floor = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def publish(self, event_type, data, user_id=None, door_types=None):
+        with self.engine.begin() as connection:
+            event_id = connection.execute(insert(ChangeEvent).values(
+                event_type=event_type,
+                data=json.dumps(data, separators=(',', ':')),
+                user_id=user_id,
+                door_types=','.join(sorted(door_types)) if door_types else None,
+            )).inserted_primary_key[0]
+            # Журнал ограничен последними buffer_size событиями
+            connection.execute(delete(ChangeEvent).where(ChangeEvent.id <= event_id - self.buffer_size))
+        return str(event_id)
+
+    # События после seq. Пропуск в id может быть еще не закоммиченной вставкой
+    # другого воркера: перед свежим пропуском останавливаемся и читаем его
+    # при следующем опросе; пропуск старше GAP_WAIT - откат, его пропускаем.
+    def _events_after(self, connection, seq):
+        rows = connection.execute(
+            select(ChangeEvent.id, ChangeEvent.event_type, ChangeEvent.data,
+                   ChangeEvent.user_id, ChangeEvent.door_types, ChangeEvent.created_at)
+            .where(ChangeEvent.id > seq)
+            .order_by(ChangeEvent.id)
+            .limit(self.buffer_size)
+        )
+        settled_before = datetime.utcnow() - timedelta(seconds=GAP_WAIT)
+        events = []
+        for event_id, event_type, data, user_id, door_types, created_at in rows:
+            if event_id != seq + 1 and created_at > settled_before:
+                break
+            events.append(Event(str(event_id), event_id, event_type, json.loads(data), user_id,
+                                tuple(door_types.split(',')) if door_types else None))
+            seq = event_id
+        return events
+
+    # Поток опроса запускается при первом ожидании (после fork воркера Passenger)
+    def _start(self):
+        with self._condition:
+            if self._thread is not None:
+                return
+            with self.engine.connect() as connection:
+                self._seq = connection.execute(select(func.max(ChangeEvent.id))).scalar() or 0
+            self._thread = threading.Thread(target=self._poll, name='event-hub-poller', daemon=True)
+            self._thread.start()
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                # Больше buffer_size событий за интервал - дочитываем сразу
+                while True:
+                    with self.engine.connect() as connection:
+                        events = self._events_after(connection, self._seq)
+                        oldest = None if events else connection.execute(select(func.min(ChangeEvent.id))).scalar()
+                    with self._condition:
+                        if oldest is not None and self._seq + 1 < oldest:
+                            # Пропуск - события, уже удаленные из журнала
+                            self._seq = self._floor = oldest - 1
+                        overflow = len(self._buffer) + len(events) - self.buffer_size
+                        if overflow > 0:
+                            self._floor = max(self._floor, [*self._buffer, *events][overflow - 1].seq)
+                        self._buffer.extend(events)
+                        if events:
+                            self._seq = events[-1].seq
+                        self._condition.notify_all()
+                    if len(events) < self.buffer_size:
+                        break
+            except Exception:
+                logger.exception('Event hub poll failed')
+
+    def close(self):
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _buffered_after(self, seq):
+        return [event for event in self._buffer if event.seq > seq]
+
+    def wait(self, last_event_id=None, timeout=None):
+        self._start()
+
+        # Новое подключение: только события, опубликованные после него
+        if not last_event_id:
+            with self._condition:
+                return [], False, str(self._seq)
+
+        # Курсор старого формата - клиенту нужно перечитать данные
+        seq = int(last_event_id) if last_event_id.isdigit() else -1
+        if seq < 0:
+            return [], True, str(self._seq)
+
+        with self._condition:
+            head = self._seq
+            behind = seq < head and (not self._buffer or seq + 1 < self._buffer[0].seq)
+        # Курсор старше буфера (переподключение к другому воркеру) или новее
+        # последнего опроса: один запрос к журналу для этого подключения
+        if behind or seq > head:
+            with self.engine.connect() as connection:
+                oldest, last_seq = connection.execute(
+                    select(func.min(ChangeEvent.id), func.max(ChangeEvent.id))
+                ).one()
+                if seq > (last_seq or 0) or (oldest is not None and seq + 1 < oldest):
+                    return [], True, str(last_seq or 0)
+                if behind:
+                    events = self._events_after(connection, seq)
+            if behind:
+                if not events:
+                    # Перед курсором свежий пропуск: ждем, как при обычном опросе
+                    self._stopped.wait(min(timeout or 0, self.poll_interval))
+                cursor = events[-1].id if events else last_event_id
+                return events, False, cursor
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._seq > seq or self._stopped.is_set(), timeout=timeout or 0
+            )
+            # Пока поток ждал, непрочитанные события ушли из буфера или журнала
+            if seq < self._floor:
+                return [], True, str(self._seq)
+            events = self._buffered_after(seq)
+        cursor = events[-1].id if events else last_event_id
+        return events, False, cursor
+
+def get_event_hub(app=None):
+    app = app or current_app
+    hub = app.extensions.get('event_hub')
+    if hub is None:
+        # EVENT_HUB_FACTORY(app) позволяет подменить хаб другим брокером
+        factory = app.config.get('EVENT_HUB_FACTORY') or DatabaseEventHub
+        hub = app.extensions.setdefault('event_hub', factory(app))
+    return hub
+
+# Публикация изменения записи после commit
+def publish_appointment_event(action, appointment_id, date, door_type, previous_date=None, previous_door_type=None):
+    # Без потока /api/events журнал никто не читает
+    if not current_app.config['EVENT_STREAM_ENABLED']:
+        return None
+    door_types = {door_type}
+    data = {
+        'action': action,
+        'id': appointment_id,
+        'date': date.isoformat(),
+        'door_type': door_type
+    }
+    if previous_date and previous_date != date:
+        data['previous_date'] = previous_date.isoformat()
+    if previous_door_type and previous_door_type != door_type:
+        data['previous_door_type'] = previous_door_type
+        door_types.add(previous_door_type)
+    return get_event_hub().publish('appointment', data, door_types=door_types)
+
+def publish_notification_events(user_ids, app=None):
+    app = app or current_app
+    if not app.config['EVENT_STREAM_ENABLED']:
+        return
+    hub = get_event_hub(app)
+    for user_id in set(user_ids):
+        hub.publish('notification', {'user_id': user_id}, user_id=user_id)
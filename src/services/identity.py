@@ -0,0 +1,97 @@
+import threading
+import time
+
+from flask import current_app, g, request, session
+from sqlalchemy import select, update
+
+from src.models.user import db, RoleMixin, User, UserAuthVersion
+
+_versions = {}
+_versions_lock = threading.Lock()
+READ_METHODS = ('GET', 'HEAD')
+
+# Текущий пользователь по подписанным claims сессии (без запроса к users)
+class Identity(RoleMixin):
+    def __init__(self, user_id, username, role, user=None):
+        self.id = user_id
+        self.username = username
+        self.role = role
+        self._user = user
+
+    # Полная модель User загружается только по требованию
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+def _load_version(user_id):
+    version = db.session.execute(
+        select(UserAuthVersion.version).where(UserAuthVersion.user_id == user_id)
+    ).scalar()
+    return version or 0
+
+def get_auth_version(user_id, fresh=False):
+    now = time.monotonic()
+    if not fresh:
+        with _versions_lock:
+            cached = _versions.get(user_id)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    version = _load_version(user_id)
+    ttl = current_app.config['AUTH_VERSION_TTL']
+    with _versions_lock:
+        _versions[user_id] = (version, now + ttl)
+    return version
+
+# Увеличивает версию в текущей транзакции; commit делает вызывающий код
+def bump_auth_version(user_id):
+    result = db.session.execute(
+        update(UserAuthVersion)
+        .where(UserAuthVersion.user_id == user_id)
+        .values(version=UserAuthVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.session.add(UserAuthVersion(user_id=user_id, version=1))
+    with _versions_lock:
+        _versions.pop(user_id, None)
+
+def login_user(user):
+    session['user_id'] = user.id
+    session['role'] = user.role
+    session['username'] = user.username
+    session['auth_version'] = get_auth_version(user.id, fresh=True)
+    g.identity = Identity(user.id, user.username, user.role, user)
+    g.identity_fresh = True
+
+# Пользователь текущего запроса, вычисляется один раз на запрос.
+# Возвращает None, если пользователь не авторизован или удален.
+# Кэш версий процесса (AUTH_VERSION_TTL) используется только для чтения:
+# запросы на изменение и fresh=True (маршруты администратора) сверяют
+# версию с БД, поэтому удаление или смена роли действуют сразу во всех воркерах.
+def current_identity(fresh=False):
+    fresh = fresh or request.method not in READ_METHODS
+    if 'identity' in g and (g.identity_fresh or not fresh):
+        return g.identity
+
+    identity = None
+    user_id = session.get('user_id')
+    if user_id is not None:
+        claims_valid = (
+            'auth_version' in session
+            and 'role' in session
+            and session['auth_version'] == get_auth_version(user_id, fresh=fresh)
+        )
+        if claims_valid:
+            identity = Identity(user_id, session.get('username'), session['role'])
+        else:
+            # Версия изменилась (или старая сессия) - перечитываем пользователя
+            user = db.session.get(User, user_id)
+            if user:
+                login_user(user)
+                identity = g.identity
+
+    g.identity = identity
+    g.identity_fresh = fresh
+    return identity
@@ -0,0 +1,167 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+slow_log = logging.getLogger('zapis.slow_requests')
+
+WINDOW_SIZE = 500
+MAX_STATEMENTS = 50
+MAX_STATEMENT_LENGTH = 500
+
+# Метрики одного запроса (хранятся в g)
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.statements = []
+
+    def record_query(self, statement, seconds):
+        self.queries += 1
+        self.db_time += seconds
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append((statement[:MAX_STATEMENT_LENGTH], seconds))
+
+def current_metrics():
+    if not has_request_context():
+        return None
+    return g.get('request_metrics')
+
+# Скользящее окно последних запросов одного эндпоинта
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.window = deque(maxlen=WINDOW_SIZE)
+
+    def add(self, total, handler, db_time, serialization, queries, status):
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        self.window.append((total, handler, db_time, serialization, queries))
+
+    def to_dict(self):
+        samples = list(self.window)
+        n = len(samples)
+        totals = sorted(sample[0] for sample in samples)
+
+        def avg_ms(index):
+            return round(sum(sample[index] for sample in samples) / n * 1000, 3)
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'window': n,
+            'avg_ms': avg_ms(0),
+            'p95_ms': round(totals[min(n - 1, int(n * 0.95))] * 1000, 3),
+            'max_ms': round(totals[-1] * 1000, 3),
+            'handler_avg_ms': avg_ms(1),
+            'db_avg_ms': avg_ms(2),
+            'serialization_avg_ms': avg_ms(3),
+            'queries_avg': round(sum(sample[4] for sample in samples) / n, 2),
+        }
+
+_stats = {}
+_stats_lock = threading.Lock()
+_engines = set()
+
+def request_stats():
+    with _stats_lock:
+        return {endpoint: stats.to_dict() for endpoint, stats in sorted(_stats.items())}
+
+def instrument_queries(engine):
+    if id(engine) in _engines:
+        return
+    _engines.add(id(engine))
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['query_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.record_query(statement, time.perf_counter() - conn.info['query_started'])
+
+# Время сериализации JSON: оборачиваем dumps текущего провайдера приложения
+def instrument_json(app):
+    provider = app.json
+    dumps = provider.dumps
+
+    def timed_dumps(obj, **kwargs):
+        metrics = current_metrics()
+        if metrics is None:
+            return dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return dumps(obj, **kwargs)
+        finally:
+            metrics.serialization_time += time.perf_counter() - started
+
+    provider.dumps = timed_dumps
+
+def server_timing(metrics, total):
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+        f'json;dur={metrics.serialization_time * 1000:.2f}',
+        f'app;dur={(total - metrics.db_time - metrics.serialization_time) * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ])
+
+def log_slow_request(metrics, total, status):
+    slow_log.warning(json.dumps({
+        'event': 'slow_request',
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': status,
+        'total_ms': round(total * 1000, 2),
+        'db_ms': round(metrics.db_time * 1000, 2),
+        'serialization_ms': round(metrics.serialization_time * 1000, 2),
+        'queries': metrics.queries,
+        'statements': [
+            {'sql': statement, 'ms': round(seconds * 1000, 2)}
+            for statement, seconds in metrics.statements
+        ],
+    }, ensure_ascii=False))
+
+# Счетчики запросов к БД, время обработчика и сериализации для каждого запроса.
+# SERVER_TIMING=1 добавляет заголовок Server-Timing, запросы дольше
+# SLOW_REQUEST_MS пишутся в лог zapis.slow_requests вместе с SQL.
+def init_instrumentation(app, engine):
+    instrument_queries(engine)
+    instrument_json(app)
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = RequestMetrics()
+
+    @app.after_request
+    def finish_request_metrics(response):
+        metrics = current_metrics()
+        if metrics is None:
+            return response
+        total = time.perf_counter() - metrics.started
+        handler = total - metrics.db_time - metrics.serialization_time
+
+        endpoint = request.endpoint or 'unmatched'
+        with _stats_lock:
+            stats = _stats.get(endpoint)
+            if stats is None:
+                stats = _stats[endpoint] = EndpointStats()
+            stats.add(total, handler, metrics.db_time, metrics.serialization_time,
+                      metrics.queries, response.status_code)
+
+        if app.config['SERVER_TIMING_ENABLED']:
+            response.headers['Server-Timing'] = server_timing(metrics, total)
+        threshold = app.config['SLOW_REQUEST_MS']
+        if threshold and total * 1000 >= threshold:
+            log_slow_request(metrics, total, response.status_code)
+        return response
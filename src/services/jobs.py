@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
+from src.models.job import JobLock
+
+# Lease-based lock shared by all Passenger workers through the database.
+# Only the worker whose conditional UPDATE matched the row owns the job.
+def acquire_job_lock(name, ttl=timedelta(minutes=5)):
+    if not db.session.get(JobLock, name):
+        try:
+            db.session.add(JobLock(name=name))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker created the row first
+            db.session.rollback()
+
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(JobLock)
+        .where(JobLock.name == name)
+        .where(or_(JobLock.locked_until.is_(None), JobLock.locked_until < now))
+        .values(locked_until=now + ttl)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+def release_job_lock(name, completed=True):
+    values = {'locked_until': None}
+    if completed:
+        values['last_completed_at'] = datetime.utcnow()
+    db.session.execute(update(JobLock).where(JobLock.name == name).values(**values))
+    db.session.commit()
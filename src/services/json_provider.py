@@ -0,0 +1,64 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib json через DefaultJSONProvider
+    orjson = None
+
+COMPACT_SEPARATORS = (',', ':')
+INDENT_SEPARATORS = (',', ': ')
+
+# JSON-провайдер на orjson. Вывод совпадает с DefaultJSONProvider байт в байт:
+# сортировка ключей, компактные разделители (или indent=2 в debug). При
+# ensure_ascii ответ с не-ASCII символами кодирует stdlib: экранирование
+# \uXXXX на Python медленнее json.dumps целиком, поэтому провайдер
+# подключается только при JSON_ENSURE_ASCII=0 (по умолчанию). Даты и dataclass
+# идут через flask.json.provider._default; нестандартные параметры - через stdlib.
+# Единственное отличие - экспонента float (1e20 вместо 1e+20), в ответах API
+# дробных чисел такого масштаба нет.
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.get('indent')
+        separators = kwargs.get('separators')
+        if indent is None and separators == COMPACT_SEPARATORS:
+            option = 0
+        elif indent == 2 and separators in (None, INDENT_SEPARATORS):
+            option = orjson.OPT_INDENT_2
+        else:
+            option = None
+        if option is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        option |= (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                   | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+        try:
+            data = orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except (orjson.JSONEncodeError, TypeError):
+            # Например, int больше 64 бит: stdlib кодирует то, что умеет
+            return super().dumps(obj, **kwargs)
+        if self.ensure_ascii and not data.isascii():
+            return super().dumps(obj, **kwargs)
+        return data
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            data = self.dumps(obj, indent=2)
+        else:
+            data = self.dumps(obj, separators=COMPACT_SEPARATORS)
+        return self._app.response_class(f'{data}\n', mimetype=self.mimetype)
+
+# orjson, если установлен (JSON_BACKEND=stdlib отключает). При
+# JSON_ENSURE_ASCII=1 ответы с кириллицей кодировались бы дважды, поэтому
+# остается stdlib.
+def init_json_provider(app):
+    if orjson is not None and app.config['JSON_BACKEND'] != 'stdlib' and not app.config['JSON_ENSURE_ASCII']:
+        app.json = OrjsonProvider(app)
+    app.json.ensure_ascii = app.config['JSON_ENSURE_ASCII']
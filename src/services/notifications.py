@@ -0,0 +1,108 @@
+from sqlalchemy import case, delete, distinct, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src.models.user import db
+from src.models.appointment import Notification, NotificationCounter
+from src.services.versions import bump_versions
+
+def notifications_scope(user_id):
+    return f'notifications:{user_id}'
+
+# Версии для ETag списка уведомлений; вызывается до commit
+def touch_notifications(user_ids):
+    bump_versions(notifications_scope(user_id) for user_id in user_ids)
+
+def _count_unread(user_id):
+    return select(func.count(Notification.id)).where(
+        Notification.user_id == user_id,
+        Notification.is_read == False  # noqa: E712
+    ).scalar_subquery()
+
+# Счетчик создается лениво при первом обращении
+def get_unread_count(user_id):
+    counter = db.session.get(NotificationCounter, user_id)
+    if counter:
+        return counter.unread
+
+    unread = db.session.execute(select(_count_unread(user_id))).scalar()
+    try:
+        db.session.add(NotificationCounter(user_id=user_id, unread=unread))
+        db.session.commit()
+    except IntegrityError:
+        # Счетчик успел создать другой запрос
+        db.session.rollback()
+        return db.session.get(NotificationCounter, user_id).unread
+    return unread
+
+# Пересчет счетчиков пользователей после массовой вставки уведомлений.
+# Выполняется в текущей транзакции, commit делает вызывающий код.
+def recount_unread(user_ids):
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    existing = set(db.session.execute(
+        select(NotificationCounter.user_id).where(NotificationCounter.user_id.in_(user_ids))
+    ).scalars())
+    missing = user_ids - existing
+    if missing:
+        db.session.execute(
+            insert(NotificationCounter),
+            [{'user_id': user_id, 'unread': 0} for user_id in missing]
+        )
+
+    db.session.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id.in_(user_ids))
+        .values(unread=_count_unread(NotificationCounter.user_id))
+        .execution_options(synchronize_session=False)
+    )
+
+# Изменение счетчика на delta (например, -1 после прочтения)
+def adjust_unread(user_id, delta):
+    if not delta:
+        return
+    db.session.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id)
+        .values(unread=case(
+            (NotificationCounter.unread + delta < 0, 0),
+            else_=NotificationCounter.unread + delta
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+# Отмечает прочитанными непрочитанные уведомления пользователя, подходящие под
+# conditions, одним UPDATE; счетчик уменьшается на число измененных строк.
+# Выполняется в текущей транзакции, commit делает вызывающий код.
+def mark_read(user_id, *conditions):
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False, *conditions)  # noqa: E712
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        adjust_unread(user_id, -result.rowcount)
+        touch_notifications([user_id])
+    return result.rowcount
+
+# Удаляет уведомления записей одним запросом (по индексу appointment_id, user_id)
+# и пересчитывает счетчики. Выполняется в текущей транзакции; возвращает
+# пользователей, которым после commit нужно отправить событие.
+def delete_appointment_notifications(appointment_ids):
+    appointment_ids = list(appointment_ids)
+    user_ids = set(db.session.execute(
+        select(distinct(Notification.user_id)).where(Notification.appointment_id.in_(appointment_ids))
+    ).scalars())
+    if not user_ids:
+        return user_ids
+
+    db.session.execute(
+        delete(Notification)
+        .where(Notification.appointment_id.in_(appointment_ids))
+        .execution_options(synchronize_session=False)
+    )
+    recount_unread(user_ids)
+    touch_notifications(user_ids)
+    return user_ids
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Счетчики пула соединений одного engine
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.recycles = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'recycles': self.recycles,
+                'invalidations': self.invalidations,
+                'wait_avg_ms': round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+# QueuePool, измеряющий время ожидания свободного соединения
+class InstrumentedQueuePool(QueuePool):
+    stats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+_engines = {}
+
+def instrument_engine(engine, name='default'):
+    if name in _engines and _engines[name][0] is engine:
+        return _engines[name][1]
+    stats = PoolStats()
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.stats = stats
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        stats.incr('connects')
+        info = connection_record.record_info
+        if info.get('connected'):
+            # Повторное подключение записи пула без invalidate - это recycle
+            if not info.pop('invalidated', False):
+                stats.incr('recycles')
+        info['connected'] = True
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.incr('checkouts')
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.incr('invalidations')
+        connection_record.record_info['invalidated'] = True
+
+    _engines[name] = (engine, stats)
+    return stats
+
+def pool_status():
+    status = {}
+    for name, (engine, stats) in _engines.items():
+        pool = engine.pool
+        data = {'pool_class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+            })
+        data.update(stats.to_dict())
+        status[name] = data
+    return status
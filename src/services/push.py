@@ -0,0 +1,323 @@
+import json
+import logging
+import random
+import threading
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, select, update
+
+from src.models.user import db
+from src.models.push import PushMessage, PushSubscription
+from src.services.jobs import acquire_job_lock, release_job_lock
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_LOCK = 'push-delivery'
+# Push-сервис больше не знает endpoint: подписку нужно удалить
+EXPIRED_STATUSES = (404, 410)
+# Временные ошибки: повторяем с экспоненциальной задержкой
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+class PushSendError(Exception):
+    # Сетевая ошибка без HTTP-ответа (повторяется как временная)
+    pass
+
+class PushSender(ABC):
+    # Интерфейс отправителя: возвращает HTTP-статус push-сервиса или
+    # выбрасывает PushSendError. Вызывается из нескольких потоков.
+    @abstractmethod
+    def send(self, subscription_info, payload):
+        pass
+
+# Отправка через pywebpush (шифрование payload и подпись VAPID)
+class WebPushSender(PushSender):
+    def __init__(self, private_key, subject, ttl=86400):
+        try:
+            import pywebpush
+        except ImportError:
+            raise RuntimeError('pywebpush is not installed: pip install pywebpush, or set PUSH_SENDER=http/stub')
+        self._pywebpush = pywebpush
+        self.private_key = private_key
+        self.claims = {'sub': subject}
+        self.ttl = ttl
+
+    def send(self, subscription_info, payload):
+        try:
+            response = self._pywebpush.webpush(
+                subscription_info, payload,
+                vapid_private_key=self.private_key,
+                vapid_claims=dict(self.claims),
+                ttl=self.ttl
+            )
+        except self._pywebpush.WebPushException as e:
+            if e.response is None:
+                raise PushSendError(str(e))
+            return e.response.status_code
+        return response.status_code
+
+# Отправка payload как есть (POST JSON на endpoint) - для локального
+# stub-сервиса push, который имитирует ответы 201/404/410/429/5xx
+class HTTPPushSender(PushSender):
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    def send(self, subscription_info, payload):
+        request = urllib.request.Request(
+            subscription_info['endpoint'], data=payload.encode('utf-8'), method='POST',
+            headers={'Content-Type': 'application/json', 'TTL': '86400'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, OSError) as e:
+            raise PushSendError(str(e))
+
+# Отправитель в памяти: запоминает сообщения, статусы задаются по endpoint
+class StubPushSender(PushSender):
+    def __init__(self, responses=None, default_status=201):
+        self.responses = dict(responses or {})
+        self.default_status = default_status
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, subscription_info, payload):
+        status = self.responses.get(subscription_info['endpoint'], self.default_status)
+        if isinstance(status, Exception):
+            raise status
+        with self._lock:
+            self.sent.append((subscription_info['endpoint'], json.loads(payload), status))
+        return status
+
+def _webpush_sender(app):
+    return WebPushSender(
+        app.config['PUSH_VAPID_PRIVATE_KEY'], app.config['PUSH_VAPID_SUBJECT'], app.config['PUSH_TTL']
+    )
+
+SENDERS = {
+    'webpush': _webpush_sender,
+    'http': lambda app: HTTPPushSender(),
+    'stub': lambda app: StubPushSender(),
+}
+
+def get_push_sender(app=None):
+    app = app or current_app
+    sender = app.extensions.get('push_sender')
+    if sender is None:
+        # PUSH_SENDER_FACTORY позволяет подставить свой отправитель (factory(app))
+        factory = app.config.get('PUSH_SENDER_FACTORY') or SENDERS[app.config['PUSH_SENDER']]
+        sender = app.extensions.setdefault('push_sender', factory(app))
+    return sender
+
+# Endpoint подписки приходит от клиента, а запрос на него делает сервер:
+# допускаются только https-адреса push-сервисов из PUSH_ALLOWED_HOSTS
+# (домен или его поддомены), иначе подписка позволила бы обращаться к
+# внутренним адресам. http - только для локального stub (PUSH_SENDER=http).
+def is_allowed_endpoint(endpoint, config=None):
+    config = config or current_app.config
+    try:
+        url = urlsplit(endpoint)
+        port = url.port
+    except ValueError:
+        return False
+    schemes = ('https', 'http') if config['PUSH_SENDER'] == 'http' else ('https',)
+    host = (url.hostname or '').rstrip('.').lower()
+    if url.scheme not in schemes or not host or url.username or url.password:
+        return False
+    if port is not None and port != 443 and url.scheme == 'https':
+        return False
+    return any(host == allowed or host.endswith('.' + allowed) for allowed in config['PUSH_ALLOWED_HOSTS'])
+
+def build_push_payload(message, title='Напоминание о установке', url='/'):
+    return json.dumps({'title': title, 'message': message, 'url': url}, ensure_ascii=False)
+
+# Ставит в очередь сообщения для всех подписок пользователей.
+# messages: [(user_id, payload)]. Выполняется в текущей транзакции вызывающего
+# кода, поэтому очередь фиксируется вместе с уведомлениями.
+def enqueue_pushes(messages):
+    messages = list(messages)
+    if not messages:
+        return 0
+    subscriptions = {}
+    for subscription_id, user_id in db.session.execute(
+        select(PushSubscription.id, PushSubscription.user_id)
+        .where(PushSubscription.user_id.in_({user_id for user_id, _ in messages}))
+    ):
+        subscriptions.setdefault(user_id, []).append(subscription_id)
+
+    now = datetime.utcnow()
+    rows = [{
+        'subscription_id': subscription_id,
+        'payload': payload,
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': now,
+        'created_at': now
+    } for user_id, payload in messages for subscription_id in subscriptions.get(user_id, [])]
+    if rows:
+        db.session.execute(insert(PushMessage), rows)
+    return len(rows)
+
+def retry_delay(attempts, base=30, maximum=3600):
+    # 30s, 60s, 120s ... с разбросом, чтобы повторы не приходили пачкой
+    delay = min(maximum, base * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def _send(sender, subscription_info, payload):
+    try:
+        return sender.send(subscription_info, payload), None
+    except PushSendError as e:
+        return None, str(e)
+    except Exception as e:
+        logger.exception('Push sender failed')
+        return None, f'{type(e).__name__}: {e}'
+
+# Отправляет одну пачку due-сообщений. Сетевые вызовы идут параллельно
+# (не более concurrency), изменения в БД - в вызывающем потоке.
+def _deliver_batch(sender, executor, batch_size, max_attempts, stats):
+    now = datetime.utcnow()
+    batch = db.session.execute(
+        select(
+            PushMessage.id, PushMessage.payload, PushMessage.attempts,
+            PushSubscription.id.label('subscription_id'), PushSubscription.endpoint,
+            PushSubscription.p256dh, PushSubscription.auth
+        )
+        .join(PushSubscription, PushSubscription.id == PushMessage.subscription_id)
+        .where(PushMessage.status == 'pending', PushMessage.next_attempt_at <= now)
+        .order_by(PushMessage.next_attempt_at, PushMessage.id)
+        .limit(batch_size)
+    ).all()
+    if not batch:
+        return 0
+
+    # Подписки, сохраненные до проверки endpoint, не отправляются и удаляются
+    config = current_app.config
+    allowed = [row for row in batch if is_allowed_endpoint(row.endpoint, config)]
+    results = dict(zip((row.id for row in allowed), executor.map(lambda row: _send(sender, {
+        'endpoint': row.endpoint,
+        'keys': {'p256dh': row.p256dh, 'auth': row.auth}
+    }, row.payload), allowed)))
+
+    now = datetime.utcnow()
+    sent_ids, delivered_subscriptions, expired_subscriptions = [], set(), set()
+    for row in batch:
+        if row.id not in results:
+            expired_subscriptions.add(row.subscription_id)
+            continue
+        status, error = results[row.id]
+        if status is not None and 200 <= status < 300:
+            sent_ids.append(row.id)
+            delivered_subscriptions.add(row.subscription_id)
+        elif status in EXPIRED_STATUSES:
+            expired_subscriptions.add(row.subscription_id)
+        else:
+            attempts = row.attempts + 1
+            error = error or f'HTTP {status}'
+            if (status is None or status in RETRY_STATUSES) and attempts < max_attempts:
+                values = {'attempts': attempts, 'last_error': error[:255],
+                          'next_attempt_at': now + retry_delay(attempts)}
+                stats['retried'] += 1
+            else:
+                values = {'attempts': attempts, 'last_error': error[:255], 'status': 'failed'}
+                stats['failed'] += 1
+            db.session.execute(update(PushMessage).where(PushMessage.id == row.id).values(**values))
+
+    if sent_ids:
+        db.session.execute(
+            update(PushMessage).where(PushMessage.id.in_(sent_ids))
+            .values(status='sent', sent_at=now, attempts=PushMessage.attempts + 1, last_error=None)
+        )
+        db.session.execute(
+            update(PushSubscription).where(PushSubscription.id.in_(delivered_subscriptions))
+            .values(last_success_at=now)
+        )
+        stats['sent'] += len(sent_ids)
+    if expired_subscriptions:
+        stats['pruned'] += prune_subscriptions(expired_subscriptions)
+    db.session.commit()
+    return len(batch)
+
+def prune_subscriptions(subscription_ids):
+    db.session.execute(delete(PushMessage).where(PushMessage.subscription_id.in_(subscription_ids)))
+    result = db.session.execute(delete(PushSubscription).where(PushSubscription.id.in_(subscription_ids)))
+    return result.rowcount
+
+# Доставка очереди. Между процессами синхронизируется через job_locks;
+# возвращает статистику или None, если очередь обрабатывает другой процесс.
+def deliver_pending(sender=None, batch_size=None, concurrency=None, max_batches=50):
+    config = current_app.config
+    sender = sender or get_push_sender()
+    batch_size = batch_size or config['PUSH_BATCH_SIZE']
+    concurrency = concurrency or config['PUSH_CONCURRENCY']
+
+    if not acquire_job_lock(DELIVERY_LOCK, ttl=timedelta(minutes=10)):
+        return None
+
+    stats = {'sent': 0, 'retried': 0, 'failed': 0, 'pruned': 0}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(max_batches):
+                if _deliver_batch(sender, executor, batch_size, config['PUSH_MAX_ATTEMPTS'], stats) < batch_size:
+                    break
+    except Exception:
+        db.session.rollback()
+        release_job_lock(DELIVERY_LOCK, completed=False)
+        raise
+
+    release_job_lock(DELIVERY_LOCK)
+    return stats
+
+# Фоновая доставка внутри процесса (PUSH_WORKER=1), аналогично ReminderScheduler
+class PushWorker:
+    def __init__(self, app, interval=30):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='push-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    stats = deliver_pending()
+                    if stats and any(stats.values()):
+                        logger.info('Push delivery: %s', stats)
+                except Exception:
+                    logger.exception('Push delivery failed')
+                finally:
+                    db.session.remove()
+            self._stop.wait(self.interval)
+
+# CLI / cron: flask --app main deliver-pushes
+@click.command('deliver-pushes')
+@click.option('--batch-size', type=int, default=None)
+@click.option('--concurrency', type=int, default=None)
+@with_appcontext
+def deliver_pushes_command(batch_size, concurrency):
+    stats = deliver_pending(batch_size=batch_size, concurrency=concurrency)
+    if stats is None:
+        click.echo('Push queue is already being delivered by another process')
+    else:
+        click.echo('Sent {sent}, retried {retried}, failed {failed}, pruned {pruned} subscriptions'.format(**stats))
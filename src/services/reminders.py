@@ -0,0 +1,135 @@
+import threading
+import logging
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import and_, insert, select
+
+from src.models.user import db
+from src.models.appointment import Appointment, Notification
+from src.services.events import publish_notification_events
+from src.services.jobs import acquire_job_lock, release_job_lock
+from src.services.notifications import recount_unread, touch_notifications
+from src.services.push import build_push_payload, enqueue_pushes
+
+logger = logging.getLogger(__name__)
+
+RELATIVE_DAYS = {0: 'сегодня', 1: 'завтра', 2: 'послезавтра'}
+
+def build_reminder_message(appointment, target_date, today=None):
+    time_slot_text = "утро (9:00-13:00)" if appointment.time_slot == "morning" else "вечер (15:00-18:00)"
+    door_type_text = "входных дверей" if appointment.door_type == "entrance" else "межкомнатных дверей"
+
+    # День - относительно даты запуска задачи (generate-reminders --date может быть любой датой)
+    today = today or datetime.utcnow().date()
+    date_text = target_date.strftime('%d.%m.%Y')
+    relative = RELATIVE_DAYS.get((target_date - today).days)
+    when = f"{relative} ({date_text})" if relative else date_text
+    message = f"Напоминание: {when} у вас запланирована установка {door_type_text}, {time_slot_text}"
+    if appointment.address:
+        message += f", по адресу: {appointment.address}"
+    if appointment.invoice_number:
+        message += f", накладная №{appointment.invoice_number}"
+    return message
+
+# Создает напоминания для всех записей на target_date (по умолчанию - завтра).
+# Возвращает количество созданных уведомлений или None, если задачу уже
+# выполняет другой процесс.
+def generate_reminders(target_date=None):
+    today = datetime.utcnow().date()
+    if target_date is None:
+        target_date = today + timedelta(days=1)
+
+    lock_name = f'reminders:{target_date.isoformat()}'
+    if not acquire_job_lock(lock_name):
+        return None
+
+    try:
+        # Anti-join: записи на дату, для которых еще нет уведомления
+        missing = db.session.execute(
+            select(
+                Appointment.id,
+                Appointment.user_id,
+                Appointment.time_slot,
+                Appointment.door_type,
+                Appointment.address,
+                Appointment.invoice_number
+            )
+            .outerjoin(Notification, and_(
+                Notification.appointment_id == Appointment.id,
+                Notification.user_id == Appointment.user_id
+            ))
+            .where(Appointment.date == target_date, Notification.id.is_(None))
+        ).all()
+
+        rows = [{
+            'user_id': appointment.user_id,
+            'appointment_id': appointment.id,
+            'message': build_reminder_message(appointment, target_date, today),
+            'is_read': False,
+            'created_at': datetime.utcnow()
+        } for appointment in missing]
+
+        if rows:
+            db.session.execute(insert(Notification), rows)
+            recount_unread({row['user_id'] for row in rows})
+            touch_notifications({row['user_id'] for row in rows})
+            # Push-сообщения отправит очередь (deliver-pushes), не эта задача
+            enqueue_pushes((row['user_id'], build_push_payload(row['message'])) for row in rows)
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        release_job_lock(lock_name, completed=False)
+        raise
+
+    release_job_lock(lock_name)
+    publish_notification_events(row['user_id'] for row in rows)
+    return len(rows)
+
+# Периодический запуск внутри процесса (включается REMINDER_SCHEDULER=1).
+# Между воркерами задача синхронизируется через job_locks.
+class ReminderScheduler:
+    def __init__(self, app, interval=900):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='reminder-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    created = generate_reminders()
+                    if created:
+                        logger.info('Created %d reminder notifications', created)
+                except Exception:
+                    logger.exception('Reminder generation failed')
+                finally:
+                    db.session.remove()
+            self._stop.wait(self.interval)
+
+# CLI / cron: flask --app main generate-reminders [--date YYYY-MM-DD]
+@click.command('generate-reminders')
+@click.option('--date', 'date_str', default=None, help='Date of appointments (YYYY-MM-DD), tomorrow by default')
+@with_appcontext
+def generate_reminders_command(date_str):
+    target_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else None
+    created = generate_reminders(target_date)
+    if created is None:
+        click.echo('Reminders are already being generated by another process')
+    else:
+        click.echo(f'Created {created} reminder notifications')
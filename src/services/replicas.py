@@ -0,0 +1,124 @@
+import random
+import sqlite3
+import time
+
+import click
+from flask import current_app, g, has_request_context, request, session
+from flask.cli import with_appcontext
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+
+# Чтение с реплик: GET/HEAD-запросы читают с одной из реплик
+# (DATABASE_REPLICA_URLS), все остальное - с основной БД. После записи
+# пользователь REPLICA_STICKY_SECONDS секунд читает с основной БД
+# (last_write_at в сессии), чтобы сразу видеть свою запись.
+
+REPLICA_BIND_PREFIX = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+# Версии авторизации всегда читаются с основной БД: отставание реплики
+# вернуло бы отозванные права. change_versions, наоборот, читается с той же
+# реплики, что и данные: версия - ключ кэша и ETag, и версия с основной БД
+# при данных с отстающей реплики сохранила бы старые данные под новым ключом.
+PRIMARY_TABLES = frozenset({'user_auth_versions'})
+
+def replica_bind_keys(config):
+    return [f'{REPLICA_BIND_PREFIX}{i}' for i in range(1, len(config['SQLALCHEMY_REPLICA_URIS']) + 1)]
+
+# Bind'ы реплик для SQLALCHEMY_BINDS: {'replica1': {'url': ..., **engine_options}}
+def replica_binds(config, engine_options):
+    return {
+        key: {'url': uri, **engine_options(config, uri)}
+        for key, uri in zip(replica_bind_keys(config), config['SQLALCHEMY_REPLICA_URIS'])
+    }
+
+# Сессия db.session: запросы моделей основной БД в GET-запросе уходят на
+# реплику, выбранную для запроса. Запись (flush, INSERT/UPDATE/DELETE,
+# SELECT ... FOR UPDATE) переключает сессию на основную БД до ее закрытия.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self.info.get('primary'):
+            return engine
+        if getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+            self.info['primary'] = True
+            return engine
+        if mapper is not None and inspect(mapper).local_table.name in PRIMARY_TABLES:
+            return engine
+
+        key = g.get('replica_bind') if has_request_context() else None
+        engines = self._db.engines
+        if key is None or engine is not engines.get(None):
+            return engine
+        return engines[key]
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _pin_to_primary(db_session, flush_context, instances):
+    db_session.info['primary'] = True
+
+def recently_wrote(window):
+    last_write_at = session.get('last_write_at')
+    return last_write_at is not None and time.time() - last_write_at < window
+
+def init_replicas(app, db):
+    keys = replica_bind_keys(app.config)
+    if not keys:
+        return
+
+    from src.services.instrumentation import instrument_queries
+    from src.services.pool_metrics import instrument_engine
+    for key in keys:
+        instrument_engine(db.engines[key], key)
+        instrument_queries(db.engines[key])
+
+    window = app.config['REPLICA_STICKY_SECONDS']
+
+    @app.before_request
+    def choose_replica():
+        # Одна реплика на весь запрос, чтобы ответ был согласованным
+        if request.method in READ_METHODS and not recently_wrote(window):
+            g.replica_bind = random.choice(keys)
+
+    @app.after_request
+    def remember_write(response):
+        if request.method not in READ_METHODS and response.status_code < 400 and 'user_id' in session:
+            session['last_write_at'] = time.time()
+        return response
+
+def _sqlite_path(uri):
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        raise click.ClickException(f'Not a SQLite file database: {url.render_as_string(hide_password=True)}')
+    return url.database
+
+# Имитация репликации для локальной проверки: копия файла основной SQLite-БД
+# в файлы реплик (sqlite3 backup). MySQL-реплики настраиваются репликацией MySQL.
+def copy_to_replicas(config):
+    primary = _sqlite_path(config['SQLALCHEMY_DATABASE_URI'])
+    replicas = [_sqlite_path(uri) for uri in config['SQLALCHEMY_REPLICA_URIS']]
+    source = sqlite3.connect(primary)
+    try:
+        for path in replicas:
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+    return replicas
+
+# flask --app main sync-replicas [--interval 2]
+@click.command('sync-replicas')
+@click.option('--interval', type=float, default=0, help='Repeat every N seconds (simulated replication lag)')
+@with_appcontext
+def sync_replicas_command(interval):
+    config = current_app.config
+    if not config['SQLALCHEMY_REPLICA_URIS']:
+        raise click.ClickException('No replicas configured (DATABASE_REPLICA_URLS)')
+    while True:
+        replicas = copy_to_replicas(config)
+        click.echo(f'Copied primary to {len(replicas)} replicas')
+        if not interval:
+            break
+        time.sleep(interval)
@@ -0,0 +1,178 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+from src.models.user import db
+from src.models.appointment import Notification, NotificationArchive
+from src.models.push import PushMessage
+from src.services.events import publish_notification_events
+from src.services.jobs import acquire_job_lock, release_job_lock
+from src.services.json_provider import COMPACT_SEPARATORS
+from src.services.notifications import recount_unread, touch_notifications
+from src.services.serializers import NOTIFICATION_COLUMNS, notification_row
+
+RETENTION_LOCK = 'notification-retention'
+ARCHIVE_MODES = ('table', 'ndjson', 'none')
+
+# Условие политики хранения: прочитанные старше read_days,
+# непрочитанные старше unread_days (0 - непрочитанные не удаляются)
+def retention_condition(now, read_days, unread_days):
+    condition = and_(
+        Notification.is_read == True,  # noqa: E712
+        Notification.created_at < now - timedelta(days=read_days)
+    )
+    if unread_days:
+        condition = or_(condition, and_(
+            Notification.is_read == False,  # noqa: E712
+            Notification.created_at < now - timedelta(days=unread_days)
+        ))
+    return condition
+
+def count_expired(now=None):
+    config = current_app.config
+    condition = retention_condition(
+        now or datetime.utcnow(),
+        config['NOTIFICATION_RETENTION_READ_DAYS'],
+        config['NOTIFICATION_RETENTION_UNREAD_DAYS']
+    )
+    return db.session.execute(select(func.count(Notification.id)).where(condition)).scalar()
+
+def _archive_rows(rows, mode, export, archived_at):
+    if mode == 'table':
+        db.session.execute(insert(NotificationArchive), [
+            dict(zip(('id', 'user_id', 'appointment_id', 'message', 'is_read', 'created_at'), row),
+                 archived_at=archived_at)
+            for row in rows
+        ])
+    elif mode == 'ndjson':
+        dumps = current_app.json.dumps
+        export.write(''.join(dumps(notification_row(row), separators=COMPACT_SEPARATORS) + '\n' for row in rows))
+        # Строки должны оказаться на диске до commit удаления
+        export.flush()
+        os.fsync(export.fileno())
+
+# Удаляет отправленные и окончательно не доставленные push-сообщения старше
+# PUSH_RETENTION_DAYS пачками по chunk_size строк; pending не трогает
+def purge_push_messages(now, chunk_size):
+    cutoff = now - timedelta(days=current_app.config['PUSH_RETENTION_DAYS'])
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            select(PushMessage.id)
+            .where(PushMessage.status.in_(('sent', 'failed')), PushMessage.created_at < cutoff)
+            .order_by(PushMessage.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(
+            delete(PushMessage).where(PushMessage.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < chunk_size:
+            break
+    return deleted
+
+# Удаляет уведомления по политике хранения пачками по chunk_size строк,
+# каждая пачка - отдельная короткая транзакция (на MySQL блокировки держатся
+# только на время одной пачки). Перед удалением строки копируются в
+# notification_archive или в NDJSON-файл. Возвращает статистику или None,
+# если задачу уже выполняет другой процесс.
+def purge_notifications(now=None, archive=None, chunk_size=None, pause=0.0):
+    config = current_app.config
+    now = now or datetime.utcnow()
+    archive = archive or config['NOTIFICATION_ARCHIVE']
+    chunk_size = chunk_size or config['NOTIFICATION_RETENTION_CHUNK']
+    if archive not in ARCHIVE_MODES:
+        raise ValueError(f'Unknown archive mode: {archive}. Use one of: {", ".join(ARCHIVE_MODES)}')
+
+    if not acquire_job_lock(RETENTION_LOCK, ttl=timedelta(minutes=30)):
+        return None
+
+    condition = retention_condition(
+        now, config['NOTIFICATION_RETENTION_READ_DAYS'], config['NOTIFICATION_RETENTION_UNREAD_DAYS']
+    )
+    stats = {'deleted': 0, 'chunks': 0, 'archive': archive, 'export': None, 'push_deleted': 0}
+    affected_users = set()
+    export = None
+    if archive == 'ndjson':
+        os.makedirs(config['NOTIFICATION_ARCHIVE_DIR'], exist_ok=True)
+        stats['export'] = os.path.join(
+            config['NOTIFICATION_ARCHIVE_DIR'], f'notifications-{now.strftime("%Y%m%d-%H%M%S")}.ndjson'
+        )
+        export = open(stats['export'], 'a', encoding='utf-8')
+
+    last_id = 0
+    try:
+        while True:
+            # Обход по первичному ключу: старые уведомления в начале таблицы
+            rows = db.session.execute(
+                select(*NOTIFICATION_COLUMNS)
+                .where(condition, Notification.id > last_id)
+                .order_by(Notification.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            ids = [row[0] for row in rows]
+
+            _archive_rows(rows, archive, export, now)
+            db.session.execute(
+                delete(Notification).where(Notification.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            # Счетчики меняются только у пользователей с удаленными непрочитанными
+            recount_unread({row[1] for row in rows if not row[4]})
+            user_ids = {row[1] for row in rows}
+            touch_notifications(user_ids)
+            db.session.commit()
+
+            affected_users |= user_ids
+            stats['deleted'] += len(ids)
+            stats['chunks'] += 1
+            if len(rows) < chunk_size:
+                break
+            if pause:
+                time.sleep(pause)
+        stats['push_deleted'] = purge_push_messages(now, chunk_size)
+    except Exception:
+        db.session.rollback()
+        release_job_lock(RETENTION_LOCK, completed=False)
+        raise
+    finally:
+        if export:
+            export.close()
+
+    release_job_lock(RETENTION_LOCK)
+    if export and not stats['deleted']:
+        os.remove(stats['export'])
+        stats['export'] = None
+    publish_notification_events(affected_users)
+    return stats
+
+# CLI / cron: flask --app main purge-notifications
+@click.command('purge-notifications')
+@click.option('--archive', type=click.Choice(ARCHIVE_MODES), default=None,
+              help='Where to copy rows before deleting (NOTIFICATION_ARCHIVE by default)')
+@click.option('--chunk-size', type=int, default=None, help='Rows per delete transaction')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+@click.option('--dry-run', is_flag=True, help='Only count notifications matching the policy')
+@with_appcontext
+def purge_notifications_command(archive, chunk_size, pause, dry_run):
+    if dry_run:
+        click.echo(f'{count_expired()} notifications match the retention policy')
+        return
+    stats = purge_notifications(archive=archive, chunk_size=chunk_size, pause=pause)
+    if stats is None:
+        click.echo('Retention is already running in another process')
+        return
+    click.echo(f"Deleted {stats['deleted']} notifications in {stats['chunks']} chunks (archive: {stats['archive']})")
+    click.echo(f"Deleted {stats['push_deleted']} sent or failed push messages")
+    if stats['export']:
+        click.echo(f"Exported to {stats['export']}")
@@ -0,0 +1,99 @@
+from src.models.user import User
+from src.models.appointment import Appointment, AppointmentTombstone, Notification
+
+# Сериализация списков без ORM-объектов: запрос выбирает только колонки,
+# строки превращаются в те же словари, что и Model.to_dict().
+# Порядок колонок важен: строки распаковываются по позициям.
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+APPOINTMENT_COLUMNS = (
+    Appointment.id,
+    Appointment.user_id,
+    Appointment.date,
+    Appointment.time_slot,
+    Appointment.door_type,
+    Appointment.comment,
+    Appointment.invoice_number,
+    Appointment.address,
+    Appointment.created_at,
+    Appointment.updated_at,
+    Appointment.is_weekend,
+)
+
+def appointment_row(row, date_str=None):
+    (appointment_id, user_id, day, time_slot, door_type, comment,
+     invoice_number, address, created_at, updated_at, is_weekend) = row[:11]
+    return {
+        'id': appointment_id,
+        'user_id': user_id,
+        'date': date_str if date_str is not None else _iso(day),
+        'time_slot': time_slot,
+        'door_type': door_type,
+        'comment': comment,
+        'invoice_number': invoice_number,
+        'address': address,
+        'created_at': _iso(created_at),
+        'updated_at': _iso(updated_at),
+        'is_weekend': is_weekend
+    }
+
+TOMBSTONE_COLUMNS = (
+    AppointmentTombstone.id,
+    AppointmentTombstone.appointment_id,
+    AppointmentTombstone.date,
+    AppointmentTombstone.door_type,
+    AppointmentTombstone.deleted_at,
+)
+
+def tombstone_row(row):
+    _, appointment_id, day, door_type, deleted_at = row[:5]
+    return {
+        'id': appointment_id,
+        'date': _iso(day),
+        'door_type': door_type,
+        'deleted_at': _iso(deleted_at)
+    }
+
+NOTIFICATION_COLUMNS = (
+    Notification.id,
+    Notification.user_id,
+    Notification.appointment_id,
+    Notification.message,
+    Notification.is_read,
+    Notification.created_at,
+)
+
+def notification_row(row):
+    notification_id, user_id, appointment_id, message, is_read, created_at = row
+    return {
+        'id': notification_id,
+        'user_id': user_id,
+        'appointment_id': appointment_id,
+        'message': message,
+        'is_read': is_read,
+        'created_at': _iso(created_at)
+    }
+
+USER_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.role,
+    User.created_at,
+    User.last_login,
+    User.user_color,
+)
+
+def user_row(row):
+    user_id, username, email, role, created_at, last_login, user_color = row
+    return {
+        'id': user_id,
+        'username': username,
+        'email': email,
+        'role': role,
+        'created_at': _iso(created_at),
+        'last_login': _iso(last_login),
+        'user_color': user_color
+    }
@@ -0,0 +1,35 @@
+from sqlalchemy import select
+
+from src.models.user import db, User
+from src.services.cache import get_cache, versioned_key
+from src.services.serializers import USER_COLUMNS, user_row
+from src.services.versions import bump_versions, get_versions
+
+# Область версии списка пользователей; увеличивается при изменении полей
+# списка, кроме last_login (вход не сбрасывает кэш)
+USERS_SCOPE = 'users'
+USERS_CACHE_TTL = 600
+
+# Вызывается до commit изменения пользователя (в той же транзакции)
+def touch_users():
+    bump_versions([USERS_SCOPE])
+
+# Список пользователей из общего кэша, ключ - версия области users.
+# last_login меняется при каждом входе, поэтому берется из БД на каждый
+# запрос (узкий запрос по первичному ключу) и подставляется в кэшированные строки.
+def get_user_directory():
+    version, = get_versions([USERS_SCOPE])
+    cache = get_cache()
+    key = versioned_key('users:list', version)
+    users = cache.get(key)
+    if users is None:
+        users = [user_row(row) for row in db.session.execute(select(*USER_COLUMNS).order_by(User.id))]
+        cache.set(key, users, USERS_CACHE_TTL)
+        return users
+
+    # Кэш в памяти процесса отдает сам объект: строки копируются, а не меняются
+    last_logins = dict(db.session.execute(select(User.id, User.last_login)).all())
+    return [
+        {**user, 'last_login': last_logins[user['id']].isoformat() if last_logins.get(user['id']) else None}
+        for user in users
+    ]
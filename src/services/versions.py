@@ -0,0 +1,63 @@
+import hashlib
+
+from flask import Response, request
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src.models.user import db
+from src.models.version import ChangeVersion
+
+# Увеличивает версии областей в текущей транзакции; commit делает вызывающий код
+def bump_versions(scopes):
+    scopes = set(scopes)
+    if not scopes:
+        return
+
+    existing = set(db.session.execute(
+        select(ChangeVersion.scope).where(ChangeVersion.scope.in_(scopes))
+    ).scalars())
+    if existing:
+        db.session.execute(
+            update(ChangeVersion)
+            .where(ChangeVersion.scope.in_(existing))
+            .values(version=ChangeVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    # Новые области вставляются в savepoint: если параллельная транзакция
+    # успела создать ту же строку, увеличиваем ее версию вместо ошибки
+    for scope in scopes - existing:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(ChangeVersion).values(scope=scope, version=1))
+        except IntegrityError:
+            db.session.execute(
+                update(ChangeVersion)
+                .where(ChangeVersion.scope == scope)
+                .values(version=ChangeVersion.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+# Версии областей одним запросом по первичному ключу
+def get_versions(scopes):
+    scopes = list(scopes)
+    versions = dict(db.session.execute(
+        select(ChangeVersion.scope, ChangeVersion.version).where(ChangeVersion.scope.in_(scopes))
+    ).all())
+    return [versions.get(scope, 0) for scope in scopes]
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+# 304 Not Modified, если клиент прислал актуальный ETag
+def not_modified(etag):
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -7,6 +7,7 @@ let doorType = 'entrance'; // По умолчанию показываем ка
 let calendarViewMode = 'month'; // 'month' или 'week'
 let currentWeekStartDate = null; // Monday date for weekly mode
 let calendarViewModeWasManuallyChanged = false;
+let eventSource = null; // SSE-подключение к /api/events
 
 function isMobileScreen() {
     return window.innerWidth <= 768;
@@ -45,6 +46,107 @@ function getContrastColor(hexColor) {
     // Возвращаем черный или белый в зависимости от яркости
     return brightness > 128 ? '#000000' : '#ffffff';
 }
+// Кэш GET-ответов с ETag: url -> { etag, body }
+const etagCache = new Map();
+const ETAG_CACHE_LIMIT = 50;
+
+// fetch с If-None-Match: при 304 возвращает сохраненный ответ как обычный 200
+function cachedFetch(url) {
+    const cached = etagCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    
+    return fetch(url, { headers: headers, cache: 'no-store' })
+        .then(response => {
+            if (response.status === 304 && cached) {
+                return new Response(cached.body, {
+                    status: 200,
+                    headers: { 'Content-Type': 'application/json' }
+                });
+            }
+            
+            const etag = response.headers.get('ETag');
+            if (!response.ok || !etag) {
+                return response;
+            }
+            
+            return response.text().then(body => {
+                etagCache.delete(url);
+                etagCache.set(url, { etag: etag, body: body });
+                if (etagCache.size > ETAG_CACHE_LIMIT) {
+                    etagCache.delete(etagCache.keys().next().value);
+                }
+                return new Response(body, {
+                    status: response.status,
+                    headers: { 'Content-Type': 'application/json' }
+                });
+            });
+        });
+}
+
+// Загруженные месяцы календаря (LRU): 'doorType:YYYY-MM' -> дни месяца
+const monthCache = new Map();
+const MONTH_CACHE_LIMIT = 12;
+
+// month - номер месяца от 0, как в Date
+function monthKey(year, month) {
+    return `${year}-${String(month + 1).padStart(2, '0')}`;
+}
+
+function getCachedMonth(year, month) {
+    const key = `${doorType}:${monthKey(year, month)}`;
+    const days = monthCache.get(key);
+    if (days) {
+        monthCache.delete(key);
+        monthCache.set(key, days);
+    }
+    return days;
+}
+
+function storeMonth(door, key, days) {
+    monthCache.delete(`${door}:${key}`);
+    monthCache.set(`${door}:${key}`, days);
+    if (monthCache.size > MONTH_CACHE_LIMIT) {
+        monthCache.delete(monthCache.keys().next().value);
+    }
+}
+
+// Месяц с датой dateStr устарел для всех типов дверей
+function forgetMonth(dateStr) {
+    const key = dateStr.slice(0, 7);
+    ['entrance', 'interior'].forEach(door => monthCache.delete(`${door}:${key}`));
+}
+
+// Несколько месяцев одним запросом (months - [{ year, month }]), результат попадает в monthCache
+function fetchMonths(months) {
+    const door = doorType;
+    const param = months.map(m => monthKey(m.year, m.month)).join(',');
+    return cachedFetch(`/api/calendar?months=${param}&door_type=${door}`)
+        .then(response => {
+            if (response.ok) {
+                return response.json();
+            } else {
+                throw new Error('Failed to load calendar');
+            }
+        })
+        .then(data => {
+            Object.entries(data.months).forEach(([key, days]) => storeMonth(door, key, days));
+            return data.months;
+        });
+}
+
+// Фоновая загрузка предыдущего и следующего месяца, чтобы переключение было мгновенным
+function prefetchAdjacentMonths(year, month) {
+    const missing = [-1, 1]
+        .map(delta => new Date(year, month + delta, 1))
+        .map(d => ({ year: d.getFullYear(), month: d.getMonth() }))
+        .filter(m => !monthCache.has(`${doorType}:${monthKey(m.year, m.month)}`));
+    if (missing.length) {
+        fetchMonths(missing).catch(error => {
+            console.error('Calendar prefetch error:', error);
+        });
+    }
+}
+
 // --- PATCH: определение мобильного режима ---
 function isMobile() {
     return window.innerWidth <= 768;
@@ -227,6 +329,9 @@ function showMainInterface() {
     
     // Загружаем уведомления
     loadNotifications();
+    
+    // Подписываемся на изменения календаря и уведомлений
+    startEventStream();
 }
 
 // Настройка обработчиков событий для основного интерфейса
@@ -711,25 +816,10 @@ if (calendarViewMode === 'week' && currentWeekStartDate) {
     year = currentWeekStartDate.getFullYear();
     month = currentWeekStartDate.getMonth();
 }
-    // Формируем даты начала и конца месяца
-    const startDate = new Date(year, month, 1);
-    const endDate = new Date(year, month + 1, 0);
-    
-    // Форматируем даты для API
-    const startDateStr = formatDate(startDate);
-    const endDateStr = formatDate(endDate);
-    
-    // Загружаем данные календаря
-    fetch(`/api/calendar?start_date=${startDateStr}&end_date=${endDateStr}&door_type=${doorType}`)
-        .then(response => {
-            if (response.ok) {
-                return response.json();
-            } else {
-                throw new Error('Failed to load calendar');
-            }
-        })
-        .then(data => {
-            calendarData = data.calendar;
+    // Загружаем данные календаря (месяц заново, с проверкой ETag)
+    fetchMonths([{ year: year, month: month }])
+        .then(months => {
+            calendarData = months[monthKey(year, month)];
     // Определяем режим по-умолчанию, если пользователь не переключал вручную
     if (!calendarViewModeWasManuallyChanged) {
         calendarViewMode = isMobileScreen() ? 'week' : 'month';
@@ -740,6 +830,7 @@ if (calendarViewMode === 'week' && currentWeekStartDate) {
         currentWeekStartDate = getMonday(now);
     }
     renderCalendar(year, month);
+    prefetchAdjacentMonths(year, month);
 })
         .catch(error => {
             calendarContainer.innerHTML = '<div class="error">Ошибка загрузки календаря</div>';
@@ -1424,9 +1515,9 @@ function deleteAppointment(appointmentId, closeModalCallback) {
     });
 }
 
-// Загрузка уведомлений
+// Загрузка счетчика непрочитанных уведомлений
 function loadNotifications() {
-    fetch('/api/notifications')
+    fetch('/api/notifications/unread_count')
         .then(response => {
             if (response.ok) {
                 return response.json();
@@ -1435,7 +1526,7 @@ function loadNotifications() {
             }
         })
         .then(data => {
-            const unreadCount = data.notifications.filter(n => !n.is_read).length;
+            const unreadCount = data.count;
             const badgeElement = document.getElementById('notification-count');
             
             if (unreadCount > 0) {
@@ -1450,9 +1541,36 @@ function loadNotifications() {
         });
 }
 
-// Показать модальное окно с уведомлениями
+// HTML для списка уведомлений
+function renderNotificationItems(notifications) {
+    let notificationsHtml = '';
+    notifications.forEach(notification => {
+        notificationsHtml += `
+            <div class="notification-item ${notification.is_read ? '' : 'unread'}" data-id="${notification.id}">
+                <div class="notification-content">${notification.message}</div>
+                <div class="notification-date">${formatDateTimeForDisplay(notification.created_at)}</div>
+                ${notification.is_read ? '' : '<button class="btn btn-sm btn-outline mark-read-btn">Отметить как прочитанное</button>'}
+            </div>
+        `;
+    });
+    return notificationsHtml;
+}
+
+// Обработчики кнопок "Отметить как прочитанное" для добавленных элементов
+function bindMarkReadButtons(container) {
+    container.querySelectorAll('.mark-read-btn:not([data-bound])').forEach(button => {
+        button.dataset.bound = '1';
+        button.addEventListener('click', function() {
+            const notificationItem = this.closest('.notification-item');
+            const notificationId = notificationItem.dataset.id;
+            markNotificationAsRead(notificationId, notificationItem);
+        });
+    });
+}
+
+// Показать модальное окно с уведомлениями (постранично)
 function showNotificationsModal() {
-    fetch('/api/notifications')
+    cachedFetch('/api/notifications')
         .then(response => {
             if (response.ok) {
                 return response.json();
@@ -1462,22 +1580,17 @@ function showNotificationsModal() {
         })
         .then(data => {
             const modalContainer = document.getElementById('modal-container');
+            let nextCursor = data.next_cursor;
+            const hasUnread = data.notifications.some(notification => !notification.is_read);
+            // Граница для "Прочитать все": уведомления, пришедшие после открытия окна, не трогаем
+            const newestCreatedAt = data.notifications.length > 0 ? data.notifications[0].created_at : null;
             
             let notificationsHtml = '';
             if (data.notifications.length === 0) {
                 notificationsHtml = '<div class="empty-state">У вас нет уведомлений</div>';
             } else {
-                notificationsHtml = '<div class="notification-list">';
-                data.notifications.forEach(notification => {
-                    notificationsHtml += `
-                        <div class="notification-item ${notification.is_read ? '' : 'unread'}" data-id="${notification.id}">
-                            <div class="notification-content">${notification.message}</div>
-                            <div class="notification-date">${formatDateTimeForDisplay(notification.created_at)}</div>
-                            ${notification.is_read ? '' : '<button class="btn btn-sm btn-outline mark-read-btn">Отметить как прочитанное</button>'}
-                        </div>
-                    `;
-                });
-                notificationsHtml += '</div>';
+                notificationsHtml = `<div class="notification-list">${renderNotificationItems(data.notifications)}</div>`;
+                notificationsHtml += '<button class="btn btn-sm btn-outline load-more-btn" style="display: none;">Показать еще</button>';
             }
             
             modalContainer.innerHTML = `
@@ -1491,6 +1604,7 @@ function showNotificationsModal() {
                             ${notificationsHtml}
                         </div>
                         <div class="modal-footer">
+                            ${hasUnread ? '<button class="btn btn-outline mark-all-read-btn">Прочитать все</button>' : ''}
                             <button class="btn btn-outline modal-cancel">Закрыть</button>
                         </div>
                     </div>
@@ -1509,14 +1623,42 @@ function showNotificationsModal() {
             modalContainer.querySelector('.modal-cancel').addEventListener('click', closeModal);
             
             // Добавляем обработчики для кнопок "Отметить как прочитанное"
-            const markReadButtons = modalContainer.querySelectorAll('.mark-read-btn');
-            markReadButtons.forEach(button => {
-                button.addEventListener('click', function() {
-                    const notificationItem = this.closest('.notification-item');
-                    const notificationId = notificationItem.dataset.id;
-                    markNotificationAsRead(notificationId, notificationItem);
+            bindMarkReadButtons(modalContainer);
+            
+            // Все уведомления до самого нового из показанных - одним запросом
+            const markAllButton = modalContainer.querySelector('.mark-all-read-btn');
+            if (markAllButton) {
+                markAllButton.addEventListener('click', function() {
+                    markAllNotificationsAsRead(newestCreatedAt, modalContainer);
+                    markAllButton.remove();
                 });
-            });
+            }
+            
+            // Подгрузка следующей страницы по курсору
+            const loadMoreButton = modalContainer.querySelector('.load-more-btn');
+            if (loadMoreButton) {
+                loadMoreButton.style.display = nextCursor ? 'block' : 'none';
+                loadMoreButton.addEventListener('click', function() {
+                    cachedFetch(`/api/notifications?cursor=${encodeURIComponent(nextCursor)}`)
+                        .then(response => {
+                            if (response.ok) {
+                                return response.json();
+                            } else {
+                                throw new Error('Failed to load notifications');
+                            }
+                        })
+                        .then(page => {
+                            const list = modalContainer.querySelector('.notification-list');
+                            list.insertAdjacentHTML('beforeend', renderNotificationItems(page.notifications));
+                            bindMarkReadButtons(list);
+                            nextCursor = page.next_cursor;
+                            loadMoreButton.style.display = nextCursor ? 'block' : 'none';
+                        })
+                        .catch(error => {
+                            console.error('Error loading notifications:', error);
+                        });
+                });
+            }
         })
         .catch(error => {
             console.error('Error loading notifications:', error);
@@ -1552,6 +1694,144 @@ function markNotificationAsRead(notificationId, notificationElement) {
     });
 }
 
+// Отметить прочитанными все уведомления до upTo (created_at) одним запросом
+function markAllNotificationsAsRead(upTo, container) {
+    fetch('/api/notifications/read_all', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(upTo ? { up_to: upTo } : {})
+    })
+    .then(response => {
+        if (response.ok) {
+            return response.json();
+        } else {
+            throw new Error('Failed to mark notifications as read');
+        }
+    })
+    .then(data => {
+        container.querySelectorAll('.notification-item.unread').forEach(item => {
+            item.classList.remove('unread');
+            const markReadBtn = item.querySelector('.mark-read-btn');
+            if (markReadBtn) {
+                markReadBtn.remove();
+            }
+        });
+        
+        // Ответ содержит новое число непрочитанных
+        const badgeElement = document.getElementById('notification-count');
+        if (data.count > 0) {
+            badgeElement.textContent = data.count;
+            badgeElement.style.display = 'block';
+        } else {
+            badgeElement.style.display = 'none';
+        }
+    })
+    .catch(error => {
+        console.error('Error marking notifications as read:', error);
+    });
+}
+
+// Подписка на поток изменений (Server-Sent Events)
+function startEventStream() {
+    if (!window.EventSource || eventSource) {
+        return;
+    }
+    
+    eventSource = new EventSource('/api/events');
+    
+    eventSource.addEventListener('appointment', function(e) {
+        const change = JSON.parse(e.data);
+        [change.date, change.previous_date].forEach(dateStr => {
+            if (dateStr) {
+                forgetMonth(dateStr);
+                refreshCalendarDay(dateStr);
+            }
+        });
+    });
+    
+    eventSource.addEventListener('notification', function() {
+        loadNotifications();
+    });
+    
+    // История событий потеряна (курсор удален из журнала change_events) - перечитываем все
+    eventSource.addEventListener('resync', function() {
+        monthCache.clear();
+        loadCalendar();
+        loadNotifications();
+    });
+}
+
+function stopEventStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+// Месяц, который сейчас показан в календаре
+function getDisplayedMonth() {
+    const currentMonthElement = document.getElementById('current-month');
+    if (!currentMonthElement || !currentMonthElement.textContent) {
+        return null;
+    }
+    const monthNames = [
+        'Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
+        'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь'
+    ];
+    const [monthName, yearStr] = currentMonthElement.textContent.split(' ');
+    const month = monthNames.indexOf(monthName);
+    if (month < 0) {
+        return null;
+    }
+    return { year: parseInt(yearStr), month: month };
+}
+
+// Перезагрузка одного дня календаря, если он сейчас на экране
+function refreshCalendarDay(dateStr) {
+    const displayed = getDisplayedMonth();
+    const [year, month] = dateStr.split('-').map(Number);
+    if (!displayed || displayed.year !== year || displayed.month !== month - 1) {
+        return;
+    }
+    
+    cachedFetch(`/api/calendar?start_date=${dateStr}&end_date=${dateStr}&door_type=${doorType}`)
+        .then(response => {
+            if (response.ok) {
+                return response.json();
+            } else {
+                throw new Error('Failed to load calendar');
+            }
+        })
+        .then(data => {
+            calendarData = calendarData.filter(day => day.date !== dateStr).concat(data.calendar);
+            storeMonth(doorType, monthKey(displayed.year, displayed.month), calendarData);
+            renderCalendar(displayed.year, displayed.month);
+        })
+        .catch(error => {
+            console.error('Calendar refresh error:', error);
+        });
+}
+
+// Фоновая проверка показанного месяца; перерисовка, только если данные изменились
+function revalidateMonth(year, month) {
+    const before = getCachedMonth(year, month);
+    fetchMonths([{ year: year, month: month }])
+        .then(months => {
+            const displayed = getDisplayedMonth();
+            const days = months[monthKey(year, month)];
+            if (displayed && displayed.year === year && displayed.month === month &&
+                JSON.stringify(days) !== JSON.stringify(before)) {
+                calendarData = days;
+                renderCalendar(year, month);
+            }
+        })
+        .catch(error => {
+            console.error('Calendar refresh error:', error);
+        });
+}
+
 // Изменение месяца в календаре
 function changeMonth(delta) {
     // Получаем текущий месяц из заголовка
@@ -1578,26 +1858,25 @@ function changeMonth(delta) {
         newYear++;
     }
     
-    // Формируем даты начала и конца месяца
-    const startDate = new Date(newYear, newMonth, 1);
-    const endDate = new Date(newYear, newMonth + 1, 0);
-    
-    // Форматируем даты для API
-    const startDateStr = formatDate(startDate);
-    const endDateStr = formatDate(endDate);
+    // Месяц уже загружен (в т.ч. фоновой загрузкой) - рисуем сразу из памяти.
+    // Изменения приходят через SSE; без него месяц перепроверяется по ETag.
+    const cached = getCachedMonth(newYear, newMonth);
+    if (cached) {
+        calendarData = cached;
+        renderCalendar(newYear, newMonth);
+        prefetchAdjacentMonths(newYear, newMonth);
+        if (!eventSource) {
+            revalidateMonth(newYear, newMonth);
+        }
+        return;
+    }
     
     // Загружаем данные календаря для нового месяца
-    fetch(`/api/calendar?start_date=${startDateStr}&end_date=${endDateStr}&door_type=${doorType}`)
-        .then(response => {
-            if (response.ok) {
-                return response.json();
-            } else {
-                throw new Error('Failed to load calendar');
-            }
-        })
-        .then(data => {
-            calendarData = data.calendar;
+    fetchMonths([{ year: newYear, month: newMonth }])
+        .then(months => {
+            calendarData = months[monthKey(newYear, newMonth)];
             renderCalendar(newYear, newMonth);
+            prefetchAdjacentMonths(newYear, newMonth);
         })
         .catch(error => {
             console.error('Calendar loading error:', error);
@@ -1607,6 +1886,7 @@ function changeMonth(delta) {
 
 // Выход из системы
 function logout() {
+    stopEventStream();
     fetch('/api/logout', {
         method: 'POST'
     })
@@ -1,5 +1,6 @@
 // Файл для реализации уведомлений в браузере
-// Используем Service Worker для push-уведомлений
+// Используем Service Worker для push-уведомлений.
+// Список уведомлений и счетчик непрочитанных - в main.js (loadNotifications)
 
 // Регистрация Service Worker
 if (
@@ -35,24 +36,36 @@ function initializePushNotifications(registration) {
   });
 }
 
-// Подписка на push-уведомления
+// Подписка на push-уведомления (публичный VAPID-ключ берется с сервера)
 function subscribeToPushNotifications(registration) {
-  const applicationServerKey = urlB64ToUint8Array(
-    'BEl62iUYgUivxIkv69yViEuiBIa-Ib9-SkvMeAtA3LFgDzkrxZJjSgSnfckjBJuBkr3qBUYIHBQFLXYp5Nksh8U'
-  );
-  
-  registration.pushManager.subscribe({
-    userVisibleOnly: true,
-    applicationServerKey: applicationServerKey
-  })
-  .then(function(subscription) {
-    console.log('User is subscribed.');
-    // Отправляем информацию о подписке на сервер
-    updateSubscriptionOnServer(subscription);
-  })
-  .catch(function(err) {
-    console.log('Failed to subscribe the user: ', err);
-  });
+  fetch('/api/notifications/push_key')
+    .then(function(response) {
+      if (!response.ok) {
+        throw new Error('Failed to load push key');
+      }
+      return response.json();
+    })
+    .then(function(data) {
+      if (!data.public_key) {
+        console.log('Push notifications are not configured on the server.');
+        return null;
+      }
+      return registration.pushManager.subscribe({
+        userVisibleOnly: true,
+        applicationServerKey: urlB64ToUint8Array(data.public_key)
+      });
+    })
+    .then(function(subscription) {
+      if (!subscription) {
+        return;
+      }
+      console.log('User is subscribed.');
+      // Отправляем информацию о подписке на сервер
+      updateSubscriptionOnServer(subscription);
+    })
+    .catch(function(err) {
+      console.log('Failed to subscribe the user: ', err);
+    });
 }
 
 // Преобразование base64 в Uint8Array для applicationServerKey
@@ -132,185 +145,3 @@ function showNotificationDisabledMessage() {
     notificationBanner.remove();
   });
 }
-
-// Функция для проверки новых уведомлений (polling)
-function checkForNotifications() {
-  fetch('/api/notifications')
-    .then(response => {
-      if (!response.ok) {
-        // Если ответ не OK (например, 401 Unauthorized), выбрасываем ошибку
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-      return response.json();
-    })
-    .then(data => {
-      // Проверяем, что data.notifications существует и является массивом
-      if (data && Array.isArray(data.notifications)) {
-        const unreadNotifications = data.notifications.filter(notification => !notification.is_read);
-        
-        if (unreadNotifications.length > 0) {
-          showNotificationBadge(unreadNotifications.length);
-          
-          // Если разрешены уведомления браузера, показываем их
-          if (Notification.permission === 'granted') {
-            unreadNotifications.forEach(notification => {
-              const notif = new Notification('Напоминание о установке', {
-                body: notification.message,
-                icon: '/static/img/logo.png'
-              });
-              
-              notif.onclick = function() {
-                window.focus();
-                markNotificationAsRead(notification.id);
-              };
-            });
-          }
-        }
-      } else {
-        console.warn('Received data.notifications is not an array or is undefined:', data);
-        showNotificationBadge(0); // Сбрасываем счетчик, если данные некорректны
-      }
-    })
-    .catch(error => {
-      console.error('Error checking notifications:', error);
-      showNotificationBadge(0); // Сбрасываем счетчик при ошибке
-    });
-}
-
-// Показать значок с количеством непрочитанных уведомлений
-function showNotificationBadge(count) {
-  const badge = document.getElementById('notification-count'); // Изменено с notification-badge на notification-count
-  if (badge) {
-    badge.textContent = count;
-    badge.style.display = count > 0 ? 'block' : 'none';
-  }
-}
-
-// Отметить уведомление как прочитанное
-function markNotificationAsRead(notificationId) {
-  fetch(`/api/notifications/${notificationId}/read`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json'
-    }
-  })
-  .then(response => {
-    if (response.ok) {
-      // Обновить UI: убрать кнопку 'Прочитать' и добавить класс 'read'
-      const notificationItem = document.querySelector(`.notification-item[data-notification-id="${notificationId}"]`);
-      if (notificationItem) {
-        notificationItem.classList.add('read');
-        const markReadBtn = notificationItem.querySelector('.mark-read-btn');
-        if (markReadBtn) {
-          markReadBtn.remove();
-        }
-      }
-      updateNotificationCount();
-    } else {
-      throw new Error('Failed to mark notification as read');
-    }
-  })
-  .catch(error => {
-    console.error('Error marking notification as read:', error);
-    alert('Ошибка при отметке уведомления как прочитанного: ' + error.message);
-  });
-}
-
-// Обновить счетчик уведомлений
-function updateNotificationCount() {
-  fetch('/api/notifications/unread_count')
-    .then(response => {
-      if (response.ok) {
-        return response.json();
-      } else {
-        throw new Error('Failed to get unread notification count');
-      }
-    })
-    .then(data => {
-      const notificationCountElement = document.getElementById('notification-count');
-      if (notificationCountElement) {
-        if (data.count > 0) {
-          notificationCountElement.textContent = data.count;
-          notificationCountElement.style.display = 'block';
-        } else {
-          notificationCountElement.style.display = 'none';
-        }
-      }
-    })
-    .catch(error => {
-      console.error('Error updating notification count:', error);
-    });
-}
-
-// Показать модальное окно уведомлений
-function showNotificationsModal() {
-    const modalContainer = document.getElementById('modal-container');
-    modalContainer.innerHTML = `
-        <div class="modal-backdrop">
-            <div class="modal">
-                <div class="modal-header">
-                    <h3 class="modal-title">Уведомления</h3>
-                    <button class="modal-close">&times;</button>
-                </div>
-                <div class="modal-body" id="notifications-list">
-                    <div class="loading">Загрузка уведомлений...</div>
-                </div>
-                <div class="modal-footer">
-                    <button class="btn btn-outline modal-cancel">Закрыть</button>
-                </div>
-            </div>
-        </div>
-    `;
-
-    const closeModal = () => {
-        modalContainer.innerHTML = '';
-    };
-    modalContainer.querySelector('.modal-close').addEventListener('click', closeModal);
-    modalContainer.querySelector('.modal-cancel').addEventListener('click', closeModal);
-
-    // Загружаем уведомления
-    fetch('/api/notifications')
-        .then(response => {
-            if (response.ok) {
-                return response.json();
-            } else {
-                throw new Error('Failed to load notifications');
-            }
-        })
-        .then(data => {
-            const notificationsList = document.getElementById('notifications-list');
-            if (data.notifications && data.notifications.length > 0) {
-                let notificationsHtml = '<ul class="notifications-list">';
-                data.notifications.forEach(notification => {
-                    notificationsHtml += `
-                        <li class="notification-item ${notification.read ? 'read' : ''}" data-notification-id="${notification.id}">
-                            <div class="notification-content">
-                                <strong>${notification.title}</strong>
-                                <p>${notification.message}</p>
-                                <span class="notification-date">${formatDateTime(notification.created_at)}</span>
-                            </div>
-                            ${!notification.read ? '<button class="btn btn-sm btn-outline mark-read-btn">Прочитать</button>' : ''}
-                        </li>
-                    `;
-                });
-                notificationsHtml += '</ul>';
-                notificationsList.innerHTML = notificationsHtml;
-
-                document.querySelectorAll('.mark-read-btn').forEach(button => {
-                    button.addEventListener('click', function() {
-                        const notificationId = this.closest('.notification-item').dataset.notificationId;
-                        markNotificationAsRead(notificationId);
-                    });
-                });
-            } else {
-                notificationsList.innerHTML = '<div class="empty-state">Нет новых уведомлений</div>';
-            }
-            updateNotificationCount();
-        })
-        .catch(error => {
-            console.error('Error loading notifications:', error);
-            document.getElementById('notifications-list').innerHTML = '<div class="error">Ошибка загрузки уведомлений</div>';
-        });
-}
-
-
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+# Настройки читаются при импорте src.config, поэтому окружение задается до импорта приложения
+_tmp = tempfile.mkdtemp(prefix='zapis-tests-')
+os.environ['APP_CONFIG'] = 'sqlite'
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'test.db')
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+
+import pytest
+
+from main import create_app
+from src.models.user import db, User
+
+PASSWORDS = {'admin': 'admin', 'manager': 'manager', 'entrance': 'entrance'}
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='admin', password='admin', role='admin'))
+        db.session.add(User(username='manager', password='manager', role='manager'))
+        db.session.add(User(username='entrance', password='entrance', role='installer_entrance'))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def login(app):
+    def login(username='admin'):
+        client = app.test_client()
+        response = client.post('/api/login', json={'username': username, 'password': PASSWORDS[username]})
+        assert response.status_code == 200, response.get_json()
+        return client
+    return login
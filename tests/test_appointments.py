@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query
+
+SLOT = {'date': '2030-01-15', 'time_slot': 'morning', 'door_type': 'entrance', 'invoice_number': 'INV-1'}
+
+def test_duplicate_slot_is_rejected(login):
+    client = login('manager')
+    assert client.post('/api/appointments', json=SLOT).status_code == 201
+
+    response = client.post('/api/appointments', json=SLOT)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'This time slot is already booked'
+    assert len(client.get('/api/appointments').get_json()['appointments']) == 1
+
+def test_moving_into_booked_slot_is_rejected(login):
+    client = login('manager')
+    client.post('/api/appointments', json=SLOT)
+    other = client.post('/api/appointments', json={**SLOT, 'time_slot': 'afternoon'}).get_json()['appointment']
+
+    response = client.put(f"/api/appointments/{other['id']}", json={'time_slot': 'morning'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'This time slot is already booked'
+
+def test_other_integrity_errors_are_not_reported_as_booked(app, login):
+    client = login('manager')
+    error = IntegrityError('INSERT INTO appointments ...', {}, Exception('FOREIGN KEY constraint failed'))
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+    with mock.patch('src.routes.appointment.record_calendar_change', side_effect=error):
+        with pytest.raises(IntegrityError):
+            client.post('/api/appointments', json=SLOT)
+
+def test_list_is_paginated_only_on_request(login):
+    client = login('manager')
+    for day in range(1, 4):
+        client.post('/api/appointments', json={**SLOT, 'date': f'2030-01-0{day}'})
+
+    unbounded = client.get('/api/appointments').get_json()
+    assert len(unbounded['appointments']) == 3 and 'next_cursor' not in unbounded
+    first = client.get('/api/appointments?limit=2').get_json()
+    assert [a['date'] for a in first['appointments']] == ['2030-01-01', '2030-01-02']
+    rest = client.get(f"/api/appointments?cursor={first['next_cursor']}").get_json()
+    assert [a['date'] for a in rest['appointments']] == ['2030-01-03'] and rest['next_cursor'] is None
+
+    bounded = client.get('/api/appointments?start_date=2030-01-01&end_date=2030-01-31').get_json()
+    assert len(bounded['appointments']) == 3 and 'next_cursor' not in bounded
+
+def test_concurrent_mark_read_decrements_once(app, login):
+    from src.models.appointment import Notification
+    from src.models.user import db
+    from src.services.notifications import mark_read, recount_unread
+
+    client = login('manager')
+    appointment_id = client.post('/api/appointments', json=SLOT).get_json()['appointment']['id']
+    with app.app_context():
+        db.session.add_all([
+            Notification(user_id=2, appointment_id=appointment_id, message='first'),
+            Notification(user_id=2, appointment_id=appointment_id, message='second'),
+        ])
+        recount_unread([2])
+        db.session.commit()
+        notification_id = Notification.query.filter_by(message='first').one().id
+    assert client.get('/api/notifications/unread_count').get_json()['count'] == 2
+
+    real_first = Query.first
+    def race(query):
+        notification = real_first(query)
+        # Параллельный запрос отмечает то же уведомление после нашего SELECT
+        with app.app_context():
+            mark_read(2, Notification.id == notification_id)
+            db.session.commit()
+        return notification
+
+    with mock.patch.object(Query, 'first', race):
+        response = client.post(f'/api/notifications/{notification_id}/read')
+    assert response.get_json()['notification']['is_read'] is True
+    assert client.get('/api/notifications/unread_count').get_json()['count'] == 1
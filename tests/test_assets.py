@@ -0,0 +1,24 @@
+import os
+
+from src.services.assets import get_manifest
+
+def test_debug_manifest_is_rebuilt_only_when_files_change(app, tmp_path):
+    (tmp_path / 'js').mkdir()
+    script = tmp_path / 'js' / 'main.js'
+    script.write_text('console.log(1);')
+    (tmp_path / 'index.html').write_text('<script src="/static/js/main.js"></script>')
+    app.config['STATIC_FOLDER'] = str(tmp_path)
+    app.debug = True
+
+    with app.app_context():
+        first = get_manifest()
+        assert get_manifest() is first
+
+        script.write_text('console.log(2);')
+        stat = os.stat(script)
+        os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = get_manifest()
+
+    assert second is not first
+    assert second.get('js/main.js').encodings['identity'] == b'console.log(2);'
+    assert second.assets['js/main.js'].url in second.index.encodings['identity'].decode()
@@ -0,0 +1,32 @@
+from sqlalchemy import func, select
+
+from benchmarks.runner import percentile, run_suite
+from benchmarks.seed import seed_database
+from src.models.appointment import Appointment, Notification
+from src.models.user import db, User
+
+def test_seed_fills_consecutive_slots(app):
+    with app.app_context():
+        dataset = seed_database(users=5, appointments=40, notifications=30)
+        assert db.session.execute(select(func.count(User.id))).scalar() == 5
+        assert db.session.execute(select(func.count(Notification.id))).scalar() == 30
+        slots = db.session.execute(select(Appointment.date, Appointment.time_slot, Appointment.door_type)).all()
+    assert len(slots) == len(set(slots)) == 40
+    assert dataset['end_date'] == str(max(day for day, _, _ in slots))
+
+def test_suite_reports_percentiles_and_single_race_winner(app):
+    with app.app_context():
+        dataset = seed_database(users=5, appointments=40, notifications=30)
+    results = run_suite(app, dataset, ['test_client', 'wsgi'], ['calendar', 'appointments', 'booking'],
+                        requests=8, concurrency=4)
+
+    for mode in ('test_client', 'wsgi'):
+        for endpoint in results[mode]['endpoints']:
+            assert set(endpoint['statuses']) <= {'200', '201'}, endpoint
+            assert endpoint['p50_ms'] <= endpoint['p95_ms'] <= endpoint['p99_ms']
+            assert endpoint['queries_per_request'] > 0
+        assert results[mode]['booking_race']['ok'], results[mode]['booking_race']
+
+def test_percentile():
+    assert percentile([5.0], 99) == 5.0
+    assert percentile([float(i) for i in range(1, 101)], 50) == 50.5
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from src.services.cache import CacheBackend, MemoryCache, RedisCache, SQLiteCache
+
+# Минимальная замена redis.Redis (get, set с ex и nx, delete) для проверки RedisCache
+class FakeRedis:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        item = self._data.get(key)
+        if item and item[1] is not None and item[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._alive(key)
+            return item[0] if item else None
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def cache(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCache(max_entries=10)
+    if request.param == 'sqlite':
+        return SQLiteCache(str(tmp_path / 'cache.sqlite'), max_entries=10)
+    return RedisCache(client=FakeRedis())
+
+def test_get_set_add_delete(cache):
+    cache.set('a', {'x': 1})
+    assert cache.get('a') == {'x': 1}
+    assert cache.add('a', 2) is False
+    assert cache.add('b', 2) is True and cache.get('b') == 2
+    cache.delete('a')
+    assert cache.get('a') is None
+
+def test_add_has_one_winner_across_threads(cache):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.add('lock', 1, ttl=5))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite'), max_entries=5)
+    cache.EVICT_EVERY = 1
+    for i in range(10):
+        cache.set(str(i), i)
+    assert [cache.get(str(i)) for i in range(10)].count(None) == 5
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
@@ -0,0 +1,103 @@
+from datetime import date, datetime
+
+from src.models.appointment import Appointment
+from src.models.user import db
+from src.services.calendar import record_calendar_change
+from src.services.pagination import encode_cursor
+
+def book(client, day, time_slot='morning', door_type='entrance'):
+    response = client.post('/api/appointments', json={
+        'date': day, 'time_slot': time_slot, 'door_type': door_type, 'invoice_number': 'INV'
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['appointment']['id']
+
+def sync(client, cursor=None, limit=2):
+    seen, deleted = [], []
+    while True:
+        url = f'/api/appointments/changes?limit={limit}' + (f'&since={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        seen += [appointment['id'] for appointment in page['appointments']]
+        deleted += [tombstone['id'] for tombstone in page['deleted']]
+        cursor = page['cursor']
+        if not page['has_more']:
+            return seen, deleted, cursor
+
+def test_paging_returns_every_row_once(login):
+    client = login('manager')
+    ids = [book(client, f'2030-01-{day:02d}') for day in range(1, 8)]
+
+    seen, deleted, cursor = sync(client)
+    assert seen == ids and deleted == []
+
+    # Изменение и удаление после курсора
+    client.put(f'/api/appointments/{ids[0]}', json={'comment': 'перезвонить'})
+    client.delete(f'/api/appointments/{ids[1]}')
+    seen, deleted, cursor = sync(client, cursor)
+    assert seen == [ids[0]] and deleted == [ids[1]]
+    assert sync(client, cursor)[:2] == ([], [])
+
+def test_late_commit_with_old_timestamp_is_not_skipped(app, login):
+    client = login('manager')
+    book(client, '2030-01-01')
+    _, _, cursor = sync(client)
+
+    # Транзакция, начатая до опроса (старый updated_at), фиксируется после него
+    with app.app_context():
+        appointment = Appointment(user_id=2, date=date(2030, 1, 2), time_slot='morning', door_type='entrance',
+                                  created_at=datetime(2000, 1, 1), updated_at=datetime(2000, 1, 1))
+        db.session.add(appointment)
+        db.session.flush()
+        appointment.change_seq = record_calendar_change([appointment.date])
+        db.session.commit()
+        late_id = appointment.id
+
+    assert sync(client, cursor)[0] == [late_id]
+
+def test_door_type_change_is_a_deletion_for_installers(login):
+    manager, installer = login('manager'), login('entrance')
+    appointment_id = book(manager, '2030-01-01')
+    seen, _, cursor = sync(installer)
+    assert seen == [appointment_id]
+
+    manager.put(f'/api/appointments/{appointment_id}', json={'door_type': 'interior'})
+    seen, deleted, _ = sync(installer, cursor)
+    assert seen == [] and deleted == [appointment_id]
+
+def test_first_sync_skips_old_deletions_and_rejects_bad_cursors(login):
+    client = login('manager')
+    client.delete(f"/api/appointments/{book(client, '2030-01-01')}")
+    assert sync(client)[:2] == ([], [])
+
+    for cursor in ('garbage', encode_cursor(['2030-01-01T00:00:00', 0, 0])):
+        assert client.get(f'/api/appointments/changes?since={cursor}').status_code == 400
+
+def test_admin_keeps_row_after_door_type_change(login):
+    admin = login('admin')
+    _, _, cursor = sync(admin, limit=1)
+    first, second = book(admin, '2030-01-01'), book(admin, '2030-01-02')
+    kept = book(admin, '2030-01-03')
+    admin.delete(f'/api/appointments/{first}')
+    admin.delete(f'/api/appointments/{second}')
+    admin.put(f'/api/appointments/{kept}', json={'door_type': 'interior'})
+
+    # Копия клиента: страницы применяются по порядку
+    rows = set()
+    while True:
+        page = admin.get(f'/api/appointments/changes?limit=1&since={cursor}').get_json()
+        rows |= {appointment['id'] for appointment in page['appointments']}
+        rows -= {tombstone['id'] for tombstone in page['deleted']}
+        cursor = page['cursor']
+        if not page['has_more']:
+            break
+    assert rows == {kept}
+
+def test_door_type_changed_back_is_kept_by_installer(login):
+    manager, installer = login('manager'), login('entrance')
+    appointment_id = book(manager, '2030-01-01')
+    _, _, cursor = sync(installer)
+
+    manager.put(f'/api/appointments/{appointment_id}', json={'door_type': 'interior'})
+    manager.put(f'/api/appointments/{appointment_id}', json={'door_type': 'entrance'})
+    seen, deleted, _ = sync(installer, cursor, limit=1)
+    assert seen == [appointment_id] and deleted == []
@@ -0,0 +1,19 @@
+import pytest
+from flask import Flask
+
+from src.config import ProductionConfig, configure_app
+
+def test_production_requires_database_url_and_secret_key(monkeypatch):
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', None)
+    monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_DATABASE_URI', None)
+    with pytest.raises(RuntimeError, match='DATABASE_URL'):
+        configure_app(Flask(__name__), 'production')
+
+    monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_DATABASE_URI', 'mysql+pymysql://user:pass@db/zapis')
+    with pytest.raises(RuntimeError, match='SECRET_KEY'):
+        configure_app(Flask(__name__), 'production')
+
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', 'secret')
+    app = Flask(__name__)
+    configure_app(app, 'production')
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == 'mysql+pymysql://user:pass@db/zapis'
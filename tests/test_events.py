@@ -0,0 +1,116 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from src.models.user import db
+from src.models.event import ChangeEvent
+from src.services.events import GAP_WAIT, DatabaseEventHub
+
+@pytest.fixture
+def hub_factory(app):
+    app.config['EVENT_POLL_INTERVAL'] = 0.05
+    hubs = []
+    def factory():
+        hubs.append(DatabaseEventHub(app))
+        return hubs[-1]
+    yield factory
+    for hub in hubs:
+        hub.close()
+
+def test_events_reach_other_processes(hub_factory):
+    # Отдельные экземпляры хаба - как воркер с потоком и cron-задача
+    stream, job = hub_factory(), hub_factory()
+    events, resync, cursor = stream.wait(None)
+    assert (events, resync) == ([], False)
+
+    job.publish('notification', {'user_id': 2}, user_id=2)
+    job.publish('appointment', {'date': '2030-01-15'}, door_types={'entrance', 'inner'})
+
+    events, resync, cursor = stream.wait(cursor, timeout=5)
+    if len(events) < 2:
+        more, _, cursor = stream.wait(cursor, timeout=5)
+        events += more
+    assert not resync
+    assert [event.type for event in events] == ['notification', 'appointment']
+    assert events[0].user_id == 2 and events[1].door_types == ('entrance', 'inner')
+    assert cursor == events[-1].id
+
+def test_lost_cursor_requests_resync(app, hub_factory):
+    app.config['EVENT_BUFFER_SIZE'] = 2
+    hub = hub_factory()
+    _, _, cursor = hub.wait(None)
+    for i in range(4):
+        hub.publish('appointment', {'i': i})
+
+    assert hub.wait(cursor, timeout=5)[1]
+    assert hub.wait('0123abcd:5', timeout=0)[1]
+    assert hub.wait('999999', timeout=0)[1]
+
+def test_reconnect_with_cursor_older_than_buffer(hub_factory):
+    publisher = hub_factory()
+    first = publisher.publish('appointment', {'i': 0})
+    publisher.publish('appointment', {'i': 1})
+
+    # Новый процесс: буфер пуст, история читается из журнала
+    events, resync, _ = hub_factory().wait(first, timeout=5)
+    assert not resync and [event.data for event in events] == [{'i': 1}]
+
+def test_stream_waits_for_uncommitted_gap(app, hub_factory):
+    hub = hub_factory()
+    first = int(hub.publish('appointment', {'i': 0}))
+    hub.wait(None)
+    # Событие first + 1 еще не закоммичено другим воркером
+    with app.app_context():
+        db.session.execute(insert(ChangeEvent).values(
+            id=first + 2, event_type='appointment', data='{}', created_at=datetime.utcnow()
+        ))
+        db.session.commit()
+
+    events, _, cursor = hub.wait(str(first), timeout=0.3)
+    assert events == [] and cursor == str(first)
+
+    with app.app_context():
+        db.session.execute(ChangeEvent.__table__.update().values(
+            created_at=datetime.utcnow() - timedelta(seconds=GAP_WAIT + 1)
+        ))
+        db.session.commit()
+    events, _, cursor = hub.wait(str(first), timeout=5)
+    assert cursor == str(first + 2)
+
+def test_waiting_streams_do_not_query_database(app, hub_factory):
+    hub = hub_factory()
+    _, _, cursor = hub.wait(None)
+
+    threads = set()
+    def record(*args):
+        threads.add(threading.current_thread())
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        results = []
+        waiters = [threading.Thread(target=lambda: results.append(hub.wait(cursor, timeout=5)))
+                   for _ in range(20)]
+        for waiter in waiters:
+            waiter.start()
+        DatabaseEventHub(app).publish('appointment', {'i': 0})
+        for waiter in waiters:
+            waiter.join()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert [len(events) for events, _, _ in results] == [1] * 20
+    # К БД обращаются только поток опроса и публикация из основного потока
+    assert threads <= {hub._thread, threading.main_thread()}
+
+def test_stream_is_disabled_by_default(app, login):
+    client = login('manager')
+    assert client.get('/api/events').status_code == 204
+
+    app.config['EVENT_STREAM_ENABLED'] = True
+    app.config['SSE_STREAM_MAX_AGE'] = 0
+    response = client.get('/api/events')
+    assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+    app.extensions.pop('event_hub').close()
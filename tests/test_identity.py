@@ -0,0 +1,41 @@
+import time
+
+from src.models.user import User
+from src.services import identity
+
+def _stale_cache(app, username):
+    # Имитирует другой воркер: в его кэше процесса осталась старая версия
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).first().id
+        version = identity.get_auth_version(user_id, fresh=True)
+    return user_id, version
+
+def _restore(user_id, version):
+    with identity._versions_lock:
+        identity._versions[user_id] = (version, time.monotonic() + 3600)
+
+def test_demoted_admin_loses_admin_routes_immediately(app, login):
+    admin = login('admin')
+    admin.post('/api/users', json={'username': 'boss', 'password': 'boss', 'role': 'admin'})
+    boss = app.test_client()
+    assert boss.post('/api/login', json={'username': 'boss', 'password': 'boss'}).status_code == 200
+    assert boss.get('/api/users').status_code == 200
+
+    user_id, version = _stale_cache(app, 'boss')
+    assert admin.put(f'/api/users/{user_id}', json={'role': 'manager'}).status_code == 200
+    _restore(user_id, version)
+
+    assert boss.get('/api/users').status_code == 403
+
+def test_deleted_user_cannot_mutate(app, login):
+    admin = login('admin')
+    manager = login('manager')
+
+    user_id, version = _stale_cache(app, 'manager')
+    assert admin.delete(f'/api/users/{user_id}').status_code == 200
+    _restore(user_id, version)
+
+    response = manager.post('/api/appointments', json={
+        'date': '2030-01-15', 'time_slot': 'morning', 'door_type': 'entrance', 'invoice_number': 'INV-1',
+    })
+    assert response.status_code == 401
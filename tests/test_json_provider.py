@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.services.json_provider import COMPACT_SEPARATORS, OrjsonProvider, init_json_provider
+
+pytest.importorskip('orjson')
+
+SAMPLES = [
+    'ул. «Ленина» café',
+    'д. 5 ¼ µ ÿ \u0080',
+    'Кавычки " и \\ обратный слеш',
+    'эмодзи 🚪',
+    'таб\tперевод\nстроки  ',
+    '',
+]
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+@pytest.mark.parametrize('value', SAMPLES)
+def test_matches_stdlib_and_round_trips(app, value, ensure_ascii):
+    provider, stdlib = OrjsonProvider(app), DefaultJSONProvider(app)
+    provider.ensure_ascii = stdlib.ensure_ascii = ensure_ascii
+    obj = {'address': value, 'items': [value, None, 1]}
+
+    data = provider.dumps(obj, separators=COMPACT_SEPARATORS)
+    assert data == stdlib.dumps(obj, separators=COMPACT_SEPARATORS)
+    assert json.loads(data) == obj
+    if ensure_ascii:
+        assert data.isascii()
+
+def test_api_response_with_latin1_address(app, login):
+    client = login('manager')
+    address = 'ул. «Ленина» café'
+    response = client.post('/api/appointments', json={
+        'date': '2030-01-15', 'time_slot': 'morning', 'door_type': 'entrance',
+        'address': address, 'invoice_number': 'INV-1'
+    })
+    assert response.status_code == 201, response.get_data(as_text=True)
+    assert json.loads(response.get_data(as_text=True))['appointment']['address'] == address
+
+    for url in ('/api/appointments', '/api/calendar?start_date=2030-01-01&end_date=2030-01-31'):
+        body = client.get(url).get_data(as_text=True)
+        assert address in body
+        assert address in json.dumps(json.loads(body), ensure_ascii=False)
+
+@pytest.mark.parametrize('ensure_ascii, provider_class', [(False, OrjsonProvider), (True, DefaultJSONProvider)])
+def test_orjson_only_without_ensure_ascii(ensure_ascii, provider_class):
+    app = Flask(__name__)
+    app.config.update(JSON_BACKEND='orjson', JSON_ENSURE_ASCII=ensure_ascii)
+    init_json_provider(app)
+    assert type(app.json) is provider_class
+    assert app.json.ensure_ascii is ensure_ascii
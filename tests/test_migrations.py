@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, inspect, insert
+
+from src.migrations import MigrationError, create_baseline_schema, find_duplicate_slots, upgrade_schema
+from src.models.appointment import Appointment
+from src.models.user import db, User
+
+@pytest.fixture
+def baseline(app):
+    # Пустая база первой версии вместо create_all из фикстуры app
+    with app.app_context():
+        db.drop_all()
+        with db.engine.begin() as connection:
+            create_baseline_schema(connection)
+            connection.execute(insert(User.__table__).values(
+                id=1, username='admin', password_hash='x', role='admin'
+            ))
+        yield
+
+def add_appointments(*slots):
+    with db.engine.begin() as connection:
+        connection.execute(insert(Appointment.__table__), [
+            {'user_id': 1, 'date': day, 'time_slot': time_slot, 'door_type': 'entrance'}
+            for day, time_slot in slots
+        ])
+
+def test_duplicate_slots_stop_the_slot_migration(baseline):
+    add_appointments((date(2030, 1, 1), 'morning'), (date(2030, 1, 1), 'morning'), (date(2030, 1, 2), 'morning'))
+
+    with db.engine.connect() as connection:
+        assert find_duplicate_slots(connection) == [(date(2030, 1, 1), 'morning', 'entrance', [1, 2])]
+    with pytest.raises(MigrationError, match='2030-01-01 morning entrance: appointments 1, 2'):
+        upgrade_schema(log=lambda message: None)
+
+    # Миграция 1 применена, 2 - нет: после исправления данных обновление продолжается
+    db.session.remove()
+    with db.engine.begin() as connection:
+        connection.execute(Appointment.__table__.delete().where(Appointment.__table__.c.id == 2))
+    applied = upgrade_schema(log=lambda message: None)
+    assert applied[0] == 2
+    index_names = {index['name'] for index in inspect(db.engine).get_indexes('appointments')}
+    assert 'uq_appointments_slot' in index_names
+
+def schema(engine):
+    inspector = inspect(engine)
+    tables = {}
+    for table in inspector.get_table_names():
+        if table == 'schema_migrations':
+            continue
+        keys = {(tuple(index['column_names']), bool(index.get('unique'))) for index in inspector.get_indexes(table)}
+        keys |= {(tuple(constraint['column_names']), True) for constraint in inspector.get_unique_constraints(table)}
+        tables[table] = ({column['name'] for column in inspector.get_columns(table)}, keys)
+    return tables
+
+def test_upgrade_from_baseline_matches_models(baseline, tmp_path):
+    upgrade_schema(log=lambda message: None)
+
+    # Эталон - новая база из моделей (create_all) в отдельном файле
+    reference = create_engine('sqlite:///' + str(tmp_path / 'models.db'))
+    db.metadata.create_all(reference)
+    try:
+        assert schema(db.engine) == schema(reference)
+    finally:
+        reference.dispose()
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from src.models.user import db
+from src.models.push import PushMessage, PushSubscription
+from src.services.push import StubPushSender, deliver_pending, enqueue_pushes
+from src.services.retention import purge_notifications
+
+KEYS = {'p256dh': 'key', 'auth': 'auth'}
+FCM = 'https://fcm.googleapis.com/fcm/send/'
+
+@pytest.mark.parametrize('endpoint', [
+    'http://fcm.googleapis.com/fcm/send/1',
+    'https://127.0.0.1/push',
+    'https://169.254.169.254/latest/meta-data',
+    'https://fcm.googleapis.com.evil.example/x',
+    'https://user@fcm.googleapis.com/x',
+    'https://fcm.googleapis.com:8443/x',
+])
+def test_subscribe_rejects_non_push_endpoints(login, endpoint):
+    client = login('manager')
+    response = client.post('/api/notifications/subscribe', json={'endpoint': endpoint, 'keys': KEYS})
+    assert response.status_code == 400
+
+def test_subscribe_accepts_push_service(login):
+    client = login('manager')
+    response = client.post('/api/notifications/subscribe', json={'endpoint': FCM + '1', 'keys': KEYS})
+    assert response.status_code == 201
+
+def _subscribe(app, endpoints):
+    with app.app_context():
+        for endpoint in endpoints:
+            db.session.add(PushSubscription(user_id=2, endpoint=endpoint, p256dh='key', auth='auth'))
+        db.session.commit()
+
+def test_deliver_pending_with_stub_sender(app):
+    sent, gone, busy = FCM + 'sent', FCM + 'gone', FCM + 'busy'
+    # Подписка, сохраненная до проверки endpoint
+    legacy = 'http://10.0.0.1/internal'
+    _subscribe(app, [sent, gone, busy, legacy])
+    sender = StubPushSender({gone: 410, busy: 503})
+
+    with app.app_context():
+        enqueue_pushes([(2, '{"message": "test"}')])
+        db.session.commit()
+        stats = deliver_pending(sender=sender)
+        statuses = dict(db.session.execute(
+            select(PushSubscription.endpoint, PushMessage.status)
+            .join(PushMessage, PushMessage.subscription_id == PushSubscription.id)
+        ).all())
+
+    assert stats == {'sent': 1, 'retried': 1, 'failed': 0, 'pruned': 2}
+    assert {endpoint for endpoint, _, _ in sender.sent} == {sent, gone, busy}
+    assert statuses == {sent: 'sent', busy: 'pending'}
+
+def test_retention_purges_delivered_push_messages(app):
+    _subscribe(app, [FCM + '1'])
+    with app.app_context():
+        enqueue_pushes([(2, '{}'), (2, '{}'), (2, '{}')])
+        ids = db.session.execute(select(PushMessage.id).order_by(PushMessage.id)).scalars().all()
+        old = datetime.utcnow() - timedelta(days=app.config['PUSH_RETENTION_DAYS'] + 1)
+        db.session.execute(update(PushMessage).where(PushMessage.id == ids[0]).values(status='sent', created_at=old))
+        db.session.execute(update(PushMessage).where(PushMessage.id == ids[1]).values(status='pending', created_at=old))
+        db.session.execute(update(PushMessage).where(PushMessage.id == ids[2]).values(status='failed'))
+        db.session.commit()
+
+        stats = purge_notifications(archive='none')
+        remaining = db.session.execute(select(PushMessage.id).order_by(PushMessage.id)).scalars().all()
+
+    assert stats['push_deleted'] == 1
+    assert remaining == ids[1:]
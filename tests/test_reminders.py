@@ -0,0 +1,26 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.reminders import build_reminder_message, generate_reminders
+
+APPOINTMENT = SimpleNamespace(time_slot='morning', door_type='entrance', address=None, invoice_number=None)
+
+@pytest.mark.parametrize('target, when', [
+    (date(2030, 1, 15), 'сегодня (15.01.2030)'),
+    (date(2030, 1, 16), 'завтра (16.01.2030)'),
+    (date(2030, 1, 17), 'послезавтра (17.01.2030)'),
+    (date(2030, 1, 20), '20.01.2030'),
+])
+def test_reminder_names_the_target_day(target, when):
+    message = build_reminder_message(APPOINTMENT, target, today=date(2030, 1, 15))
+    assert message.startswith(f'Напоминание: {when} у вас запланирована установка входных дверей')
+
+def test_second_run_creates_nothing(app, login):
+    login('manager').post('/api/appointments', json={
+        'date': '2030-01-16', 'time_slot': 'morning', 'door_type': 'entrance', 'invoice_number': 'INV-1'
+    })
+    with app.app_context():
+        assert generate_reminders(date(2030, 1, 16)) == 1
+        assert generate_reminders(date(2030, 1, 16)) == 0
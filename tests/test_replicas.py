@@ -0,0 +1,66 @@
+import pytest
+from flask import g
+
+from src.services.replicas import copy_to_replicas
+
+from main import create_app
+from src.config import load_config
+from src.models.user import db, User, UserAuthVersion
+from src.models.version import ChangeVersion
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_config('sqlite'), 'SQLALCHEMY_REPLICA_URIS', ['sqlite:///' + str(tmp_path / 'replica1.db')])
+    app = create_app()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app регистрирует MetaData для каждого bind, иначе drop_all других тестов ищет replica1
+    db.metadatas.pop('replica1', None)
+
+def test_get_reads_go_to_replica_except_auth_versions(replica_app):
+    with replica_app.test_request_context('/api/users', method='GET'):
+        g.replica_bind = 'replica1'
+        primary, replica = db.engines[None], db.engines['replica1']
+        assert db.session.get_bind(mapper=User) is replica
+        assert db.session.get_bind(mapper=UserAuthVersion) is primary
+        # Версия изменений - ключ кэша: читается с той же реплики, что и данные
+        assert db.session.get_bind(mapper=ChangeVersion) is replica
+
+def test_flush_pins_session_to_primary(replica_app):
+    with replica_app.test_request_context('/api/users', method='GET'):
+        g.replica_bind = 'replica1'
+        db.create_all()
+        db.session.add(User(username='writer', password='p', role='manager'))
+        db.session.flush()
+        assert db.session.get_bind(mapper=User) is db.engines[None]
+        db.session.rollback()
+
+def test_stale_replica_does_not_hide_own_write(replica_app):
+    with replica_app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='admin', password='admin', role='admin'))
+        db.session.add(User(username='manager', password='manager', role='manager'))
+        db.session.commit()
+        copy_to_replicas(replica_app.config)
+
+    clients = {}
+    for username in ('admin', 'manager'):
+        clients[username] = replica_app.test_client()
+        assert clients[username].post('/api/login', json={'username': username, 'password': username}).status_code == 200
+    # Администратор давно ничего не менял и читает с реплики
+    with clients['admin'].session_transaction() as session:
+        session.pop('last_write_at', None)
+
+    month = '/api/calendar?start_date=2030-01-01&end_date=2030-01-31'
+    booking = {'date': '2030-01-15', 'time_slot': 'morning', 'door_type': 'entrance', 'invoice_number': 'INV-1'}
+    assert clients['manager'].post('/api/appointments', json=booking).status_code == 201
+
+    # Реплика отстает: администратор видит старый месяц и кладет его в общий кэш
+    assert clients['admin'].get(month).get_json()['calendar'] == []
+    # Автор записи читает с основной БД и видит ее сразу
+    days = clients['manager'].get(month).get_json()['calendar']
+    assert [day['date'] for day in days] == ['2030-01-15']
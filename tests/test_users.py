@@ -0,0 +1,51 @@
+from sqlalchemy import event
+
+from src.models.appointment import NotificationCounter
+from src.models.user import db, User
+from src.services.users import USERS_SCOPE
+from src.services.versions import get_versions
+
+def _users_version(app):
+    with app.app_context():
+        return get_versions([USERS_SCOPE])[0]
+
+def test_login_does_not_invalidate_user_list(app, login):
+    admin = login('admin')
+    before = _users_version(app)
+    login('manager')
+    assert _users_version(app) == before
+
+    admin.put('/api/users/2', json={'email': 'manager@example.com'})
+    assert _users_version(app) > before
+    users = admin.get('/api/users').get_json()['users']
+    assert users[1]['email'] == 'manager@example.com'
+
+def test_delete_user_with_unread_counter(app, login):
+    with app.app_context():
+        engine = db.engine
+    # SQLite проверяет внешние ключи только с PRAGMA foreign_keys
+    def enable_foreign_keys(connection, record):
+        connection.execute('PRAGMA foreign_keys=ON')
+    event.listen(engine, 'connect', enable_foreign_keys)
+    engine.dispose()
+    try:
+        manager = login('manager')
+        assert manager.get('/api/notifications/unread_count').get_json()['count'] == 0
+        admin = login('admin')
+        assert admin.delete('/api/users/2').status_code == 200
+        with app.app_context():
+            assert db.session.get(NotificationCounter, 2) is None
+    finally:
+        event.remove(engine, 'connect', enable_foreign_keys)
+        engine.dispose()
+
+def test_user_list_shows_fresh_last_login(app, login):
+    admin = login('admin')
+    before = admin.get('/api/users').get_json()['users']
+    version = _users_version(app)
+    login('manager')
+    users = admin.get('/api/users').get_json()['users']
+    assert _users_version(app) == version
+    assert users[1]['last_login'] is not None and users[1]['last_login'] != before[1]['last_login']
+    with app.app_context():
+        assert users == [user.to_dict() for user in User.query.order_by(User.id)]